@@ -5,10 +5,25 @@ from database import (
     get_all_recipes_with_translation,
     search_recipes_with_translation,
     get_recipe_with_translation,
+    get_related_recipes,
     get_categories,
+    get_recipe_count,
+    next_page_cursor,
+    release_db_connection,
+    LISTING_PAGE_SIZE,
+    NUTRITION_FILTERS,
+    SORT_ORDERS,
 )
+import fuzzy
+import http_cache
+import metrics
+import pantry
+import query_timing
+import suggest
 import markdown
 import os
+import threading
+from functools import lru_cache
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-key-change-in-production")
@@ -23,6 +38,9 @@ app.config["LANGUAGES"] = {
 }
 app.config["BABEL_DEFAULT_LOCALE"] = "es"
 app.config["BABEL_DEFAULT_TIMEZONE"] = "UTC"
+app.config["RECIPES_PER_PAGE"] = int(
+    os.environ.get("RECIPES_PER_PAGE", LISTING_PAGE_SIZE)
+)
 
 
 def get_locale():
@@ -63,6 +81,54 @@ def inject_conf_vars():
 # Initialize database on startup
 init_database()
 
+# Pooled connections outlive requests; make sure none keeps a transaction open
+app.teardown_appcontext(release_db_connection)
+
+# Request latency and template render timings for /metrics
+metrics.init_app(app)
+
+# Per-request SQL capture: Server-Timing, slow query log, debug panel
+query_timing.init_app(app)
+
+# ETag/Last-Modified validators and 304s for the catalog pages
+http_cache.init_app(app, get_locale)
+
+# Autocomplete prefix indexes, ready before the first keystroke
+suggest.build_indexes()
+
+
+# A single parser is reused for every render; Markdown instances keep state
+# between conversions, so access is serialized and reset() runs each time.
+_markdown = markdown.Markdown()
+_markdown_lock = threading.Lock()
+
+
+@lru_cache(maxsize=2048)
+def render_markdown(text):
+    """Render recipe Markdown to HTML, memoized on the text itself.
+
+    Keying on the content means each (recipe, language) fragment is rendered
+    once per process and re-rendered automatically when its text changes.
+    """
+    with _markdown_lock:
+        return _markdown.reset().convert(text or "")
+
+
+@metrics.collector
+def _markdown_cache_metrics():
+    info = render_markdown.cache_info()
+    return metrics.simple_metric(
+        "recetas_markdown_cache_hits_total",
+        "counter",
+        "Markdown renders served from the memo.",
+        info.hits,
+    ) + metrics.simple_metric(
+        "recetas_markdown_cache_misses_total",
+        "counter",
+        "Markdown renders that ran the parser.",
+        info.misses,
+    )
+
 
 @app.route("/set_language/<language>")
 def set_language(language=None):
@@ -72,19 +138,72 @@ def set_language(language=None):
     return redirect(request.referrer or url_for("index"))
 
 
+def nutrition_args(args):
+    """Per-serving ranges and sort from min_<name>/max_<name> and sort args.
+
+    Returns (nutrition, sort, echo) where ``echo`` holds the valid arguments
+    to carry over into pagination links.
+    """
+    nutrition, echo = {}, {}
+    for name in NUTRITION_FILTERS:
+        bounds = []
+        for bound in ("min", "max"):
+            value = args.get(f"{bound}_{name}", type=float)
+            bounds.append(value)
+            if value is not None:
+                echo[f"{bound}_{name}"] = args[f"{bound}_{name}"]
+        if bounds != [None, None]:
+            nutrition[name] = tuple(bounds)
+    # Searches rank by relevance unless told otherwise; listings by title.
+    # The search form's "Best match" option submits an empty sort for this.
+    default = "relevance" if args.get("q") else "title"
+    sort = args.get("sort", default)
+    if sort not in SORT_ORDERS:
+        sort = default
+    if sort != default:
+        echo["sort"] = sort
+    return nutrition, sort, echo
+
+
 @app.route("/")
 def index():
     """Main page with recipe search."""
     query = request.args.get("q", "")
     category = request.args.get("category", "")
+    after = request.args.get("after")
+    have = request.args.get("have", "").strip()
+    nutrition, sort, filter_args = nutrition_args(request.args)
+    page_size = app.config["RECIPES_PER_PAGE"]
     current_language = get_locale()
+    pantry_names, unknown_ingredients = [], []
+    original_query = None
 
-    if query or category:
-        recipes = search_recipes_with_translation(
-            query, category if category else None, current_language
+    if have:
+        # Ranked by coverage, one page only: there is no keyset to continue
+        recipes, pantry_names, unknown_ingredients = pantry.search(
+            have, category if category else None, current_language, page_size
         )
+        total = None
+        after = None
+    elif query or category or filter_args:
+        options = dict(page_size=page_size, after=after, nutrition=nutrition, sort=sort)
+        if request.args.get("exact"):
+            # The "search instead for" link under a corrected query
+            recipes = search_recipes_with_translation(
+                query, category if category else None, current_language, **options
+            )
+        else:
+            recipes, corrected = fuzzy.search(
+                query, category if category else None, current_language, **options
+            )
+            if corrected:
+                original_query, query = query, corrected
+        total = None
     else:
-        recipes = get_all_recipes_with_translation(current_language)
+        recipes = get_all_recipes_with_translation(
+            current_language, page_size=page_size, after=after
+        )
+        total = get_recipe_count()
 
     categories = get_categories()
 
@@ -94,6 +213,15 @@ def index():
         query=query,
         selected_category=category,
         categories=categories,
+        total=total,
+        after=after,
+        next_cursor=None if have else next_page_cursor(recipes, page_size, sort),
+        filter_args=filter_args,
+        sort=sort,
+        have=have,
+        original_query=original_query,
+        pantry_names=pantry_names,
+        unknown_ingredients=unknown_ingredients,
     )
 
 
@@ -106,10 +234,12 @@ def recipe_detail(recipe_id):
         return redirect(url_for("index"))
 
     # Convert markdown to HTML for better formatting
-    recipe["ingredients_html"] = markdown.markdown(recipe["ingredients"])
-    recipe["instructions_html"] = markdown.markdown(recipe["instructions"])
+    recipe["ingredients_html"] = render_markdown(recipe["ingredients"])
+    recipe["instructions_html"] = render_markdown(recipe["instructions"])
 
-    return render_template("recipe.html", recipe=recipe)
+    related = get_related_recipes(recipe, current_language)
+
+    return render_template("recipe.html", recipe=recipe, related=related)
 
 
 @app.route("/categories")
@@ -122,18 +252,50 @@ def categories():
 @app.route("/category/<category_name>")
 def category_recipes(category_name):
     """Show all recipes in a specific category."""
+    after = request.args.get("after")
+    page_size = app.config["RECIPES_PER_PAGE"]
     current_language = get_locale()
-    recipes = search_recipes_with_translation("", category_name, current_language)
-    return render_template("category.html", recipes=recipes, category=category_name)
+    recipes = search_recipes_with_translation(
+        "",
+        category_name,
+        current_language,
+        page_size=page_size,
+        after=after,
+        sort="title",
+    )
+    return render_template(
+        "category.html",
+        recipes=recipes,
+        category=category_name,
+        after=after,
+        next_cursor=next_page_cursor(recipes, page_size, "title"),
+    )
+
+
+@app.route("/api/suggest")
+def suggest_endpoint():
+    """Autocomplete suggestions for the search box, as JSON."""
+    query = request.args.get("q", "")
+    language = request.args.get("lang") or get_locale()
+    limit = request.args.get("limit", suggest.DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, suggest.MAX_LIMIT))
+    return {"q": query, "suggestions": suggest.suggest(query, language, limit)}
 
 
 @app.route("/health")
 def health_check():
-    """Health check endpoint for monitoring."""
-    return {
-        "status": "healthy",
-        "recipes_count": len(get_all_recipes_with_translation()),
-    }, 200
+    """Health check endpoint for monitoring.
+
+    The recipe count is a cached COUNT(*), so container probes never load
+    the recipes table.
+    """
+    return {"status": "healthy", "recipes_count": get_recipe_count()}, 200
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus metrics for this worker."""
+    return metrics.render_metrics(), 200, {"Content-Type": metrics.CONTENT_TYPE}
 
 
 def create_app_for_testing(config=None):
@@ -174,6 +336,11 @@ def create_app_for_testing(config=None):
             _=_,
         )
 
+    test_app.teardown_appcontext(release_db_connection)
+    metrics.init_app(test_app)
+    query_timing.init_app(test_app)
+    http_cache.init_app(test_app, get_locale)
+
     # Register routes
     test_app.add_url_rule("/set_language/<language>", "set_language", set_language)
     test_app.add_url_rule("/", "index", index)
@@ -182,7 +349,9 @@ def create_app_for_testing(config=None):
     test_app.add_url_rule(
         "/category/<category_name>", "category_recipes", category_recipes
     )
+    test_app.add_url_rule("/api/suggest", "suggest_endpoint", suggest_endpoint)
     test_app.add_url_rule("/health", "health_check", health_check)
+    test_app.add_url_rule("/metrics", "metrics_endpoint", metrics_endpoint)
 
     return test_app
 
@@ -0,0 +1,8 @@
+"""
+Benchmarks for the recipes application.
+
+``synthetic`` builds databases of any size with the real schema and
+``load`` drives the Flask routes against them. Run from the project root:
+
+    python -m benchmarks.load --recipes 1000
+"""
@@ -0,0 +1,103 @@
+"""
+Throughput of the ingredient parser in scripts/calories_estimator.py.
+
+Every ingredient line of the catalog, the Spanish originals and each
+translation, is run through the quantity/unit tokenizer, the ingredient
+matcher and the whole ``parse_ingredients`` pipeline. Lines per second
+and the share of lines where a quantity was found are reported per
+language:
+
+    python -m benchmarks.ingredients
+    python -m benchmarks.ingredients --db recipes.db --min-time 1
+"""
+
+import argparse
+import sqlite3
+
+import database
+import scripts.calories_estimator
+from benchmarks.micro import measure
+
+
+def ingredient_lines(db_path):
+    """Map language -> list of ingredient texts, one entry per recipe."""
+    conn = sqlite3.connect(db_path)
+    texts = {"es": [row[0] for row in conn.execute("SELECT ingredients FROM recipes")]}
+    for language, text in conn.execute(
+        "SELECT language, ingredients FROM recipe_translations ORDER BY language"
+    ):
+        texts.setdefault(language, []).append(text)
+    conn.close()
+    return {
+        language: [text for text in values if text]
+        for language, values in texts.items()
+    }
+
+
+def _lines(texts):
+    lines = []
+    for text in texts:
+        for line in text.split("\n"):
+            line = line.strip().lstrip("#-").strip()
+            if line:
+                lines.append(line)
+    return lines
+
+
+def run_parser_benchmark(db_path=None, min_time=0.2):
+    """Per-language throughput of the tokenizer, matcher and full parse."""
+    db_path = db_path or database.DATABASE_PATH
+    scripts.calories_estimator.DATABASE_PATH = db_path
+    estimator = scripts.calories_estimator.CaloriesEstimator()
+    results = {}
+    try:
+        for language, texts in ingredient_lines(db_path).items():
+            lines = _lines(texts)
+            if not lines:
+                continue
+            cases = {
+                "quantity": lambda: [
+                    estimator.extract_quantity_and_unit(line) for line in lines
+                ],
+                "match": lambda: [
+                    estimator.find_matching_ingredient(line) for line in lines
+                ],
+                "parse": lambda: [estimator.parse_ingredients(text) for text in texts],
+            }
+            row = {"lines": len(lines)}
+            for name, call in cases.items():
+                stats = measure(call, min_time=min_time)
+                row[f"{name}_lines_per_s"] = round(
+                    len(lines) / stats["median_us"] * 1e6
+                )
+            quantities = [estimator.extract_quantity_and_unit(line) for line in lines]
+            row["with_quantity"] = round(
+                sum(1 for quantity, _ in quantities if quantity) / len(lines), 3
+            )
+            results[language] = row
+    finally:
+        estimator.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", help="database to read, default DATABASE_PATH")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run_parser_benchmark(args.db, args.min_time)
+    print(
+        f"{'language':<9} {'lines':>6} {'quantity/s':>11} {'match/s':>10} "
+        f"{'parse/s':>10} {'with qty':>9}"
+    )
+    for language, row in results.items():
+        print(
+            f"{language:<9} {row['lines']:>6} {row['quantity_lines_per_s']:>11} "
+            f"{row['match_lines_per_s']:>10} {row['parse_lines_per_s']:>10} "
+            f"{row['with_quantity']:>9.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Latency and throughput benchmark for the Flask routes.
+
+A synthetic database is built (or reused) and every scenario is driven
+through the Flask test client and through a real threaded HTTP server:
+
+    python -m benchmarks.load --recipes 1000 --requests 300
+    python -m benchmarks.load --recipes 1000 --baseline benchmarks/baseline.json
+    python -m benchmarks.load --recipes 1000 --save benchmarks/baseline.json
+
+Results report p50/p95/p99 latency in milliseconds and requests/sec. With
+``--baseline`` the run is compared to a saved result and the exit status is
+1 when any scenario is slower than the baseline by more than
+``--tolerance`` (p95 latency up or throughput down).
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+import database
+from benchmarks.synthetic import CATEGORIES, build_synthetic_database, sample_words
+
+
+def _drop_letter(rng, word):
+    position = rng.randrange(len(word))
+    return word[:position] + word[position + 1 :]
+
+
+SCENARIOS = {
+    "index": lambda rng, language, recipes: "/",
+    "search": lambda rng, language, recipes: "/?q="
+    + quote(rng.choice(sample_words(language))),
+    "recipe": lambda rng, language, recipes: f"/recipe/{rng.randint(1, recipes)}",
+    "category": lambda rng, language, recipes: "/category/"
+    + quote(rng.choice(CATEGORIES)),
+    "health": lambda rng, language, recipes: "/health",
+    "suggest": lambda rng, language, recipes: "/api/suggest?q="
+    + quote(rng.choice(sample_words(language))[:3])
+    + f"&lang={language}",
+    # A letter dropped from a known word, to exercise the fuzzy fallback
+    "typo": lambda rng, language, recipes: "/?q="
+    + quote(_drop_letter(rng, rng.choice(sample_words(language)))),
+}
+
+MODES = ("client", "http")
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of an unsorted list of numbers."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _summary(latencies, elapsed, errors):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def _requests(scenario, count, recipes, seed):
+    rng = random.Random(seed)
+    languages = database.LOCALIZED_LANGUAGES
+    for _ in range(count):
+        language = rng.choice(languages)
+        yield SCENARIOS[scenario](rng, language, recipes), language
+
+
+def run_client(app, scenario, count, recipes, seed=0):
+    """Sequential requests through the Flask test client."""
+    client = app.test_client()
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for path, language in _requests(scenario, count, recipes, seed):
+        begin = time.perf_counter()
+        response = client.get(path, headers={"Accept-Language": language})
+        response.get_data()
+        latencies.append(time.perf_counter() - begin)
+        errors += response.status_code != 200
+    return _summary(latencies, time.perf_counter() - started, errors)
+
+
+def run_http(port, scenario, count, recipes, concurrency, seed=0):
+    """``count`` requests split over ``concurrency`` keep-alive clients."""
+    work = list(_requests(scenario, count, recipes, seed))
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def client(items):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        for path, language in items:
+            begin = time.perf_counter()
+            try:
+                conn.request("GET", path, headers={"Accept-Language": language})
+                response = conn.getresponse()
+                response.read()
+                failed = response.status != 200
+                if response.will_close:
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                failed = True
+                conn.close()
+            elapsed = time.perf_counter() - begin
+            with lock:
+                latencies.append(elapsed)
+                errors[0] += failed
+        conn.close()
+
+    threads = [
+        threading.Thread(target=client, args=(work[index::concurrency],))
+        for index in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return _summary(latencies, time.perf_counter() - started, errors[0])
+
+
+class _Server:
+    """The app on a threaded Werkzeug server in a background thread."""
+
+    def __init__(self, app):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server(
+            "127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler
+        )
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.thread.join()
+
+
+def run_benchmark(
+    db_path,
+    recipes,
+    requests=200,
+    scenarios=tuple(SCENARIOS),
+    modes=MODES,
+    concurrency=4,
+    warmup=20,
+):
+    """Run every scenario in every mode against ``db_path``; return a result dict."""
+    database.DATABASE_PATH = db_path
+    database.close_db_connections()
+    from app import app
+
+    # Production leaves the header off; time the same work as development
+    app.config["SERVER_TIMING"] = True
+    results = {}
+    for mode in modes:
+        results[mode] = {}
+        for scenario in scenarios:
+            if mode == "client":
+                run_client(app, scenario, warmup, recipes, seed=1)
+                results[mode][scenario] = run_client(app, scenario, requests, recipes)
+            else:
+                with _Server(app) as server:
+                    run_http(
+                        server.port, scenario, warmup, recipes, concurrency, seed=1
+                    )
+                    results[mode][scenario] = run_http(
+                        server.port, scenario, requests, recipes, concurrency
+                    )
+
+    return {
+        "meta": {
+            "recipes": recipes,
+            "languages": len(database.LOCALIZED_LANGUAGES),
+            "requests": requests,
+            "concurrency": concurrency,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """List of human-readable regressions of ``current`` against ``baseline``."""
+    regressions = []
+    for mode, scenarios in baseline["results"].items():
+        for scenario, before in scenarios.items():
+            after = current["results"].get(mode, {}).get(scenario)
+            if after is None:
+                continue
+            if after["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{mode}/{scenario}: p95 {before['p95_ms']:.2f} ms -> "
+                    f"{after['p95_ms']:.2f} ms"
+                )
+            if after["rps"] < before["rps"] / (1 + tolerance):
+                regressions.append(
+                    f"{mode}/{scenario}: {before['rps']:.0f} -> {after['rps']:.0f} req/s"
+                )
+            if after["errors"] > before["errors"]:
+                regressions.append(f"{mode}/{scenario}: {after['errors']} errors")
+    return regressions
+
+
+def print_table(result):
+    print(
+        f"{'mode':<7} {'scenario':<9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'req/s':>8} {'errors':>6}"
+    )
+    for mode, scenarios in result["results"].items():
+        for scenario, row in scenarios.items():
+            print(
+                f"{mode:<7} {scenario:<9} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+                f"{row['p99_ms']:>8.2f} {row['rps']:>8.1f} {row['errors']:>6}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipes", type=int, default=1000, help="10^2 to 10^5")
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--mode", choices=MODES + ("both",), default="both")
+    parser.add_argument("--scenario", action="append", choices=tuple(SCENARIOS))
+    parser.add_argument("--db", help="reuse or create this synthetic database")
+    parser.add_argument("--save", help="write the result JSON here")
+    parser.add_argument("--baseline", help="compare against this result JSON")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    db_path = args.db or os.path.join(
+        tempfile.gettempdir(), f"recetas_bench_{args.recipes}.db"
+    )
+    if not os.path.exists(db_path):
+        print(f"Seeding {args.recipes} recipes into {db_path}...")
+        build_synthetic_database(db_path, args.recipes)
+
+    modes = MODES if args.mode == "both" else (args.mode,)
+    result = run_benchmark(
+        db_path,
+        args.recipes,
+        requests=args.requests,
+        scenarios=tuple(args.scenario or SCENARIOS),
+        modes=modes,
+        concurrency=args.concurrency,
+    )
+    print_table(result)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if baseline["meta"]["recipes"] != args.recipes:
+            print(
+                f"warning: baseline was recorded with {baseline['meta']['recipes']} "
+                "recipes"
+            )
+        regressions = compare(result, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Micro-benchmarks for the public query functions in database.py.
+
+Each function is timed per language and per synthetic database size,
+pytest-benchmark style: it is called repeatedly for a minimum time and
+min/median/mean/stddev are recorded. Cached readers are measured twice,
+``cold`` (catalog cache invalidated before every call, so the SQL runs) and
+``warm``.
+
+Every run is appended to a JSON-lines history file together with the git
+commit, and compared with the previous run recorded for the same machine
+label (architecture, CPU count and Python version, or BENCH_MACHINE):
+
+    python -m benchmarks.micro --sizes 100,1000
+    python -m benchmarks.micro --sizes 1000 --threshold 0.3 --no-save
+
+Timings from different machines are never compared, so pull requests run
+the base branch first and then the change, on the same runner and into
+the same ``--history`` file.
+
+The exit status is 1 when any case's median regressed by more than
+``--threshold`` compared with the previous run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import database
+from benchmarks.synthetic import build_synthetic_database, sample_words
+
+HISTORY_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "micro_history.jsonl"
+)
+
+
+def _cases(language, recipes):
+    """(name, setup, call) triples for one language and database size."""
+    word = sample_words(language)[0]
+    middle = max(1, recipes // 2)
+
+    def cold():
+        database.invalidate_catalog_cache()
+
+    counter = iter(range(10**9))
+
+    def save():
+        database.save_recipe_translation(
+            middle, language, title=f"Bench {next(counter)}", description="x"
+        )
+
+    cases = [
+        (
+            "get_recipe_with_translation",
+            None,
+            lambda: database.get_recipe_with_translation(middle, language),
+        ),
+        (
+            "search_recipes_with_translation",
+            None,
+            lambda: database.search_recipes_with_translation(word, None, language),
+        ),
+        (
+            "get_all_recipes_with_translation[cold]",
+            cold,
+            lambda: database.get_all_recipes_with_translation(language),
+        ),
+        (
+            "get_all_recipes_with_translation[warm]",
+            None,
+            lambda: database.get_all_recipes_with_translation(language),
+        ),
+    ]
+    if language == "es":
+        cases += [
+            ("search_recipes", None, lambda: database.search_recipes(word)),
+            ("get_categories[cold]", cold, database.get_categories),
+            ("get_categories[warm]", None, database.get_categories),
+        ]
+    else:
+        cases.append(("save_recipe_translation", None, save))
+    return cases
+
+
+def measure(call, setup=None, min_time=0.2, min_rounds=5, max_rounds=10000):
+    """Per-call timing statistics in microseconds."""
+    call()  # warm up connections, statements and caches
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_rounds and (
+        len(samples) < min_rounds or time.perf_counter() < deadline
+    ):
+        if setup is not None:
+            setup()
+        begin = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - begin)
+    micro = [sample * 1e6 for sample in samples]
+    return {
+        "rounds": len(micro),
+        "min_us": round(min(micro), 2),
+        "median_us": round(statistics.median(micro), 2),
+        "mean_us": round(statistics.fmean(micro), 2),
+        "stddev_us": round(statistics.pstdev(micro), 2),
+    }
+
+
+def run_micro(sizes, languages=None, min_time=0.2, db_dir=None):
+    """Time every case; return ``{"<size>/<language>/<function>": stats}``."""
+    languages = languages or database.LOCALIZED_LANGUAGES
+    db_dir = db_dir or tempfile.gettempdir()
+    previous_path = database.DATABASE_PATH
+    results = {}
+    try:
+        for size in sizes:
+            db_path = os.path.join(db_dir, f"recetas_micro_{size}.db")
+            # Rebuilt each run: save_recipe_translation changes the data
+            build_synthetic_database(db_path, size)
+            database.DATABASE_PATH = db_path
+            for language in languages:
+                for name, setup, call in _cases(language, size):
+                    key = f"{size}/{language}/{name}"
+                    results[key] = measure(call, setup, min_time=min_time)
+            database.close_db_connections()
+    finally:
+        database.DATABASE_PATH = previous_path
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _machine():
+    """Comparable-hardware label; runs are only compared within one label."""
+    return os.environ.get("BENCH_MACHINE") or (
+        f"{platform.machine()}-{os.cpu_count()}cpu-py{platform.python_version()}"
+    )
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def previous_run(history, machine):
+    """Most recent recorded run from the same machine, if any."""
+    for entry in reversed(history):
+        if entry["machine"] == machine:
+            return entry
+    return None
+
+
+def find_regressions(results, previous, threshold):
+    """Cases whose median grew by more than ``threshold`` (a fraction)."""
+    regressions = []
+    for key, stats in results.items():
+        before = previous["results"].get(key)
+        if before and stats["median_us"] > before["median_us"] * (1 + threshold):
+            regressions.append((key, before["median_us"], stats["median_us"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100,1000", help="comma separated")
+    parser.add_argument("--languages", help="comma separated, default all")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    languages = args.languages.split(",") if args.languages else None
+    results = run_micro(sizes, languages, min_time=args.min_time)
+
+    history = load_history(args.history)
+    previous = previous_run(history, _machine())
+    regressions = (
+        find_regressions(results, previous, args.threshold) if previous else []
+    )
+    flagged = {key for key, _, _ in regressions}
+
+    print(f"{'case':<58} {'median us':>10} {'min us':>10} {'rounds':>7}")
+    for key, stats in results.items():
+        marker = "  REGRESSION" if key in flagged else ""
+        print(
+            f"{key:<58} {stats['median_us']:>10.1f} {stats['min_us']:>10.1f} "
+            f"{stats['rounds']:>7}{marker}"
+        )
+    for key, before, after in regressions:
+        print(f"REGRESSION {key}: median {before:.1f} us -> {after:.1f} us")
+
+    if not args.no_save:
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "machine": _machine(),
+            "results": results,
+        }
+        with open(args.history, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, sort_keys=True) + "\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
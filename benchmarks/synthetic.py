@@ -0,0 +1,123 @@
+"""
+Synthetic recipe databases for benchmarking.
+
+Recipes and translations are generated deterministically from small word
+lists and written through the real schema (``init_database``), so the
+derived localized and search tables are filled by the same triggers as in
+production.
+"""
+
+import os
+import random
+
+import database
+
+CATEGORIES = ("Postres", "Pollo", "Carnes", "Pescado", "Verduras", "Sopas", "Otros")
+
+WORDS = {
+    "es": (
+        "pollo arroz tomate cebolla ajo patata huevo harina azúcar leche "
+        "merluza ternera pimiento calabacín garbanzos lentejas almendra "
+        "limón naranja canela aceite vinagre queso nata chocolate"
+    ).split(),
+    "ca": (
+        "pollastre arròs tomàquet ceba all patata ou farina sucre llet "
+        "lluç vedella pebrot carabassó cigrons llenties ametlla llimona "
+        "taronja canyella oli vinagre formatge nata xocolata"
+    ).split(),
+    "en": (
+        "chicken rice tomato onion garlic potato egg flour sugar milk hake "
+        "beef pepper zucchini chickpeas lentils almond lemon orange "
+        "cinnamon oil vinegar cheese cream chocolate"
+    ).split(),
+    "eu": (
+        "oilaskoa arroza tomatea tipula baratxuria patata arrautza irina "
+        "azukrea esnea legatza txahala piperra kalabazina garbantzuak "
+        "dilistak almendra limoia laranja kanela olioa ozpina gazta "
+        "esnegaina txokolatea"
+    ).split(),
+    "zh": list("鸡米番茄洋葱蒜土豆蛋面粉糖奶鳕鱼牛肉辣椒西葫芦鹰嘴豆扁豆杏仁柠檬橙桂皮油醋奶酪奶油巧克力"),
+}
+
+
+def _text(rng, language, count):
+    words = rng.choices(WORDS[language], k=count)
+    separator = "" if language == "zh" else " "
+    return separator.join(words)
+
+
+def _recipe(rng, language, index):
+    title = f"{_text(rng, language, 3)} {index}"
+    description = _text(rng, language, 20)
+    ingredients = "\n".join(
+        f"- {rng.randint(1, 500)} g {_text(rng, language, 1)}"
+        for _ in range(rng.randint(4, 12))
+    )
+    instructions = "\n".join(
+        f"{step}. {_text(rng, language, 15)}" for step in range(1, rng.randint(3, 8))
+    )
+    return title, description, ingredients, instructions
+
+
+def build_synthetic_database(path, recipes, languages=None, seed=0):
+    """Create ``path`` with ``recipes`` recipes translated into ``languages``.
+
+    Spanish is the base language; every other language in ``languages``
+    (default: all localized languages) gets a full translation. An existing
+    file at ``path`` is replaced. Returns the number of recipes written.
+    """
+    languages = database.LOCALIZED_LANGUAGES if languages is None else languages
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    previous_path = database.DATABASE_PATH
+    database.DATABASE_PATH = path
+    try:
+        database.init_database()
+        rng = random.Random(seed)
+        conn = database.get_db_connection()
+        for index in range(1, recipes + 1):
+            category = CATEGORIES[index % len(CATEGORIES)]
+            recipe = _recipe(rng, "es", index)
+            conn.execute(
+                "INSERT INTO recipes (id, title, description, ingredients, "
+                "instructions, category, filename, estimated_calories, "
+                "title_normalized, description_normalized, ingredients_normalized) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    index,
+                    *recipe,
+                    category,
+                    f"synthetic_{index}.md",
+                    rng.randint(150, 1500),
+                    *database.normalized_values(*recipe[:3]),
+                ),
+            )
+            for language in languages:
+                if language == "es":
+                    continue
+                recipe = _recipe(rng, language, index)
+                conn.execute(
+                    "INSERT INTO recipe_translations (recipe_id, language, "
+                    "title, description, ingredients, instructions, "
+                    "title_normalized, description_normalized, "
+                    "ingredients_normalized) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        index,
+                        language,
+                        *recipe,
+                        *database.normalized_values(*recipe[:3]),
+                    ),
+                )
+        conn.commit()
+        conn.close()
+    finally:
+        database.close_db_connections()
+        database.DATABASE_PATH = previous_path
+    return recipes
+
+
+def sample_words(language="es"):
+    """Words guaranteed to appear in a synthetic database."""
+    return list(WORDS[language])
@@ -1,8 +1,82 @@
+import base64
+import json
 import sqlite3
 import os
+import re
+import threading
+import time
+import unicodedata
+import weakref
 
 DATABASE_PATH = os.environ.get("DATABASE_PATH", "recipes.db")
 
+# Applied once per pooled connection, when it is first opened.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+# Languages with derived tables: rows in recipes_localized and an FTS5 table
+# (recipes_fts_<language>). Spanish is the original language and is derived
+# straight from the recipes table.
+LOCALIZED_LANGUAGES = ("es", "ca", "en", "zh", "eu")
+
+# Bump when the derived tables change shape or meaning; init_database then
+# rebuilds them on existing databases.
+LOCALIZED_SCHEMA_VERSION = 4
+
+# Nutrition estimated by scripts/calories_estimator.py, besides
+# estimated_calories: whole-recipe macronutrients in grams and every value
+# divided by the servings.
+NUTRITION_COLUMNS = (
+    ("estimated_protein", "REAL"),
+    ("estimated_carbs", "REAL"),
+    ("estimated_fat", "REAL"),
+    ("calories_per_serving", "INTEGER"),
+    ("protein_per_serving", "REAL"),
+    ("carbs_per_serving", "REAL"),
+    ("fat_per_serving", "REAL"),
+)
+
+# Text columns with a casefolded, accent-free shadow copy, <column>_normalized,
+# in recipes, recipe_translations and recipes_localized. Substring searches
+# compare those with a normalized LIKE pattern, so "champinones" finds
+# "Champiñones" without calling a function on every row.
+NORMALIZED_COLUMNS = ("title", "description", "ingredients")
+
+# BM25 weights for the indexed columns: title, description, ingredients.
+SEARCH_COLUMN_WEIGHTS = (10.0, 4.0, 1.0)
+
+# Languages written without spaces between words. Besides FTS5 (which sees
+# a whole run of ideographs as one token) they get a recipe_bigrams_<lang>
+# table of every ideograph and every pair of adjacent ideographs, so that
+# any substring of two or more characters is an indexed lookup.
+BIGRAM_LANGUAGES = ("zh",)
+
+# Code point ranges treated as ideographs: CJK Unified Ideographs, their
+# Extension A and the Compatibility Ideographs.
+CJK_RANGES = ((0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF))
+
+# Every text position the bigram triggers can reach; longer texts are only
+# indexed up to here (the longest field of the catalog is under 800).
+BIGRAM_MAX_POSITION = 8192
+
+_CJK_RUN_RE = re.compile(
+    "[" + "".join(f"{chr(low)}-{chr(high)}" for low, high in CJK_RANGES) + "]+"
+)
+
+_SEARCH_TOKEN_RE = re.compile(r"\w+")
+
+# Default number of recipes per listing page.
+LISTING_PAGE_SIZE = 24
+
+# Listing pages only show the first 100 characters of a description; one
+# more is kept so templates can still tell whether to add an ellipsis.
+LISTING_DESCRIPTION_CHARS = 101
+
 
 def init_database():
     """Initialize the database and create tables if they don't exist."""
@@ -26,6 +100,10 @@ def init_database():
         )
     """
     )
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(recipes)")}
+    for column, column_type in NUTRITION_COLUMNS + _NORMALIZED_SHADOWS:
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE recipes ADD COLUMN {column} {column_type}")
 
     # Create ingredient calories table
     cursor.execute(
@@ -61,6 +139,46 @@ def init_database():
     """
     )
 
+    existing = {
+        row[1] for row in cursor.execute("PRAGMA table_info(recipe_translations)")
+    }
+    for column, column_type in _NORMALIZED_SHADOWS:
+        if column not in existing:
+            cursor.execute(
+                f"ALTER TABLE recipe_translations ADD COLUMN {column} {column_type}"
+            )
+
+    # Precomputed related recipes (scripts/build_recipe_neighbors.py)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recipe_neighbors (
+            recipe_id INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            neighbor_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (recipe_id, rank)
+        ) WITHOUT ROWID
+    """
+    )
+
+    # Canonical ingredients per recipe (scripts/calories_estimator.py): one
+    # posting list per ingredient_name, each row carrying how many distinct
+    # ingredients its recipe has, read by search_recipes_by_ingredients
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recipe_ingredients (
+            ingredient_name TEXT NOT NULL,
+            recipe_id INTEGER NOT NULL,
+            ingredient_count INTEGER NOT NULL,
+            PRIMARY KEY (ingredient_name, recipe_id)
+        ) WITHOUT ROWID
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_recipe_ingredients_recipe "
+        "ON recipe_ingredients(recipe_id)"
+    )
+
     # Create index for better search performance
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_title ON recipes(title)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_category ON recipes(category)")
@@ -78,47 +196,1113 @@ def init_database():
         "ON ingredient_calories(ingredient_name)"
     )
 
+    init_localized_tables(conn)
+
     conn.commit()
     conn.close()
 
 
+def normalize_text(text):
+    """Casefold ``text`` and strip its diacritics ("Ñoquis" -> "noquis")."""
+    if text is None:
+        return None
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalized_values(*texts):
+    """``normalize_text`` of each NORMALIZED_COLUMNS value, in that order."""
+    return [normalize_text(text) for text in texts]
+
+
+def refresh_normalized_columns(conn):
+    """Fill the <column>_normalized shadows that are missing.
+
+    Writers that go through this module (the importer and
+    ``save_recipe_translation``) store the shadows with the text. For any
+    other writer a trigger clears the shadow of text it changed, and the
+    next ``init_database`` fills it in here. Returns the rows updated.
+    """
+    stale = " OR ".join(
+        f"({column} IS NOT NULL AND {column}_normalized IS NULL)"
+        for column in NORMALIZED_COLUMNS
+    )
+    assignments = ", ".join(f"{column}_normalized = ?" for column in NORMALIZED_COLUMNS)
+    updated = 0
+    for table in ("recipes", "recipe_translations"):
+        rows = conn.execute(
+            f"SELECT id, {', '.join(NORMALIZED_COLUMNS)} FROM {table} WHERE {stale}"
+        ).fetchall()
+        conn.executemany(
+            f"UPDATE {table} SET {assignments} WHERE id = ?",
+            [normalized_values(*row[1:]) + [row[0]] for row in rows],
+        )
+        updated += len(rows)
+    return updated
+
+
+def refresh_calories_per_serving(conn):
+    """Fill calories_per_serving where only estimated_calories is known.
+
+    Databases estimated before the per-serving columns existed get
+    estimated_calories divided by the servings (4 when unset), as
+    scripts/calories_estimator.py computes it. Returns the rows updated.
+    """
+    return conn.execute(
+        """
+        UPDATE recipes
+        SET calories_per_serving = CAST(
+            ROUND(estimated_calories * 1.0 / COALESCE(NULLIF(servings, 0), 4))
+            AS INTEGER
+        )
+        WHERE calories_per_serving IS NULL AND estimated_calories IS NOT NULL
+    """
+    ).rowcount
+
+
+def _search_table(language):
+    """Name of the FTS5 table holding the merged content for a language."""
+    return f"recipes_fts_{language}"
+
+
+def _bigram_table(language):
+    """Name of the ideograph unigram/bigram table of a BIGRAM_LANGUAGES entry."""
+    return f"recipe_bigrams_{language}"
+
+
+def _bigram_insert_sql(language, condition):
+    """INSERT deriving the grams of the recipes_localized rows ``l`` matching
+    ``condition``.
+
+    Triggers cannot use recursive CTEs, so positions come from a join with
+    the bigram_positions sequence. Each gram's weight sums the
+    SEARCH_COLUMN_WEIGHTS of its occurrences.
+    """
+
+    def is_cjk(position):
+        code = f"unicode(substr(f.text, {position}, 1))"
+        return (
+            "("
+            + " OR ".join(
+                f"{code} BETWEEN {low} AND {high}" for low, high in CJK_RANGES
+            )
+            + ")"
+        )
+
+    fields = " UNION ALL ".join(
+        f"SELECT l.recipe_id, l.{column} AS text, {weight} AS weight "
+        f"FROM recipes_localized l WHERE l.language = '{language}' AND {condition}"
+        for column, weight in zip(
+            ("title", "description", "ingredients"), SEARCH_COLUMN_WEIGHTS
+        )
+    )
+    grams = " UNION ALL ".join(
+        f"""
+            SELECT f.recipe_id, f.weight, substr(f.text, p.i, {size}) AS gram
+            FROM ({fields}) f
+            JOIN bigram_positions p ON p.i <= length(f.text) - {size - 1}
+            WHERE {" AND ".join(is_cjk(f"p.i + {offset}") for offset in range(size))}"""
+        for size in (1, 2)
+    )
+    return f"""
+        INSERT INTO {_bigram_table(language)} (gram, recipe_id, weight)
+            SELECT gram, recipe_id, SUM(weight) FROM ({grams})
+            GROUP BY gram, recipe_id;"""
+
+
+# Columns copied verbatim from recipes into every recipes_localized row.
+_LOCALIZED_PLAIN_COLUMNS = (
+    "filename",
+    "estimated_calories",
+    "servings",
+    "created_at",
+) + tuple(column for column, _ in NUTRITION_COLUMNS)
+
+# Columns a translation may override; empty translations fall back too.
+_LOCALIZED_TEXT_COLUMNS = (
+    "title",
+    "description",
+    "ingredients",
+    "instructions",
+    "category",
+)
+
+_NORMALIZED_SHADOWS = tuple(
+    (f"{column}_normalized", "TEXT") for column in NORMALIZED_COLUMNS
+)
+
+# Projection of a recipes_localized row ``l`` shaped like a recipes row.
+LOCALIZED_COLUMNS = """
+    l.recipe_id AS id, l.title, l.description, l.ingredients, l.instructions,
+    l.category, l.filename, l.estimated_calories, l.servings, l.created_at,
+    l.estimated_protein, l.estimated_carbs, l.estimated_fat,
+    l.calories_per_serving, l.protein_per_serving, l.carbs_per_serving,
+    l.fat_per_serving"""
+
+
+def _localized_language(language):
+    """Languages without derived tables are served the original recipes."""
+    return language if language in LOCALIZED_LANGUAGES else "es"
+
+
+def _localized_source_sql(language):
+    """SELECT producing one recipes_localized row per recipe for a language."""
+    if language == "es":
+        merged = [f"r.{column}" for column in _LOCALIZED_TEXT_COLUMNS]
+        join = ""
+    else:
+        merged = [
+            f"COALESCE(NULLIF(t.{column}, ''), r.{column})"
+            for column in _LOCALIZED_TEXT_COLUMNS
+        ]
+        join = f"""
+            LEFT JOIN recipe_translations t
+                ON r.id = t.recipe_id AND t.language = '{language}'"""
+    if language == "es":
+        normalized = [f"r.{column}_normalized" for column in NORMALIZED_COLUMNS]
+    else:
+        # The shadow follows whichever text won the merge
+        normalized = [
+            f"CASE WHEN NULLIF(t.{column}, '') IS NULL "
+            f"THEN r.{column}_normalized ELSE t.{column}_normalized END"
+            for column in NORMALIZED_COLUMNS
+        ]
+    plain = [f"r.{column}" for column in _LOCALIZED_PLAIN_COLUMNS]
+    # sort_key is the merged title, kept apart so ordering can evolve
+    columns = ", ".join(
+        [f"'{language}'", "r.id"] + merged + plain + normalized + [merged[0]]
+    )
+    return f"""
+            SELECT {columns}
+            FROM recipes r{join}"""
+
+
+_LOCALIZED_INSERT = (
+    "INSERT INTO recipes_localized (language, recipe_id, {}, sort_key)".format(
+        ", ".join(
+            _LOCALIZED_TEXT_COLUMNS
+            + _LOCALIZED_PLAIN_COLUMNS
+            + tuple(column for column, _ in _NORMALIZED_SHADOWS)
+        )
+    )
+)
+
+
+def _localized_refresh_sql(language, recipe_id, condition="1"):
+    """SQL statements re-deriving one recipe in one language.
+
+    Rewrites the recipe's recipes_localized row and then its FTS5 row from
+    it. ``recipe_id`` and ``condition`` are SQL expressions so the statements
+    can be embedded in triggers (``NEW.recipe_id``, ``NEW.language = 'en'``).
+    """
+    table = _search_table(language)
+    sql = f"""
+        DELETE FROM recipes_localized
+            WHERE language = '{language}' AND recipe_id = {recipe_id}
+            AND {condition};
+        {_LOCALIZED_INSERT}
+            {_localized_source_sql(language)}
+            WHERE r.id = {recipe_id} AND {condition};
+        DELETE FROM {table} WHERE rowid = {recipe_id} AND {condition};
+        INSERT INTO {table} (rowid, title, description, ingredients)
+            SELECT recipe_id, title, description, ingredients
+            FROM recipes_localized
+            WHERE language = '{language}' AND recipe_id = {recipe_id}
+            AND {condition};"""
+    if language in BIGRAM_LANGUAGES:
+        sql += f"""
+        DELETE FROM {_bigram_table(language)}
+            WHERE recipe_id = {recipe_id} AND {condition};"""
+        sql += _bigram_insert_sql(
+            language, f"l.recipe_id = {recipe_id} AND {condition}"
+        )
+    return sql
+
+
+def init_localized_tables(conn):
+    """Create the per-language derived tables and the triggers keeping them current.
+
+    ``recipes_localized`` holds one row per (language, recipe) with the
+    translation merged over the original recipe, so translated listings are
+    plain index range scans. Each language also gets a ``recipes_fts_<lang>``
+    FTS5 table over the same merged title, description and ingredients.
+
+    Triggers on ``recipes`` and ``recipe_translations`` re-derive only the
+    affected recipe, so ``save_recipe_translation``, the import scripts and
+    any other writer keep both tables current incrementally.
+    """
+    text_columns = ", ".join(f"{column} TEXT" for column in _LOCALIZED_TEXT_COLUMNS)
+    nutrition_columns = ", ".join(
+        f"{column} {column_type}" for column, column_type in NUTRITION_COLUMNS
+    )
+    normalized_columns = ", ".join(
+        f"{column} {column_type}" for column, column_type in _NORMALIZED_SHADOWS
+    )
+    # Derived rows are rebuilt below anyway, so an older shape is dropped
+    if conn.execute("PRAGMA user_version").fetchone()[0] < LOCALIZED_SCHEMA_VERSION:
+        conn.execute("DROP TABLE IF EXISTS recipes_localized")
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS recipes_localized (
+            language TEXT NOT NULL,
+            recipe_id INTEGER NOT NULL,
+            {text_columns},
+            filename TEXT,
+            estimated_calories INTEGER,
+            servings INTEGER,
+            created_at TIMESTAMP,
+            {nutrition_columns},
+            {normalized_columns},
+            sort_key TEXT,
+            PRIMARY KEY (language, recipe_id)
+        ) WITHOUT ROWID
+    """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_localized_sort "
+        "ON recipes_localized(language, sort_key, recipe_id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_localized_category "
+        "ON recipes_localized(language, category, sort_key, recipe_id)"
+    )
+    # Calorie ranges and the calorie sort, with and without a category
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_localized_calories "
+        "ON recipes_localized(language, calories_per_serving, sort_key, recipe_id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_localized_category_calories "
+        "ON recipes_localized(language, category, calories_per_serving, sort_key, "
+        "recipe_id)"
+    )
+    for language in BIGRAM_LANGUAGES:
+        table = _bigram_table(language)
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                gram TEXT NOT NULL,
+                recipe_id INTEGER NOT NULL,
+                weight REAL NOT NULL,
+                PRIMARY KEY (gram, recipe_id)
+            ) WITHOUT ROWID
+        """
+        )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_recipe ON {table}(recipe_id)"
+        )
+    conn.execute("CREATE TABLE IF NOT EXISTS bigram_positions (i INTEGER PRIMARY KEY)")
+    # Single-row counter bumped by every catalog write. It is seeded randomly
+    # so a rebuilt database never reuses the versions of a previous one.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            updated_at TIMESTAMP NOT NULL
+        )
+    """
+    )
+    for language in LOCALIZED_LANGUAGES:
+        conn.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {_search_table(language)}
+            USING fts5(
+                title, description, ingredients,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """
+        )
+        # Read-only view of the index's terms, for fuzzy.py
+        conn.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {_search_table(language)}_vocab
+            USING fts5vocab({_search_table(language)}, 'col')
+        """
+        )
+
+    def refresh_all(recipe_id):
+        return "".join(
+            _localized_refresh_sql(language, recipe_id)
+            for language in LOCALIZED_LANGUAGES
+        )
+
+    def refresh_translation(ref):
+        return "".join(
+            _localized_refresh_sql(
+                language, f"{ref}.recipe_id", f"{ref}.language = '{language}'"
+            )
+            for language in LOCALIZED_LANGUAGES
+            if language != "es"
+        )
+
+    # Naming every language lets these use the (language, recipe_id) key
+    # instead of scanning the table once per changed recipe.
+    by_recipe = "language IN ({}) AND recipe_id".format(
+        ", ".join(f"'{language}'" for language in LOCALIZED_LANGUAGES)
+    )
+    delete_all = (
+        f"DELETE FROM recipes_localized WHERE {by_recipe} = OLD.id;"
+        + "".join(
+            f"DELETE FROM {_search_table(language)} WHERE rowid = OLD.id;"
+            for language in LOCALIZED_LANGUAGES
+        )
+        + "".join(
+            f"DELETE FROM {_bigram_table(language)} WHERE recipe_id = OLD.id;"
+            for language in BIGRAM_LANGUAGES
+        )
+    )
+    content_changed = " OR ".join(
+        f"OLD.{column} IS NOT NEW.{column}"
+        for column in ("id",)
+        + _LOCALIZED_TEXT_COLUMNS
+        + tuple(column for column, _ in _NORMALIZED_SHADOWS)
+    )
+
+    # Text changed by a writer that did not also store its shadow
+    def shadow_stale(column):
+        return (
+            f"NEW.{column} IS NOT OLD.{column} AND "
+            f"NEW.{column}_normalized IS OLD.{column}_normalized"
+        )
+
+    def clear_stale_shadows(table):
+        assignments = ", ".join(
+            f"{column}_normalized = CASE WHEN {shadow_stale(column)} "
+            f"THEN NULL ELSE {column}_normalized END"
+            for column in NORMALIZED_COLUMNS
+        )
+        return f"UPDATE {table} SET {assignments} WHERE id = NEW.id;"
+
+    stale_shadows = " OR ".join(shadow_stale(column) for column in NORMALIZED_COLUMNS)
+    copy_plain = "UPDATE recipes_localized SET {} WHERE {} = NEW.id;".format(
+        ", ".join(f"{column} = NEW.{column}" for column in _LOCALIZED_PLAIN_COLUMNS),
+        by_recipe,
+    )
+
+    triggers = {
+        "recipes_localized_ai": ("AFTER INSERT ON recipes", refresh_all("NEW.id")),
+        "recipes_localized_au": (
+            f"AFTER UPDATE ON recipes WHEN {content_changed}",
+            delete_all + refresh_all("NEW.id"),
+        ),
+        # Calorie and servings updates must not re-tokenize the text
+        "recipes_localized_au_plain": (
+            f"AFTER UPDATE ON recipes WHEN NOT ({content_changed})",
+            copy_plain,
+        ),
+        "recipes_localized_ad": ("AFTER DELETE ON recipes", delete_all),
+        "translations_localized_ai": (
+            "AFTER INSERT ON recipe_translations",
+            refresh_translation("NEW"),
+        ),
+        "translations_localized_au": (
+            "AFTER UPDATE ON recipe_translations",
+            refresh_translation("OLD") + refresh_translation("NEW"),
+        ),
+        "translations_localized_ad": (
+            "AFTER DELETE ON recipe_translations",
+            refresh_translation("OLD"),
+        ),
+        "recipes_normalized_stale": (
+            f"AFTER UPDATE ON recipes WHEN {stale_shadows}",
+            clear_stale_shadows("recipes"),
+        ),
+        "translations_normalized_stale": (
+            f"AFTER UPDATE ON recipe_translations WHEN {stale_shadows}",
+            clear_stale_shadows("recipe_translations"),
+        ),
+    }
+
+    # Triggers are recreated on every start so that changes to their
+    # definition reach existing databases; the transaction keeps writers
+    # from slipping in while they are missing.
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(
+        "INSERT OR IGNORE INTO catalog_version (id, version, updated_at) "
+        "VALUES (1, abs(random() % 1000000000), CURRENT_TIMESTAMP)"
+    )
+    if (
+        conn.execute("SELECT MAX(i) FROM bigram_positions").fetchone()[0] or 0
+    ) < BIGRAM_MAX_POSITION:
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO bigram_positions (i)
+            WITH RECURSIVE n(i) AS (
+                SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < {BIGRAM_MAX_POSITION}
+            )
+            SELECT i FROM n
+        """
+        )
+    stale = conn.execute(
+        "SELECT name FROM sqlite_master "
+        "WHERE type = 'trigger' AND name GLOB '*_search_*'"
+    ).fetchall()
+    for (name,) in stale:
+        conn.execute(f"DROP TRIGGER {name}")
+    bump_version = (
+        "UPDATE catalog_version SET version = version + 1, "
+        "updated_at = CURRENT_TIMESTAMP WHERE id = 1;"
+    )
+    for name in triggers:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    # Every row is re-derived below when the schema moved, so the shadows
+    # are filled first without paying for a trigger per row
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < LOCALIZED_SCHEMA_VERSION:
+        refresh_normalized_columns(conn)
+        refresh_calories_per_serving(conn)
+    for name, (event, body) in triggers.items():
+        conn.execute(f"CREATE TRIGGER {name} {event} BEGIN {body} {bump_version} END")
+    refresh_normalized_columns(conn)
+    refresh_calories_per_serving(conn)
+
+    # Rebuild whatever predates the current derived tables
+    recipe_count = conn.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+    for language in LOCALIZED_LANGUAGES:
+        localized, indexed = conn.execute(
+            f"""
+            SELECT
+                (SELECT COUNT(*) FROM recipes_localized WHERE language = ?),
+                (SELECT COUNT(*) FROM {_search_table(language)})
+        """,
+            [language],
+        ).fetchone()
+        if version < LOCALIZED_SCHEMA_VERSION or recipe_count not in (
+            localized,
+            indexed,
+        ):
+            rebuild_localized_tables(conn, language)
+    conn.execute(f"PRAGMA user_version = {LOCALIZED_SCHEMA_VERSION}")
+    conn.commit()
+
+
+def rebuild_localized_tables(conn, language=None):
+    """Re-derive every recipe for one language, or for all of them."""
+    for lang in [language] if language else LOCALIZED_LANGUAGES:
+        table = _search_table(lang)
+        conn.execute("DELETE FROM recipes_localized WHERE language = ?", [lang])
+        conn.execute(f"{_LOCALIZED_INSERT}{_localized_source_sql(lang)}")
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(
+            f"""
+            INSERT INTO {table} (rowid, title, description, ingredients)
+            SELECT recipe_id, title, description, ingredients
+            FROM recipes_localized WHERE language = ?
+        """,
+            [lang],
+        )
+        if lang in BIGRAM_LANGUAGES:
+            conn.execute(f"DELETE FROM {_bigram_table(lang)}")
+            conn.execute(_bigram_insert_sql(lang, "1"))
+
+
+class _CapturedCursor(sqlite3.Cursor):
+    """Cursor that charges fetch time and fetched rows to its query record.
+
+    SQLite produces rows lazily while they are fetched, so the time spent
+    here belongs to the query as much as the time spent in ``execute``.
+    """
+
+    record = None
+
+    def _charge(self, start, rows):
+        self.record["seconds"] += time.perf_counter() - start
+        self.record["rows"] += rows
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._charge(start, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._charge(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._charge(start, len(rows))
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._charge(start, 0)
+            raise
+        self._charge(start, 1)
+        return row
+
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite connection owned by the per-thread pool.
+
+    ``close()`` hands the connection back instead of closing it: any
+    uncommitted work is rolled back, exactly as a real close would discard
+    it, and the next ``get_db_connection()`` on the same thread reuses it.
+
+    While ``start_query_capture()`` is active on the thread, every
+    ``execute`` is also recorded with its SQL, parameter shape, rows
+    fetched and duration.
+    """
+
+    def execute(self, sql, parameters=()):
+        queries = getattr(_capture_local, "queries", None)
+        start = time.perf_counter()
+        if queries is None:
+            try:
+                return super().execute(sql, parameters)
+            finally:
+                _record_query(time.perf_counter() - start)
+
+        record = {
+            "sql": " ".join(sql.split()),
+            "parameters": parameters,
+            "shape": parameter_shape(parameters),
+            "rows": 0,
+            "seconds": 0.0,
+        }
+        queries.append(record)
+        cursor = self.cursor(_CapturedCursor)
+        cursor.record = record
+        try:
+            return cursor.execute(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            record["seconds"] += elapsed
+            _record_query(elapsed)
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+        with _pool_lock:
+            _pool_stats["released"] += 1
+
+    def close_for_real(self):
+        """Close the underlying SQLite handle."""
+        sqlite3.Connection.close(self)
+
+
+_pool_local = threading.local()
+_pool_lock = threading.Lock()
+# Weak so that a connection dies with the thread that owned it.
+_pool_connections = weakref.WeakSet()
+_pool_stats = {"opened": 0, "reused": 0, "released": 0, "closed": 0}
+_query_lock = threading.Lock()
+_query_stats = {"count": 0, "seconds": 0.0}
+
+
+_capture_local = threading.local()
+
+
+def _record_query(seconds):
+    with _query_lock:
+        _query_stats["count"] += 1
+        _query_stats["seconds"] += seconds
+
+
+def parameter_shape(parameters):
+    """Describe bound parameters by type only, e.g. ``(str, int)``.
+
+    Values are left out so that captured queries can be logged without
+    leaking user input; named parameters keep their names.
+    """
+    if isinstance(parameters, dict):
+        items = ", ".join(
+            f"{name}: {type(value).__name__}" for name, value in parameters.items()
+        )
+        return "{" + items + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+
+
+def start_query_capture():
+    """Record the statements this thread runs until ``stop_query_capture``.
+
+    Returns the list that receives one dict per statement, with ``sql``,
+    ``parameters``, ``shape``, ``rows`` (fetched so far) and ``seconds``
+    (execute plus fetch time).
+    """
+    _capture_local.queries = []
+    return _capture_local.queries
+
+
+def stop_query_capture():
+    """Stop recording on this thread and return what was captured."""
+    queries = getattr(_capture_local, "queries", None)
+    _capture_local.queries = None
+    return queries or []
+
+
+def explain_query_plan(sql, parameters=()):
+    """``EXPLAIN QUERY PLAN`` detail lines for a statement, or [] if it fails."""
+    conn = get_db_connection()
+    try:
+        rows = sqlite3.Connection.execute(
+            conn, "EXPLAIN QUERY PLAN " + sql, parameters
+        ).fetchall()
+    except sqlite3.Error:
+        return []
+    return [row["detail"] for row in rows]
+
+
+def _open_pooled_connection(path):
+    conn = sqlite3.connect(path, factory=PooledConnection, check_same_thread=False)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    with _pool_lock:
+        _pool_connections.add(conn)
+        _pool_stats["opened"] += 1
+    return conn
+
+
 def get_db_connection():
-    """Get a database connection."""
-    conn = sqlite3.connect(DATABASE_PATH)
+    """Get this thread's pooled connection to DATABASE_PATH.
+
+    Connections are opened once per thread and database path, with
+    CONNECTION_PRAGMAS applied, and reused afterwards. Callers keep the
+    usual ``conn.close()`` pattern; see PooledConnection.
+    """
+    connections = getattr(_pool_local, "connections", None)
+    if connections is None:
+        connections = _pool_local.connections = {}
+
+    conn = connections.get(DATABASE_PATH)
+    if conn is None:
+        conn = connections[DATABASE_PATH] = _open_pooled_connection(DATABASE_PATH)
+    else:
+        with _pool_lock:
+            _pool_stats["reused"] += 1
+
     conn.row_factory = sqlite3.Row
     return conn
 
 
-def search_recipes(query, category=None):
-    """Search recipes by title, description, or ingredients."""
-    conn = get_db_connection()
+def release_db_connection(exception=None):
+    """Roll back anything left open on this thread's connections.
 
-    if category:
-        sql = """
-            SELECT * FROM recipes
-            WHERE category = ? AND (
-                title LIKE ? OR
-                description LIKE ? OR
-                ingredients LIKE ?
+    Registered as a Flask teardown hook so a request that failed halfway
+    never leaks a transaction into the next request served by the thread.
+    """
+    for conn in getattr(_pool_local, "connections", {}).values():
+        if conn.in_transaction:
+            conn.rollback()
+
+
+def close_db_connections():
+    """Close every pooled connection, on all threads (shutdown and tests)."""
+    with _pool_lock:
+        connections = list(_pool_connections)
+        _pool_connections.clear()
+        _pool_stats["closed"] += len(connections)
+    for conn in connections:
+        conn.close_for_real()
+    _reset_pool_local()
+    _close_catalog_watcher()
+
+
+def _reset_pool_local():
+    global _pool_local
+    _pool_local = threading.local()
+
+
+def _forget_pool_after_fork():
+    """SQLite handles must not cross a fork; children start with a new pool."""
+    global _pool_lock, _query_lock
+    _pool_lock = threading.Lock()
+    _query_lock = threading.Lock()
+    _pool_connections.clear()
+    _reset_pool_local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pool_after_fork)
+
+
+def get_pool_stats():
+    """Counters for the connection pool plus the number of open connections."""
+    with _pool_lock:
+        return dict(_pool_stats, open=len(_pool_connections))
+
+
+def get_query_stats():
+    """Number of statements run on pooled connections and their total time."""
+    with _query_lock:
+        return dict(_query_stats)
+
+
+_catalog_lock = threading.Lock()
+_catalog_cache = {}
+_catalog_state = {"path": None, "data_version": None, "version": None, "watcher": None}
+_catalog_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def bump_catalog_version(conn):
+    """Mark the catalog as changed after writes the triggers do not see.
+
+    Bulk writers of derived data (such as recipe_neighbors) call this once
+    inside their transaction instead of paying for a per-row trigger; every
+    worker's cache and every page ETag then move on after the commit.
+    """
+    conn.execute(
+        "UPDATE catalog_version SET version = version + 1, "
+        "updated_at = CURRENT_TIMESTAMP WHERE id = 1"
+    )
+
+
+def invalidate_catalog_cache():
+    """Drop every cached catalog entry (after writes and imports)."""
+    with _catalog_lock:
+        _catalog_cache.clear()
+        _catalog_stats["invalidations"] += 1
+
+
+def _sync_catalog_cache():
+    """Clear the cache if the database changed since it was filled.
+
+    A dedicated, never-writing connection watches ``PRAGMA data_version``,
+    which moves whenever any other connection (another thread, worker or
+    import script) commits. When it moves, the trigger-maintained
+    ``catalog_version`` decides whether recipes or translations actually
+    changed, so a cache inherited across a fork (a preloaded server
+    worker) survives as long as the catalog did not change meanwhile.
+    Switching DATABASE_PATH also clears the cache.
+    """
+    with _catalog_lock:
+        if _catalog_state["path"] != DATABASE_PATH:
+            if _catalog_state["watcher"] is not None:
+                _catalog_state["watcher"].close()
+            _catalog_state.update(path=DATABASE_PATH, watcher=None, version=None)
+        if _catalog_state["watcher"] is None:
+            _catalog_state["watcher"] = sqlite3.connect(
+                DATABASE_PATH, check_same_thread=False
             )
-            ORDER BY title
-        """
-        params = [category, f"%{query}%", f"%{query}%", f"%{query}%"]
+            _catalog_state["data_version"] = None
+
+        watcher = _catalog_state["watcher"]
+        data_version = watcher.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != _catalog_state["data_version"]:
+            try:
+                row = watcher.execute(
+                    "SELECT version FROM catalog_version WHERE id = 1"
+                ).fetchone()
+            except sqlite3.OperationalError:
+                row = None  # not initialized yet
+            version = row[0] if row else None
+            if version is None or version != _catalog_state["version"]:
+                if _catalog_cache:
+                    _catalog_cache.clear()
+                    _catalog_stats["invalidations"] += 1
+                _catalog_state["version"] = version
+            _catalog_state["data_version"] = data_version
+
+
+def _cached_catalog(key, load):
+    """Read-through lookup in the catalog cache."""
+    _sync_catalog_cache()
+    with _catalog_lock:
+        if key in _catalog_cache:
+            _catalog_stats["hits"] += 1
+            return _catalog_cache[key]
+        _catalog_stats["misses"] += 1
+
+    value = load()
+    with _catalog_lock:
+        _catalog_cache[key] = value
+    return value
+
+
+def _close_catalog_watcher():
+    with _catalog_lock:
+        if _catalog_state["watcher"] is not None:
+            _catalog_state["watcher"].close()
+        _catalog_state.update(path=None, data_version=None, version=None, watcher=None)
+        _catalog_cache.clear()
+
+
+def _forget_catalog_after_fork():
+    """Drop the parent's watcher but keep its entries for revalidation."""
+    global _catalog_lock
+    _catalog_lock = threading.Lock()
+    _catalog_state.update(data_version=None, watcher=None)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_catalog_after_fork)
+
+
+def get_catalog_cache_stats():
+    """Hit/miss/invalidation counters and the number of cached entries."""
+    with _catalog_lock:
+        return dict(_catalog_stats, entries=len(_catalog_cache))
+
+
+def _query_grams(query):
+    """Grams to look up for a query made only of ideographs, else None.
+
+    A lone ideograph is looked up as itself and longer runs as their
+    overlapping pairs, so "土豆饼" needs both "土豆" and "豆饼".
+    """
+    runs = _CJK_RUN_RE.findall(query or "")
+    if not runs or _SEARCH_TOKEN_RE.search(_CJK_RUN_RE.sub(" ", query)):
+        return None
+    grams = []
+    for run in runs:
+        if len(run) == 1:
+            grams.append(run)
+        else:
+            grams.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return list(dict.fromkeys(grams))
+
+
+def _match_query(query):
+    """Turn free text into an FTS5 query: every word, as a prefix, must match."""
+    return " ".join(f'"{token}"*' for token in _SEARCH_TOKEN_RE.findall(query or ""))
+
+
+# Listing pages only need what the cards show, plus the keyset sort key.
+LISTING_COLUMNS = f"""
+    l.recipe_id AS id, l.title,
+    substr(l.description, 1, {LISTING_DESCRIPTION_CHARS}) AS description,
+    l.category, l.estimated_calories, l.calories_per_serving, l.sort_key"""
+
+# Nutrition range filters: name -> per-serving column of recipes_localized.
+NUTRITION_FILTERS = {
+    "calories": "calories_per_serving",
+    "protein": "protein_per_serving",
+    "carbs": "carbs_per_serving",
+    "fat": "fat_per_serving",
+}
+
+# Listing orders: name -> (keyset columns, descending). Sorting by calories
+# leaves out recipes that have not been estimated yet. "score" is the
+# search rank (BM25 or bigram weight, lower is better); it is 0 for
+# listings and substring matches, which then come in title order.
+SORT_ORDERS = {
+    "relevance": (("score", "sort_key", "recipe_id"), False),
+    "title": (("sort_key", "recipe_id"), False),
+    "calories": (("calories_per_serving", "sort_key", "recipe_id"), False),
+    "calories_desc": (("calories_per_serving", "sort_key", "recipe_id"), True),
+}
+
+
+def _sort_columns(sort):
+    if sort not in SORT_ORDERS:
+        raise ValueError(f"unknown sort {sort!r}")
+    return SORT_ORDERS[sort]
+
+
+def encode_page_cursor(recipe, sort="title"):
+    """Opaque keyset cursor pointing just after a listing row."""
+    columns, _ = _sort_columns(sort)
+    row = dict(recipe, recipe_id=recipe["id"])
+    raw = json.dumps([row[column] for column in columns]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_page_cursor(cursor, sort="title"):
+    """Keyset values from a cursor, or None if it is missing or malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    columns, _ = _sort_columns(sort)
+    if not isinstance(values, list) or len(values) != len(columns):
+        return None
+    *leading, sort_key, recipe_id = values
+    if not isinstance(sort_key, str) or not isinstance(recipe_id, int):
+        return None
+    if not all(isinstance(value, (int, float)) for value in leading):
+        return None
+    return tuple(values)
+
+
+def next_page_cursor(recipes, page_size, sort="title"):
+    """Cursor for the page after ``recipes``, or None on a short last page."""
+    if not page_size or len(recipes) < page_size:
+        return None
+    return encode_page_cursor(recipes[-1], sort)
+
+
+def _localized_query(
+    language,
+    mode,
+    text_params,
+    category,
+    columns,
+    after,
+    limit,
+    nutrition=None,
+    sort="title",
+):
+    """Build a query over recipes_localized for one language.
+
+    ``mode`` is "all" (no text filter), "fts" (``text_params`` holds the
+    MATCH expression), "like" (``text_params`` holds one LIKE pattern per
+    NORMALIZED_COLUMNS, matched against their normalized shadows) or
+    "bigram" (``text_params`` holds ideograph grams that must all be in the
+    language's bigram table). ``nutrition`` maps NUTRITION_FILTERS names to
+    (min, max) per serving, either bound None. Rows are ordered by the
+    SORT_ORDERS columns; with the "relevance" sort they also carry the
+    ``score`` the keyset continues from, so ranked searches page too.
+    """
+    order, descending = _sort_columns(sort)
+    params = [language]
+    # A float: ORDER BY would take an integer literal for a column number
+    score = "0.0"
+    if mode == "fts":
+        table = _search_table(language)
+        weights = ", ".join(str(weight) for weight in SEARCH_COLUMN_WEIGHTS)
+        score = f"bm25({table}, {weights})"
+    elif mode == "bigram":
+        score = "-m.score"
+    if "score" in order and columns != "1":
+        columns += f", {score} AS score"
+    if mode == "fts":
+        sql = f"""
+            SELECT {columns} FROM {table}
+            JOIN recipes_localized l
+                ON l.language = ? AND l.recipe_id = {table}.rowid"""
+        conditions = [f"{table} MATCH ?"]
+    elif mode == "bigram":
+        grams = ", ".join("?" for _ in text_params)
+        sql = f"""
+            SELECT {columns} FROM (
+                SELECT recipe_id, SUM(weight) AS score
+                FROM {_bigram_table(language)} WHERE gram IN ({grams})
+                GROUP BY recipe_id HAVING COUNT(*) = {len(text_params)}
+            ) m
+            CROSS JOIN recipes_localized l
+                ON l.language = ? AND l.recipe_id = m.recipe_id"""
+        # CROSS JOIN keeps the posting lists as the outer loop; walking the
+        # sort index instead and probing them is far slower for rare grams.
+        # The grams come first in the statement.
+        params = list(text_params) + params
+        conditions = []
     else:
-        sql = """
-            SELECT * FROM recipes
-            WHERE title LIKE ? OR
-                  description LIKE ? OR
-                  ingredients LIKE ?
-            ORDER BY title
-        """
-        params = [f"%{query}%", f"%{query}%", f"%{query}%"]
+        sql = f"SELECT {columns} FROM recipes_localized l"
+        conditions = ["l.language = ?"]
+    if mode == "like":
+        conditions.append(
+            "("
+            + " OR ".join(
+                f"l.{column}_normalized LIKE ?" for column in NORMALIZED_COLUMNS
+            )
+            + ")"
+        )
+    if mode in ("fts", "like"):
+        params.extend(text_params)
+    if category:
+        conditions.append("l.category = ?")
+        params.append(category)
+    for name, bounds in (nutrition or {}).items():
+        if name not in NUTRITION_FILTERS:
+            raise ValueError(f"unknown nutrition filter {name!r}")
+        for operator, bound in zip((">=", "<="), bounds):
+            if bound is not None:
+                conditions.append(f"l.{NUTRITION_FILTERS[name]} {operator} ?")
+                params.append(bound)
+    if "calories_per_serving" in order:
+        conditions.append("l.calories_per_serving IS NOT NULL")
+    expressions = [score if column == "score" else f"l.{column}" for column in order]
+    keyset = ", ".join(expressions)
+    if after:
+        placeholders = ", ".join("?" for _ in order)
+        operator = "<" if descending else ">"
+        conditions.append(f"({keyset}) {operator} ({placeholders})")
+        params.extend(after)
+
+    if conditions:
+        sql += "\n            WHERE " + " AND ".join(conditions)
+    direction = " DESC" if descending else ""
+    ordering = ", ".join(f"{expression}{direction}" for expression in expressions)
+    sql += f"\n            ORDER BY {ordering}"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return sql, params
+
+
+def _search_localized(
+    query,
+    category,
+    language,
+    page_size=None,
+    after=None,
+    nutrition=None,
+    sort="title",
+):
+    """Browse or search one language's recipes, whole or one page at a time.
+
+    Word queries use the FTS5 table when it has any match (BM25-ranked with
+    the "relevance" sort) and the LIKE scan otherwise, which still finds substrings the
+    tokenizer cannot see, such as the middle of a word, ignoring case and
+    accents through the normalized shadow columns. In BIGRAM_LANGUAGES a
+    query made only of ideographs is answered from the bigram table
+    instead, since FTS5 sees an unspaced sentence as a single word. Empty
+    queries list everything. With ``page_size`` rows use the slim LISTING_COLUMNS and
+    continue after the ``after`` cursor. ``nutrition`` and ``sort`` are
+    described in ``_localized_query``.
+    """
+    language = _localized_language(language)
+    columns = LISTING_COLUMNS if page_size else LOCALIZED_COLUMNS
+    keyset = _decode_page_cursor(after, sort) if page_size else None
+    conn = get_db_connection()
+
+    def fetch(mode, text_params, columns, keyset, limit, sort=sort):
+        sql, params = _localized_query(
+            language,
+            mode,
+            text_params,
+            category,
+            columns,
+            keyset,
+            limit,
+            nutrition,
+            sort,
+        )
+        return conn.execute(sql, params).fetchall()
+
+    def fts_has(match):
+        # Checked on the FTS table alone first: probing through the listing
+        # join re-runs MATCH for every recipe when nothing matches.
+        table = _search_table(language)
+        if not conn.execute(
+            f"SELECT 1 FROM {table} WHERE {table} MATCH ? LIMIT 1", [match]
+        ).fetchone():
+            return False
+        # Any match will do; ranking them all first would only cost time
+        probe_sort = "title" if sort == "relevance" else sort
+        return bool(fetch("fts", [match], "1", None, 1, probe_sort))
+
+    match = _match_query(query)
+    grams = _query_grams(query) if language in BIGRAM_LANGUAGES else None
+    if not query:
+        mode, text_params = "all", []
+    elif grams:
+        mode, text_params = "bigram", grams
+    elif match and fts_has(match):
+        mode, text_params = "fts", [match]
+    else:
+        pattern = f"%{normalize_text(query)}%"
+        mode, text_params = "like", [pattern] * len(NORMALIZED_COLUMNS)
+    recipes = fetch(mode, text_params, columns, keyset, page_size)
 
-    recipes = conn.execute(sql, params).fetchall()
     conn.close()
     return recipes
 
 
+def search_recipes(query, category=None):
+    """Search recipes by title, description, or ingredients.
+
+    See ``_search_localized``: FTS5 with BM25 ranking first, LIKE fallback.
+    """
+    return _search_localized(query, category, "es", sort="relevance")
+
+
 def get_recipe_by_id(recipe_id):
     """Get a specific recipe by ID."""
     conn = get_db_connection()
@@ -136,7 +1320,11 @@ def get_all_recipes():
 
 
 def get_categories():
-    """Get all unique categories."""
+    """Get all unique categories (served from the catalog cache)."""
+    return list(_cached_catalog(("categories",), _load_categories))
+
+
+def _load_categories():
     conn = get_db_connection()
     categories = conn.execute(
         "SELECT DISTINCT category FROM recipes ORDER BY category"
@@ -145,6 +1333,177 @@ def get_categories():
     return [cat["category"] for cat in categories]
 
 
+def get_suggestion_terms(language="es"):
+    """Terms to autocomplete in ``language``: [(kind, label, recipe_id)].
+
+    ``kind`` is "recipe" (with its id), "category" or "ingredient". Known
+    ingredients are only offered when some recipe in that language lists
+    them, checked with one FTS lookup per ingredient name.
+    """
+    language = _localized_language(language)
+    conn = get_db_connection()
+    terms = [
+        ("recipe", row["title"], row["recipe_id"])
+        for row in conn.execute(
+            "SELECT recipe_id, title FROM recipes_localized WHERE language = ? "
+            "ORDER BY sort_key, recipe_id",
+            (language,),
+        )
+        if row["title"]
+    ]
+    terms += [
+        ("category", row["category"], None)
+        for row in conn.execute(
+            "SELECT DISTINCT category FROM recipes_localized "
+            "WHERE language = ? AND category IS NOT NULL ORDER BY category",
+            (language,),
+        )
+    ]
+    table = _search_table(language)
+    listed = f"SELECT 1 FROM {table} WHERE {table} MATCH ? LIMIT 1"
+    for row in conn.execute(
+        "SELECT ingredient_name FROM ingredient_calories ORDER BY ingredient_name"
+    ).fetchall():
+        name = row["ingredient_name"]
+        words = _SEARCH_TOKEN_RE.findall(name)
+        if not words:
+            continue
+        phrase = '"' + " ".join(words) + '"'
+        if conn.execute(listed, (f"ingredients : {phrase}",)).fetchone():
+            terms.append(("ingredient", name, None))
+    conn.close()
+    return terms
+
+
+def get_search_vocabulary(language="es"):
+    """Words of ``language``'s titles and ingredients: [(word, frequency)].
+
+    Read from the FTS5 index through its fts5vocab table, so the words are
+    folded the way searches see them (lowercase, no accents) and follow
+    every write without a rebuild. ``frequency`` counts the recipes using
+    the word in their title plus those using it in their ingredients.
+    """
+    table = _search_table(_localized_language(language))
+    conn = get_db_connection()
+    rows = conn.execute(
+        f"""
+        SELECT term, SUM(doc) FROM {table}_vocab
+        WHERE col IN ('title', 'ingredients')
+        GROUP BY term
+    """
+    ).fetchall()
+    conn.close()
+    return [tuple(row) for row in rows]
+
+
+def get_pantry_ingredients():
+    """(name, calories_per_100g) of the ingredients some recipe uses.
+
+    Rows come in ingredient_calories order, ready for the estimator's
+    IngredientIndex, and are cached until the catalog changes.
+    """
+    return list(_cached_catalog(("pantry",), _load_pantry_ingredients))
+
+
+def _load_pantry_ingredients():
+    conn = get_db_connection()
+    rows = conn.execute(
+        """
+        SELECT c.ingredient_name, c.calories_per_100g
+        FROM ingredient_calories c
+        WHERE EXISTS (
+            SELECT 1 FROM recipe_ingredients p
+            WHERE p.ingredient_name = c.ingredient_name
+        )
+        ORDER BY c.id
+    """
+    ).fetchall()
+    conn.close()
+    return [tuple(row) for row in rows]
+
+
+def search_recipes_by_ingredients(
+    ingredients, category=None, language="es", limit=LISTING_PAGE_SIZE
+):
+    """Recipes using any of ``ingredients``, the best covered first.
+
+    ``ingredients`` are canonical names as stored in recipe_ingredients.
+    Their posting lists are merged with one primary-key range scan each and
+    ranked before any recipe row is read, so only the ``limit`` winners are
+    joined to recipes_localized. Rows use LISTING_COLUMNS plus ``matched``
+    (how many of the given ingredients the recipe uses) and ``missing``
+    (how many others it needs). They are ordered by most matched, then
+    fewest missing; which recipes of the last tier make the cut goes by
+    id, and each tier is shown in title order.
+    """
+    language = _localized_language(language)
+    ingredients = list(dict.fromkeys(ingredients))
+    if not ingredients:
+        return []
+    placeholders = ", ".join("?" * len(ingredients))
+    params = list(ingredients)
+    category_filter = ""
+    if category:
+        category_filter = (
+            "AND p.recipe_id IN (SELECT recipe_id FROM recipes_localized "
+            "WHERE language = ? AND category = ?)"
+        )
+        params += [language, category]
+    params += [limit, language]
+    conn = get_db_connection()
+    recipes = conn.execute(
+        f"""
+        SELECT {LISTING_COLUMNS}, m.matched, m.missing
+        FROM (
+            SELECT p.recipe_id, COUNT(*) AS matched,
+                   MAX(p.ingredient_count) - COUNT(*) AS missing
+            FROM recipe_ingredients p
+            WHERE p.ingredient_name IN ({placeholders}) {category_filter}
+            GROUP BY p.recipe_id
+            ORDER BY matched DESC, missing, p.recipe_id
+            LIMIT ?
+        ) m
+        CROSS JOIN recipes_localized l
+          ON l.language = ? AND l.recipe_id = m.recipe_id
+        ORDER BY m.matched DESC, m.missing, l.sort_key, l.recipe_id
+    """,
+        params,
+    ).fetchall()
+    conn.close()
+    return recipes
+
+
+def get_recipe_count():
+    """Number of recipes (one COUNT(*) per catalog change, then cached)."""
+    return _cached_catalog(("count",), _load_recipe_count)
+
+
+def _load_recipe_count():
+    conn = get_db_connection()
+    count = conn.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+    conn.close()
+    return count
+
+
+def get_catalog_version():
+    """(version, updated_at) of the catalog, identical in every worker.
+
+    ``version`` changes on every write to recipes or translations and
+    ``updated_at`` is its UTC timestamp. Both are re-read only when the
+    catalog cache notices a commit, so callers can use them per request.
+    """
+    return _cached_catalog(("version",), _load_catalog_version)
+
+
+def _load_catalog_version():
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT version, updated_at FROM catalog_version WHERE id = 1"
+    ).fetchone()
+    conn.close()
+    return row["version"], row["updated_at"]
+
+
 def get_recipe_translation(recipe_id, language):
     """Get translation for a recipe in a specific language."""
     conn = get_db_connection()
@@ -160,145 +1519,185 @@ def get_recipe_translation(recipe_id, language):
 
 
 def get_recipe_with_translation(recipe_id, language="es"):
-    """Get recipe with translation if available."""
-    conn = get_db_connection()
+    """Get recipe with translation if available.
 
-    # Get original recipe
-    recipe = conn.execute("SELECT * FROM recipes WHERE id = ?", [recipe_id]).fetchone()
-    if not recipe:
-        conn.close()
-        return None
+    One primary-key lookup in recipes_localized; empty translated fields
+    fall back to the original recipe.
+    """
+    conn = get_db_connection()
+    recipe = conn.execute(
+        f"""
+        SELECT {LOCALIZED_COLUMNS} FROM recipes_localized l
+        WHERE l.language = ? AND l.recipe_id = ?
+    """,
+        [_localized_language(language), recipe_id],
+    ).fetchone()
+    conn.close()
+    return dict(recipe) if recipe else None
 
-    # Get translation if available and not Spanish (original language)
-    if language != "es":
-        translation = conn.execute(
-            """
-            SELECT * FROM recipe_translations
-            WHERE recipe_id = ? AND language = ?
-        """,
-            [recipe_id, language],
-        ).fetchone()
 
-        if translation:
-            # Create a merged dictionary with translated content
-            recipe_dict = dict(recipe)
-            recipe_dict.update(
-                {
-                    "title": translation["title"] or recipe["title"],
-                    "description": translation["description"] or recipe["description"],
-                    "ingredients": translation["ingredients"] or recipe["ingredients"],
-                    "instructions": translation["instructions"]
-                    or recipe["instructions"],
-                    "category": translation["category"] or recipe["category"],
-                }
-            )
-            conn.close()
-            return recipe_dict
+def get_recipes_with_translation(ids, language="es"):
+    """Get many recipes with translations in one query.
 
+    The ids travel as a single JSON array parameter, so the statement text
+    is the same for any number of ids. Recipes come back in the order of
+    ``ids``; unknown and repeated ids are skipped.
+    """
+    ids = [int(recipe_id) for recipe_id in ids]
+    if not ids:
+        return []
+    conn = get_db_connection()
+    recipes = _recipes_by_ids(conn, ids, language, LOCALIZED_COLUMNS)
     conn.close()
-    return dict(recipe)
+    return recipes
 
 
-def get_all_recipes_with_translation(language="es"):
-    """Get all recipes with translations if available."""
-    conn = get_db_connection()
+def _recipes_by_ids(conn, ids, language, columns):
+    rows = conn.execute(
+        f"""
+        SELECT {columns} FROM recipes_localized l
+        WHERE l.language = ?
+          AND l.recipe_id IN (SELECT value FROM json_each(?))
+    """,
+        [_localized_language(language), json.dumps(ids)],
+    ).fetchall()
+    by_id = {row["id"]: dict(row) for row in rows}
+    return [by_id.pop(recipe_id) for recipe_id in ids if recipe_id in by_id]
 
-    if language == "es":
-        # Return original recipes
-        recipes = conn.execute("SELECT * FROM recipes ORDER BY title").fetchall()
-        conn.close()
-        return recipes
-    else:
-        # Return recipes with translations
-        recipes = conn.execute(
+
+# Words this short are mostly quantities, units and articles
+_RELATED_MIN_WORD = 4
+_RELATED_MAX_WORDS = 24
+
+
+def get_related_recipes(recipe, language="es", limit=4):
+    """Recipes related to ``recipe`` (a localized row), best first.
+
+    Neighbours precomputed from ingredient similarity in recipe_neighbors
+    are read with one primary-key range scan. Recipes without neighbours
+    fall back to ranking every other recipe in one query: sharing
+    ingredient words (BM25 over the ingredients column of the search
+    index, so rare ingredients weigh more than salt and oil) and being in
+    the same category both count, and on a tie the category wins. Either
+    way the ids are then resolved together, as ``get_recipes_with_translation``
+    does, with LISTING_COLUMNS. Results are cached per recipe until the
+    catalog changes.
+    """
+    language = _localized_language(language)
+
+    def load():
+        conn = get_db_connection()
+        rows = conn.execute(
             """
-            SELECT r.id, r.filename, r.created_at,
-                   CASE WHEN t.title IS NOT NULL THEN t.title
-                        ELSE r.title END as title,
-                   CASE WHEN t.description IS NOT NULL THEN t.description
-                        ELSE r.description END as description,
-                   CASE WHEN t.ingredients IS NOT NULL THEN t.ingredients
-                        ELSE r.ingredients END as ingredients,
-                   CASE WHEN t.instructions IS NOT NULL THEN t.instructions
-                        ELSE r.instructions END as instructions,
-                   CASE WHEN t.category IS NOT NULL THEN t.category
-                        ELSE r.category END as category
-            FROM recipes r
-            LEFT JOIN recipe_translations t ON r.id = t.recipe_id AND t.language = ?
-            ORDER BY CASE WHEN t.title IS NOT NULL THEN t.title ELSE r.title END
+            SELECT neighbor_id FROM recipe_neighbors
+            WHERE recipe_id = ?
+            ORDER BY rank
+            LIMIT ?
         """,
-            [language],
+            [recipe["id"], limit],
         ).fetchall()
+        if not rows:
+            rows = _related_by_words(conn, recipe, language, limit)
+        related = _recipes_by_ids(
+            conn, [row[0] for row in rows], language, LISTING_COLUMNS
+        )
         conn.close()
-        return recipes
+        return related
 
+    return list(_cached_catalog(("related", language, recipe["id"], limit), load))
 
-def search_recipes_with_translation(query, category=None, language="es"):
-    """Search recipes with translations if available."""
-    conn = get_db_connection()
 
-    if language == "es":
-        # Use original search function for Spanish
-        return search_recipes(query, category)
-    else:
-        # Search with translations
-        if category:
-            sql = """
-                SELECT r.id, r.filename, r.created_at,
-                       CASE WHEN t.title IS NOT NULL THEN t.title
-                        ELSE r.title END as title,
-                       CASE WHEN t.description IS NOT NULL THEN t.description
-                        ELSE r.description END as description,
-                       CASE WHEN t.ingredients IS NOT NULL THEN t.ingredients
-                        ELSE r.ingredients END as ingredients,
-                       CASE WHEN t.instructions IS NOT NULL THEN t.instructions
-                        ELSE r.instructions END as instructions,
-                       CASE WHEN t.category IS NOT NULL THEN t.category
-                        ELSE r.category END as category
-                FROM recipes r
-                LEFT JOIN recipe_translations t ON r.id = t.recipe_id AND t.language = ?
-                WHERE CASE WHEN t.category IS NOT NULL THEN t.category
-                      ELSE r.category END = ? AND (
-                    CASE WHEN t.title IS NOT NULL THEN t.title
-                         ELSE r.title END LIKE ? OR
-                    CASE WHEN t.description IS NOT NULL THEN t.description
-                         ELSE r.description END LIKE ? OR
-                    CASE WHEN t.ingredients IS NOT NULL THEN t.ingredients
-                         ELSE r.ingredients END LIKE ?
-                )
-                ORDER BY CASE WHEN t.title IS NOT NULL THEN t.title
-                         ELSE r.title END
-            """
-            params = [language, category, f"%{query}%", f"%{query}%", f"%{query}%"]
-        else:
-            sql = """
-                SELECT r.id, r.filename, r.created_at,
-                       CASE WHEN t.title IS NOT NULL THEN t.title
-                        ELSE r.title END as title,
-                       CASE WHEN t.description IS NOT NULL THEN t.description
-                        ELSE r.description END as description,
-                       CASE WHEN t.ingredients IS NOT NULL THEN t.ingredients
-                        ELSE r.ingredients END as ingredients,
-                       CASE WHEN t.instructions IS NOT NULL THEN t.instructions
-                        ELSE r.instructions END as instructions,
-                       CASE WHEN t.category IS NOT NULL THEN t.category
-                        ELSE r.category END as category
-                FROM recipes r
-                LEFT JOIN recipe_translations t ON r.id = t.recipe_id AND t.language = ?
-                WHERE CASE WHEN t.title IS NOT NULL THEN t.title
-                      ELSE r.title END LIKE ? OR
-                      CASE WHEN t.description IS NOT NULL THEN t.description
-                         ELSE r.description END LIKE ? OR
-                      CASE WHEN t.ingredients IS NOT NULL THEN t.ingredients
-                         ELSE r.ingredients END LIKE ?
-                ORDER BY CASE WHEN t.title IS NOT NULL THEN t.title
-                         ELSE r.title END
-            """
-            params = [language, f"%{query}%", f"%{query}%", f"%{query}%"]
+def _related_by_words(conn, recipe, language, limit):
+    words = []
+    for word in _SEARCH_TOKEN_RE.findall((recipe["ingredients"] or "").lower()):
+        if len(word) >= _RELATED_MIN_WORD and not word.isdigit():
+            if word not in words:
+                words.append(word)
+    words = words[:_RELATED_MAX_WORDS]
+    match = (
+        "ingredients : (" + " OR ".join(f'"{word}"' for word in words) + ")"
+        if words
+        else '""'
+    )
+    table = _search_table(language)
+    return conn.execute(
+        f"""
+        SELECT l.recipe_id
+        FROM recipes_localized l
+        LEFT JOIN (
+            SELECT rowid, bm25({table}) AS score
+            FROM {table} WHERE {table} MATCH ?
+        ) shared ON shared.rowid = l.recipe_id
+        WHERE l.language = ? AND l.recipe_id != ?
+          AND (shared.rowid IS NOT NULL OR l.category = ?)
+        ORDER BY (shared.rowid IS NOT NULL) + (l.category IS ?) DESC,
+                 l.category IS ? DESC, shared.score, l.sort_key, l.recipe_id
+        LIMIT ?
+    """,
+        [
+            match,
+            language,
+            recipe["id"],
+            recipe["category"],
+            recipe["category"],
+            recipe["category"],
+            limit,
+        ],
+    ).fetchall()
 
-        recipes = conn.execute(sql, params).fetchall()
-        conn.close()
-        return recipes
+
+def get_all_recipes_with_translation(language="es", page_size=None, after=None):
+    """Get all recipes with translations if available.
+
+    The merged per-language catalog is served from the in-process cache and
+    reloaded only after a write (see ``_sync_catalog_cache``).
+
+    With ``page_size`` only one page of the slim listing projection (id,
+    title, truncated description, category, calories, sort key) is
+    returned, starting after the ``after`` cursor; see ``next_page_cursor``.
+    """
+    if page_size:
+        if after:
+            return _search_localized("", None, language, page_size, after)
+        return list(
+            _cached_catalog(
+                ("page", language, page_size),
+                lambda: _search_localized("", None, language, page_size),
+            )
+        )
+
+    return list(
+        _cached_catalog(
+            ("recipes", language),
+            lambda: _search_localized("", None, language),
+        )
+    )
+
+
+def search_recipes_with_translation(
+    query,
+    category=None,
+    language="es",
+    page_size=None,
+    after=None,
+    nutrition=None,
+    sort="relevance",
+):
+    """Search recipes with translations if available.
+
+    Matches the merged translated columns with the same FTS5-then-LIKE rule
+    as ``search_recipes``. ``page_size`` and ``after`` return one keyset
+    page of the slim listing projection, as in
+    ``get_all_recipes_with_translation``.
+
+    ``nutrition`` narrows the results to per-serving ranges, e.g.
+    ``{"calories": (None, 500), "protein": (20, None)}``, and ``sort`` is a
+    key of SORT_ORDERS, best match first by default. Cursors are only valid
+    for the query and sort they came from.
+    """
+    return _search_localized(
+        query, category, language, page_size, after, nutrition, sort
+    )
 
 
 def save_recipe_translation(
@@ -310,7 +1709,8 @@ def save_recipe_translation(
     instructions=None,
     category=None,
 ):
-    """Save or update a recipe translation."""
+    """Save or update a recipe translation and its normalized shadows."""
+    normalized = normalized_values(title, description, ingredients)
     conn = get_db_connection()
 
     # Check if translation exists
@@ -328,7 +1728,8 @@ def save_recipe_translation(
             """
             UPDATE recipe_translations
             SET title = ?, description = ?, ingredients = ?,
-                instructions = ?, category = ?
+                instructions = ?, category = ?, title_normalized = ?,
+                description_normalized = ?, ingredients_normalized = ?
             WHERE recipe_id = ? AND language = ?
         """,
             [
@@ -337,6 +1738,7 @@ def save_recipe_translation(
                 ingredients,
                 instructions,
                 category,
+                *normalized,
                 recipe_id,
                 language,
             ],
@@ -346,8 +1748,9 @@ def save_recipe_translation(
         conn.execute(
             """
             INSERT INTO recipe_translations (recipe_id, language, title, description,
-            ingredients, instructions, category)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ingredients, instructions, category, title_normalized,
+            description_normalized, ingredients_normalized)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
             [
                 recipe_id,
@@ -357,8 +1760,10 @@ def save_recipe_translation(
                 ingredients,
                 instructions,
                 category,
+                *normalized,
             ],
         )
 
     conn.commit()
     conn.close()
+    invalidate_catalog_cache()
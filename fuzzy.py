@@ -0,0 +1,192 @@
+"""
+Typo-tolerant search: "estrogonof" finds the stroganoff, "canelons" the
+canelones.
+
+Each language's vocabulary (the words of its titles and ingredients, read
+from the FTS5 index) is split into trigrams, each word padded with a space
+on both sides. A misspelt query word looks up the words sharing enough of
+its trigrams and only those candidates are compared with a Levenshtein
+distance that gives up as soon as it passes the allowed number of edits.
+The corrected query is then searched as usual.
+
+Vocabulary grows far more slowly than the catalog, and the fuzzy path only
+runs when the exact search finds fewer than FUZZY_MIN_RESULTS recipes, so
+ordinary searches never pay for it. Indexes are built on first use and
+rebuilt after the catalog version moves.
+"""
+
+import re
+import threading
+from collections import Counter
+
+import database
+
+# The exact search has to find fewer recipes than this to try corrections.
+FUZZY_MIN_RESULTS = 3
+# Shorter words are left alone: one edit turns them into too many others.
+MIN_WORD_CHARS = 4
+# Candidates with most trigrams in common are compared, at most this many.
+MAX_CANDIDATES = 64
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def max_edits(word):
+    """Edits allowed when correcting ``word``: 1 up to 5 letters, then 2, then 3."""
+    if len(word) <= 5:
+        return 1
+    return 2 if len(word) <= 9 else 3
+
+
+def trigrams(word):
+    """Distinct trigrams of ``word``, padded so its first and last letters count."""
+    padded = f" {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_levenshtein(a, b, limit):
+    """Edit distance between ``a`` and ``b``, or ``limit + 1`` once it is more."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ca != cb),
+                )
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+class TrigramIndex:
+    """Words and their frequencies, reachable by the trigrams they contain."""
+
+    def __init__(self, vocabulary):
+        self._words = []
+        self._frequency = {}
+        self._postings = {}
+        for word, frequency in vocabulary:
+            if len(word) < MIN_WORD_CHARS or not word.isalpha():
+                continue
+            if word in self._frequency:
+                self._frequency[word] += frequency
+                continue
+            self._frequency[word] = frequency
+            position = len(self._words)
+            self._words.append(word)
+            for gram in trigrams(word):
+                self._postings.setdefault(gram, []).append(position)
+        self.size = len(self._words)
+
+    def __contains__(self, word):
+        return word in self._frequency
+
+    def closest(self, word):
+        """The nearest known word within ``max_edits(word)``, or None.
+
+        An edit changes at most three padded trigrams, so a word within
+        ``k`` edits shares all but at most ``3 * k`` of the query's
+        trigrams; words sharing fewer are never compared. Ties go to the
+        more frequent word.
+        """
+        limit = max_edits(word)
+        grams = trigrams(word)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        needed = max(1, len(grams) - 3 * limit)
+        candidates = [
+            position
+            for position, count in shared.most_common(MAX_CANDIDATES)
+            if count >= needed
+        ]
+        best = None
+        for position in candidates:
+            candidate = self._words[position]
+            distance = bounded_levenshtein(word, candidate, limit)
+            if distance > limit:
+                continue
+            key = (distance, -self._frequency[candidate], candidate)
+            if best is None or key < best:
+                best = key
+        return best[2] if best else None
+
+
+_lock = threading.Lock()
+_indexes = {}
+
+
+def get_index(language):
+    """The trigram index for ``language``, rebuilt when the catalog changed."""
+    if language not in database.LOCALIZED_LANGUAGES:
+        language = "es"
+    version = (database.DATABASE_PATH, database.get_catalog_version()[0])
+    with _lock:
+        cached = _indexes.get(language)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    index = TrigramIndex(database.get_search_vocabulary(language))
+    with _lock:
+        _indexes[language] = (version, index)
+    return index
+
+
+def correct(query, language="es"):
+    """``query`` with its unknown words replaced by the closest known ones.
+
+    Returns None when nothing was changed. Languages searched through the
+    bigram table are not corrected, since their words are whole sentences.
+    """
+    if language in database.BIGRAM_LANGUAGES:
+        return None
+    words = _WORD_RE.findall(database.normalize_text(query))
+    index = None
+    corrected = []
+    for word in words:
+        if len(word) >= MIN_WORD_CHARS and word.isalpha():
+            index = index or get_index(language)
+            if word not in index:
+                word = index.closest(word) or word
+        corrected.append(word)
+    if corrected == words:
+        return None
+    return " ".join(corrected)
+
+
+def search(
+    query,
+    category=None,
+    language="es",
+    page_size=None,
+    after=None,
+    nutrition=None,
+    sort="relevance",
+):
+    """(recipes, corrected query or None), falling back to corrected words.
+
+    Arguments are those of ``database.search_recipes_with_translation``.
+    When the first page of exact results has fewer than FUZZY_MIN_RESULTS
+    recipes and the corrected query finds more, its results are returned
+    with the corrected query; later pages are searched with that query.
+    """
+    recipes = database.search_recipes_with_translation(
+        query, category, language, page_size, after, nutrition, sort
+    )
+    if not query or after or len(recipes) >= FUZZY_MIN_RESULTS:
+        return recipes, None
+    corrected = correct(query, language)
+    if corrected is None:
+        return recipes, None
+    fuzzy = database.search_recipes_with_translation(
+        corrected, category, language, page_size, None, nutrition, sort
+    )
+    if len(fuzzy) <= len(recipes):
+        return recipes, None
+    return fuzzy, corrected
@@ -0,0 +1,51 @@
+"""
+gunicorn configuration for the recipes application.
+
+Every setting can be overridden from the environment, so the same file
+serves the Docker image and a bare-metal install:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Graceful operations:
+
+    kill -HUP <master>     re-read this file and replace workers one by one
+    kill -USR2 <master>    start a new master with new code, then
+    kill -WINCH <old>      let the old workers finish and
+    kill -TERM <old>       stop the old master
+
+With ``preload_app`` the application is imported once in the master, so
+HUP restarts workers with the code that was loaded at startup; deploy new
+code with USR2 (or a container restart). Re-imported recipes need no
+signal at all: workers notice catalog writes on their own.
+"""
+
+import multiprocessing
+import os
+
+bind = "{}:{}".format(
+    os.getenv("FLASK_HOST", "0.0.0.0"), os.getenv("FLASK_PORT", "5014")
+)
+
+# Pages are rendered in Python under the GIL, so processes scale the CPU
+# work while a few threads per worker cover time spent in SQLite and I/O.
+workers = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("WEB_THREADS", 4))
+worker_class = "gthread"
+
+# Import the app and warm the catalog cache once, before forking.
+preload_app = True
+
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Recycle workers now and then so slow leaks cannot accumulate.
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 5000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv("WEB_ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("WEB_LOG_LEVEL", "info")
+
+# nginx in front sets X-Forwarded-*; trust it from the compose network.
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "*")
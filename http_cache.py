@@ -0,0 +1,120 @@
+"""
+Conditional GET support for the catalog pages.
+
+Every cacheable page gets a strong ETag derived from the catalog version
+(bumped by database triggers on every recipe or translation write), the
+active locale, the request path with its query string and a release tag
+covering the code, static assets and templates. A matching If-None-Match or
+If-Modified-Since is answered with 304 in before_request, so unchanged
+pages never touch the database beyond the cached version lookup.
+"""
+
+import glob
+import hashlib
+import os
+from datetime import datetime, timezone
+
+from flask import current_app, g, request, session
+from werkzeug.http import is_resource_modified
+
+from database import get_catalog_version
+
+CACHEABLE_ENDPOINTS = frozenset(
+    {"index", "recipe_detail", "categories", "category_recipes"}
+)
+
+# Anything in here changes the rendered HTML without touching the catalog:
+# every top-level module, scripts/ (pantry.py imports the ingredient
+# matcher from it), static assets, templates and message catalogs.
+_RELEASE_SOURCES = ("*.py", "scripts", "static", "templates", "translations")
+
+
+def _release_files(root):
+    for source in _RELEASE_SOURCES:
+        path = os.path.join(root, source)
+        if os.path.isdir(path):
+            for directory, subdirectories, names in os.walk(path):
+                subdirectories[:] = sorted(
+                    name for name in subdirectories if name != "__pycache__"
+                )
+                for name in sorted(names):
+                    yield os.path.join(directory, name)
+        else:
+            yield from sorted(glob.glob(path))
+
+
+def _release_tag(root):
+    """APP_RELEASE if set, otherwise a hash of the code, assets and templates."""
+    release = os.environ.get("APP_RELEASE")
+    if release:
+        return release
+    digest = hashlib.sha1()
+    for file_path in _release_files(root):
+        digest.update(os.path.relpath(file_path, root).encode())
+        with open(file_path, "rb") as handle:
+            digest.update(handle.read())
+    return digest.hexdigest()[:12]
+
+
+def _last_modified(updated_at):
+    if isinstance(updated_at, datetime):
+        value = updated_at
+    else:
+        value = datetime.strptime(str(updated_at)[:19], "%Y-%m-%d %H:%M:%S")
+    return value.replace(tzinfo=timezone.utc)
+
+
+def _check_not_modified():
+    if request.method not in ("GET", "HEAD"):
+        return None
+    if request.endpoint not in CACHEABLE_ENDPOINTS:
+        return None
+
+    version, updated_at = get_catalog_version()
+    key = "\0".join(
+        (
+            current_app.config["HTTP_CACHE_RELEASE"],
+            str(version),
+            str(current_app.extensions["http_cache"]()),
+            request.full_path,
+        )
+    )
+    g.http_cache = (
+        hashlib.sha1(key.encode("utf-8")).hexdigest(),
+        _last_modified(updated_at),
+    )
+    etag, last_modified = g.http_cache
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return current_app.response_class(status=304)
+
+
+def _set_cache_headers(response):
+    validators = g.pop("http_cache", None)
+    if validators is None or response.status_code not in (200, 304):
+        return response
+
+    etag, last_modified = validators
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # A response that sets the language cookie must not be shared by proxies.
+    scope = "private" if session.modified else "public"
+    max_age = current_app.config["HTTP_CACHE_MAX_AGE"]
+    response.headers["Cache-Control"] = f"{scope}, max-age={max_age}, must-revalidate"
+    response.vary.update(("Accept-Language", "Cookie"))
+    return response
+
+
+def init_app(app, locale_selector):
+    """Register the conditional GET hooks on a Flask app.
+
+    ``locale_selector`` is the same callable Babel uses, so pages are keyed
+    on the language they will actually be rendered in.
+    """
+    app.extensions["http_cache"] = locale_selector
+    app.config.setdefault(
+        "HTTP_CACHE_MAX_AGE", int(os.environ.get("HTTP_CACHE_MAX_AGE", 0))
+    )
+    app.config.setdefault("HTTP_CACHE_RELEASE", _release_tag(app.root_path))
+    app.before_request(_check_not_modified)
+    app.after_request(_set_cache_headers)
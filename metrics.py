@@ -0,0 +1,192 @@
+"""
+Prometheus metrics for the recipes application.
+
+Series live in process memory and are rendered in the Prometheus text
+exposition format by the /metrics route. With several server workers each
+worker reports its own numbers, so scrape them per worker or aggregate.
+"""
+
+import threading
+import time
+
+from flask import g, request, before_render_template, template_rendered
+
+from database import get_catalog_cache_stats, get_pool_stats, get_query_stats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return "{" + pairs + "}"
+
+
+def _header(name, kind, documentation):
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a fixed set of label names."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = _header(self.name, "histogram", self.documentation)
+        with self._lock:
+            series = sorted(self._series.items())
+        for key, data in series:
+            labels = list(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, data["buckets"]):
+                bucket_labels = _format_labels(labels + [("le", repr(bound))])
+                lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            inf_labels = _format_labels(labels + [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{inf_labels} {data['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {data['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {data['count']}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "recetas_request_duration_seconds",
+    "Time spent handling a request, by endpoint.",
+    ("endpoint", "method", "status"),
+)
+TEMPLATE_RENDER = Histogram(
+    "recetas_template_render_seconds",
+    "Time spent rendering a Jinja template.",
+    ("template",),
+)
+
+_collectors = []
+
+
+def collector(func):
+    """Register a function returning extra exposition lines at scrape time."""
+    _collectors.append(func)
+    return func
+
+
+def simple_metric(name, kind, documentation, value, labels=()):
+    """Exposition lines for a single counter or gauge sample."""
+    return _header(name, kind, documentation) + [
+        f"{name}{_format_labels(labels)} {value}"
+    ]
+
+
+@collector
+def _database_metrics():
+    queries = get_query_stats()
+    pool = get_pool_stats()
+    cache = get_catalog_cache_stats()
+    lookups = cache["hits"] + cache["misses"]
+    return (
+        simple_metric(
+            "recetas_db_queries_total",
+            "counter",
+            "SQL statements executed on pooled connections.",
+            queries["count"],
+        )
+        + simple_metric(
+            "recetas_db_query_seconds_total",
+            "counter",
+            "Total time spent executing SQL statements.",
+            queries["seconds"],
+        )
+        + simple_metric(
+            "recetas_db_connections_open",
+            "gauge",
+            "Pooled SQLite connections currently open.",
+            pool["open"],
+        )
+        + simple_metric(
+            "recetas_catalog_cache_hits_total",
+            "counter",
+            "Catalog cache lookups served from memory.",
+            cache["hits"],
+        )
+        + simple_metric(
+            "recetas_catalog_cache_misses_total",
+            "counter",
+            "Catalog cache lookups that went to the database.",
+            cache["misses"],
+        )
+        + simple_metric(
+            "recetas_catalog_cache_hit_ratio",
+            "gauge",
+            "Share of catalog cache lookups served from memory.",
+            cache["hits"] / lookups if lookups else 0.0,
+        )
+    )
+
+
+def render_metrics():
+    """The full exposition document for /metrics."""
+    lines = REQUEST_LATENCY.render() + TEMPLATE_RENDER.render()
+    for func in _collectors:
+        lines.extend(func())
+    return "\n".join(lines) + "\n"
+
+
+def _start_request_timer():
+    g.metrics_request_start = time.perf_counter()
+
+
+def _observe_request(response):
+    start = g.pop("metrics_request_start", None)
+    if start is not None:
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            endpoint=request.endpoint or "unmatched",
+            method=request.method,
+            status=response.status_code,
+        )
+    return response
+
+
+def _start_template_timer(sender, template, context, **extra):
+    g.setdefault("metrics_template_starts", []).append(time.perf_counter())
+
+
+def _observe_template(sender, template, context, **extra):
+    starts = g.get("metrics_template_starts")
+    if starts:
+        TEMPLATE_RENDER.observe(
+            time.perf_counter() - starts.pop(), template=template.name
+        )
+
+
+def init_app(app):
+    """Hook request and template timing into a Flask app."""
+    app.before_request(_start_request_timer)
+    app.after_request(_observe_request)
+    before_render_template.connect(_start_template_timer, app)
+    template_rendered.connect(_observe_template, app)
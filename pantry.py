@@ -0,0 +1,77 @@
+"""
+"Cook with what I have": recipes ranked by how many of the listed
+ingredients they use.
+
+The calories estimator stores the canonical ingredients it matched in each
+recipe as posting lists in recipe_ingredients. A pantry such as "pollo,
+champiñones, nata" is split into terms and each term is resolved with the
+same IngredientIndex, so "Champiñón", "champinones" and "2 pollos" land on
+the names the estimator wrote. The search itself is then a merge of a few
+posting lists instead of one LIKE scan per ingredient.
+
+The resolver only knows ingredients some recipe uses and is rebuilt on the
+next lookup after the catalog version moves.
+"""
+
+import re
+import threading
+
+import database
+from scripts.calories_estimator import IngredientIndex
+
+# More terms than this are ignored; nobody lists a whole larder.
+MAX_INGREDIENTS = 12
+MAX_TERM_CHARS = 64
+
+_SEPARATORS_RE = re.compile(r"[,;\n]+|\s+(?:y|e|and|i)\s+", re.IGNORECASE)
+
+
+def split_ingredients(text):
+    """Non-empty terms of a pantry list, in order, at most MAX_INGREDIENTS."""
+    terms = []
+    for term in _SEPARATORS_RE.split(text or ""):
+        term = " ".join(term.split())[:MAX_TERM_CHARS]
+        if term and term not in terms:
+            terms.append(term)
+    return terms[:MAX_INGREDIENTS]
+
+
+_lock = threading.Lock()
+_index = None
+
+
+def get_index():
+    """IngredientIndex over the ingredients in use, rebuilt on catalog changes."""
+    global _index
+    version = (database.DATABASE_PATH, database.get_catalog_version()[0])
+    with _lock:
+        cached = _index
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    index = IngredientIndex(database.get_pantry_ingredients())
+    with _lock:
+        _index = (version, index)
+    return index
+
+
+def resolve(text):
+    """(canonical names, unknown terms) for a pantry list."""
+    index = get_index()
+    names, unknown = [], []
+    for term in split_ingredients(text):
+        name, _ = index.match(term)
+        if name is None:
+            unknown.append(term)
+        elif name not in names:
+            names.append(name)
+    return names, unknown
+
+
+def search(text, category=None, language="es", limit=database.LISTING_PAGE_SIZE):
+    """(recipes, canonical names, unknown terms) for a pantry list.
+
+    Recipes come from ``database.search_recipes_by_ingredients``.
+    """
+    names, unknown = resolve(text)
+    recipes = database.search_recipes_by_ingredients(names, category, language, limit)
+    return recipes, names, unknown
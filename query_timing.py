@@ -0,0 +1,86 @@
+"""
+Per-request SQL timing for the recipes application.
+
+Every request captures the statements it runs (see
+``database.start_query_capture``) in ``g.sql_queries``. Statements slower
+than ``SQL_SLOW_QUERY_MS`` are logged with their ``EXPLAIN QUERY PLAN``.
+With ``SERVER_TIMING`` enabled the totals go out in a ``Server-Timing``
+header, and with ``SQL_DEBUG_PANEL`` enabled base.html shows every query
+of the page. Both are off by default, since they show any client how the
+database is doing.
+"""
+
+import logging
+import os
+import time
+
+from flask import current_app, g
+
+from database import explain_query_plan, start_query_capture, stop_query_capture
+
+logger = logging.getLogger("recetas.sql")
+
+
+def _env_flag(name, default):
+    return os.environ.get(name, default).lower() in ("1", "true", "yes", "on")
+
+
+def _start_capture():
+    g.sql_request_start = time.perf_counter()
+    g.sql_queries = start_query_capture()
+
+
+def _server_timing(response):
+    queries = g.get("sql_queries")
+    if queries is None or not current_app.config["SERVER_TIMING"]:
+        return response
+    database_ms = sum(query["seconds"] for query in queries) * 1000
+    total_ms = (time.perf_counter() - g.sql_request_start) * 1000
+    response.headers.add(
+        "Server-Timing", f'db;dur={database_ms:.2f};desc="{len(queries)} queries"'
+    )
+    response.headers.add("Server-Timing", f"app;dur={total_ms:.2f}")
+    return response
+
+
+def _log_slow_queries(exception=None):
+    queries = stop_query_capture()
+    threshold = current_app.config["SQL_SLOW_QUERY_MS"] / 1000
+    for query in queries:
+        if query["seconds"] < threshold:
+            continue
+        plan = explain_query_plan(query["sql"], query["parameters"])
+        logger.warning(
+            "slow query %.1f ms, %d rows, parameters %s: %s\n  plan: %s",
+            query["seconds"] * 1000,
+            query["rows"],
+            query["shape"],
+            query["sql"],
+            " | ".join(plan) or "n/a",
+        )
+
+
+def _inject_panel():
+    if not current_app.config["SQL_DEBUG_PANEL"]:
+        return {"sql_panel": None}
+    queries = g.get("sql_queries") or []
+    return {
+        "sql_panel": {
+            "queries": queries,
+            "total_ms": sum(query["seconds"] for query in queries) * 1000,
+            "slow_ms": current_app.config["SQL_SLOW_QUERY_MS"],
+        }
+    }
+
+
+def init_app(app):
+    """Capture SQL per request and report it on a Flask app."""
+    app.config.setdefault(
+        "SQL_SLOW_QUERY_MS", float(os.environ.get("SQL_SLOW_QUERY_MS", 50))
+    )
+    app.config.setdefault("SERVER_TIMING", _env_flag("SERVER_TIMING", "0"))
+    app.config.setdefault("SQL_DEBUG_PANEL", _env_flag("SQL_DEBUG_PANEL", "0"))
+    app.before_request(_start_capture)
+    app.after_request(_server_timing)
+    app.teardown_request(_log_slow_queries)
+    app.context_processor(_inject_panel)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Compare requests/sec of the Werkzeug dev server and gunicorn.
+
+Each server is started on its own port against the same database, warmed
+up, then hit by concurrent keep-alive clients for a fixed time on ``/`` and
+``/recipe/<id>``. Results are printed as a Markdown table.
+
+Usage:
+    python scripts/benchmark_wsgi.py [--seconds 10] [--clients 8] [--recipe-id 1]
+"""
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "dev server (python app.py)": ([sys.executable, "app.py"], 5101),
+    "gunicorn (gunicorn.conf.py)": (
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        5102,
+    ),
+}
+
+
+def _wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def _hammer(port, path, seconds, clients):
+    """Requests per second and error count for ``clients`` busy loops."""
+    counts = [0] * clients
+    errors = [0] * clients
+    stop = time.monotonic() + seconds
+
+    def client(index):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        while time.monotonic() < stop:
+            try:
+                conn.request("GET", path, headers={"Accept-Language": "es"})
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    counts[index] += 1
+                else:
+                    errors[index] += 1
+                if response.will_close:
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.monotonic() - started), sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--recipe-id", type=int, default=1)
+    args = parser.parse_args()
+
+    paths = ["/", f"/recipe/{args.recipe_id}"]
+    environment = dict(os.environ, FLASK_HOST="127.0.0.1", WEB_ACCESS_LOG="")
+    environment.pop("FLASK_ENV", None)
+
+    rows = []
+    for name, (command, port) in SERVERS.items():
+        process = subprocess.Popen(
+            command,
+            cwd=ROOT,
+            env=dict(environment, FLASK_PORT=str(port)),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_until_up(port)
+            results = []
+            for path in paths:
+                _hammer(port, path, 1, args.clients)
+                results.append(_hammer(port, path, args.seconds, args.clients))
+            rows.append((name, results))
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(f"| Server | {' | '.join(f'`{path}` req/s' for path in paths)} |")
+    print(f"|---|{'---|' * len(paths)}")
+    for name, results in rows:
+        cells = " | ".join(
+            f"{rate:.0f}" + (f" ({errors} errors)" if errors else "")
+            for rate, errors in results
+        )
+        print(f"| {name} | {cells} |")
+
+
+if __name__ == "__main__":
+    main()
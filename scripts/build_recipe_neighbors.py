@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Precompute related recipes from ingredient similarity.
+
+Every recipe's ingredient list is parsed with CaloriesEstimator into a bag
+of known ingredients. Bags become IDF-weighted vectors (an ingredient in
+every recipe says little, a rare one a lot), and the top-k most similar
+recipes by cosine, or Jaccard on the plain sets, are stored in
+recipe_neighbors. The detail page reads them with one primary-key scan.
+
+With NumPy installed the similarities are computed as blocked matrix
+products (all pairs of a block of rows at once, so memory stays bounded
+for large catalogs). Without it a sparse pure-Python pass over an
+inverted index gives the same result.
+
+Usage:
+    python scripts/build_recipe_neighbors.py [--k 8] [--metric cosine|jaccard]
+"""
+
+import argparse
+import heapq
+import math
+import os
+import sys
+from collections import defaultdict
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import (  # noqa: E402
+    bump_catalog_version,
+    get_db_connection,
+    init_database,
+    invalidate_catalog_cache,
+)
+from scripts.calories_estimator import CaloriesEstimator  # noqa: E402
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+METRICS = ("cosine", "jaccard")
+BLOCK_ROWS = 1024
+
+
+def ingredient_bags(estimator, recipes):
+    """Map recipe id -> set of matched ingredient names."""
+    bags = {}
+    for recipe_id, ingredients in recipes:
+        parsed = estimator.parse_ingredients(ingredients)
+        bags[recipe_id] = {item["ingredient_name"] for item in parsed}
+    return bags
+
+
+def _idf(bags):
+    counts = defaultdict(int)
+    for bag in bags.values():
+        for name in bag:
+            counts[name] += 1
+    total = len(bags)
+    return {
+        name: math.log((1 + total) / (1 + count)) + 1 for name, count in counts.items()
+    }
+
+
+def _top_k_python(bags, k, metric):
+    ids = [recipe_id for recipe_id, bag in bags.items() if bag]
+    idf = _idf(bags)
+    weight = {}
+    for recipe_id in ids:
+        if metric == "cosine":
+            weight[recipe_id] = {name: idf[name] for name in bags[recipe_id]}
+        else:
+            weight[recipe_id] = {name: 1.0 for name in bags[recipe_id]}
+    norms = {
+        recipe_id: math.sqrt(sum(value * value for value in values.values()))
+        for recipe_id, values in weight.items()
+    }
+    postings = defaultdict(list)
+    for recipe_id in ids:
+        for name, value in weight[recipe_id].items():
+            postings[name].append((recipe_id, value))
+
+    neighbors = {}
+    for recipe_id in ids:
+        dots = defaultdict(float)
+        for name, value in weight[recipe_id].items():
+            for other, other_value in postings[name]:
+                if other != recipe_id:
+                    dots[other] += value * other_value
+        scores = []
+        for other, dot in dots.items():
+            if metric == "cosine":
+                score = dot / (norms[recipe_id] * norms[other])
+            else:
+                score = dot / (len(bags[recipe_id]) + len(bags[other]) - dot)
+            scores.append((score, other))
+        best = heapq.nsmallest(k, scores, key=lambda item: (-item[0], item[1]))
+        neighbors[recipe_id] = [(other, score) for score, other in best]
+    return neighbors
+
+
+def _top_k_numpy(bags, k, metric):
+    ids = [recipe_id for recipe_id, bag in bags.items() if bag]
+    names = sorted({name for recipe_id in ids for name in bags[recipe_id]})
+    column = {name: index for index, name in enumerate(names)}
+    matrix = numpy.zeros((len(ids), len(names)), dtype=numpy.float32)
+    for row, recipe_id in enumerate(ids):
+        matrix[row, [column[name] for name in bags[recipe_id]]] = 1.0
+
+    if metric == "cosine":
+        idf = _idf(bags)
+        matrix *= numpy.array([idf[name] for name in names], dtype=numpy.float32)
+        matrix /= numpy.linalg.norm(matrix, axis=1, keepdims=True)
+    sizes = matrix.sum(axis=1)
+    id_array = numpy.array(ids)
+
+    count = min(k, len(ids) - 1)
+    if count <= 0:
+        return {recipe_id: [] for recipe_id in ids}
+
+    neighbors = {}
+    for start in range(0, len(ids), BLOCK_ROWS):
+        block = matrix[start : start + BLOCK_ROWS]
+        scores = block @ matrix.T
+        if metric == "jaccard":
+            scores /= sizes[start : start + BLOCK_ROWS, None] + sizes[None, :] - scores
+        rows = numpy.arange(len(block))
+        scores[rows, rows + start] = -1.0  # never your own neighbour
+        candidates = numpy.argpartition(-scores, count - 1, axis=1)[:, :count]
+        for row, columns in enumerate(candidates):
+            pairs = [
+                (float(scores[row, col]), int(id_array[col]))
+                for col in columns
+                if scores[row, col] > 0
+            ]
+            pairs.sort(key=lambda item: (-item[0], item[1]))
+            neighbors[ids[start + row]] = [(other, score) for score, other in pairs]
+    return neighbors
+
+
+def top_k_neighbors(bags, k=8, metric="cosine", use_numpy=None):
+    """Map recipe id -> [(neighbour id, score)], best first, scores > 0."""
+    if metric not in METRICS:
+        raise ValueError(f"unknown metric {metric!r}")
+    use_numpy = numpy is not None if use_numpy is None else use_numpy
+    if use_numpy:
+        return _top_k_numpy(bags, k, metric)
+    return _top_k_python(bags, k, metric)
+
+
+def store_neighbors(conn, neighbors):
+    """Replace recipe_neighbors in one transaction."""
+    conn.execute("DELETE FROM recipe_neighbors")
+    conn.executemany(
+        "INSERT INTO recipe_neighbors (recipe_id, rank, neighbor_id, score) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            (recipe_id, rank, other, round(score, 6))
+            for recipe_id, ranked in neighbors.items()
+            for rank, (other, score) in enumerate(ranked, 1)
+        ],
+    )
+    bump_catalog_version(conn)
+    conn.commit()
+
+
+def build_recipe_neighbors(k=8, metric="cosine", estimator=None):
+    """Recompute and store neighbours for every recipe; return the mapping."""
+    init_database()
+    conn = get_db_connection()
+    recipes = conn.execute("SELECT id, ingredients FROM recipes ORDER BY id").fetchall()
+    own_estimator = estimator is None
+    estimator = estimator or CaloriesEstimator()
+    try:
+        bags = ingredient_bags(estimator, recipes)
+    finally:
+        if own_estimator:
+            estimator.close()
+    neighbors = top_k_neighbors(bags, k, metric)
+    store_neighbors(conn, neighbors)
+    conn.close()
+    invalidate_catalog_cache()
+    return neighbors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--metric", choices=METRICS, default="cosine")
+    args = parser.parse_args()
+
+    backend = "NumPy" if numpy is not None else "pure Python"
+    print(f"🔗 Computing {args.k} nearest recipes by {args.metric} ({backend})...")
+    neighbors = build_recipe_neighbors(args.k, args.metric)
+    linked = sum(1 for ranked in neighbors.values() if ranked)
+    print(f"✅ Stored neighbours for {linked} recipes")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,209 @@ This module provides functionality to estimate calories for recipes by parsing
 ingredient lists and matching them with nutritional data.
 """
 
+import argparse
 import re
 import sqlite3
 import os
 import sys
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Add parent directory to path to import database module
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from database import DATABASE_PATH  # noqa: E402
+from database import (  # noqa: E402
+    DATABASE_PATH,
+    NUTRITION_COLUMNS,
+    bump_catalog_version,
+    init_database,
+)
+
+# Columns written by estimate_all_recipes, in the order of nutrition tuples
+NUTRITION_FIELDS = ("estimated_calories",) + tuple(
+    column for column, _ in NUTRITION_COLUMNS
+)
+DEFAULT_SERVINGS = 4
+
+# Spellings that differ from the names in ingredient_calories by more than
+# a plural "s"/"es" or accents (which the index handles by itself).
+SYNONYMS = {
+    "nueces": "nuez",
+    "yogur": "yogurt",
+    "yogures": "yogurt",
+    "champiñón": "champiñones",
+    "maizena": "maicena",
+    "almendras": "almendra",
+}
+
+# Quantities written as words, longest first so "media docena" beats "media"
+NUMBER_WORDS = {
+    "media docena": 6,
+    "una docena": 12,
+    "un par": 2,
+    "un cuarto": 0.25,
+    "docena": 12,
+    "cuarto": 0.25,
+    "media": 0.5,
+    "medio": 0.5,
+    "una": 1,
+    "uno": 1,
+    "un": 1,
+    "dos": 2,
+    "tres": 3,
+    "cuatro": 4,
+    "cinco": 5,
+    "seis": 6,
+}
+
+UNICODE_FRACTIONS = {"½": 0.5, "¼": 0.25, "¾": 0.75, "⅓": 1 / 3, "⅔": 2 / 3}
+
+# A single quantity: "1 1/2", "1 y 1/2", "1½", "3/4", "1,5", "½" or a word
+NUMBER = (
+    r"\d+\s+(?:y\s+)?\d+/[1-9]\d*"
+    rf"|\d*[{''.join(UNICODE_FRACTIONS)}]"
+    r"|\d+/[1-9]\d*"
+    r"|\d+(?:[.,]\d+)?"
+    rf"|(?:{'|'.join(NUMBER_WORDS)})\b"
+)
+
+# Words of multi-word names that never identify an ingredient on their own.
+CONNECTORS = {"a", "al", "con", "de", "del", "el", "en", "la", "las", "los", "y"}
+
+
+def fold(text):
+    """Lowercase and strip accents without changing the length of the text.
+
+    Unlike ``database.normalize_text`` this keeps compatibility characters,
+    so "½" stays a single UNICODE_FRACTIONS character instead of "1⁄2".
+    """
+    decomposed = unicodedata.normalize("NFD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def parse_number(text):
+    """Value of a NUMBER match."""
+    text = " ".join(text.lower().split())
+    if text in NUMBER_WORDS:
+        return NUMBER_WORDS[text]
+    if text[-1] in UNICODE_FRACTIONS:
+        return float(text[:-1] or 0) + UNICODE_FRACTIONS[text[-1]]
+    whole, _, fraction = text.replace(" y ", " ").rpartition(" ")
+    if "/" in fraction:
+        numerator, denominator = fraction.split("/")
+        return float(whole or 0) + int(numerator) / int(denominator)
+    return float(fraction.replace(",", "."))
+
+
+class IngredientIndex:
+    """Aho-Corasick automaton over ingredient names and their variants.
+
+    A line is scanned once, whatever the number of ingredients. Matches
+    must start and end on word boundaries; full names and their variants
+    beat single words of multi-word names, then the longest match wins,
+    and ties go to the ingredient listed first in the table.
+    """
+
+    def __init__(self, ingredients):
+        """Build from (name, calories, protein, carbs, fat) rows per 100 g.
+
+        Rows come in table order; the macronutrients may be left out.
+        """
+        self.calories = {}
+        self.nutrients = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        patterns = {}
+
+        def add(text, name, priority):
+            key = fold(text)
+            if key and patterns.get(key, (2,))[0] > priority:
+                patterns[key] = (priority, name)
+
+        for name, calories, *macros in ingredients:
+            if name not in self.calories:
+                self.calories[name] = calories
+                protein, carbs, fat = (list(macros) + [0, 0, 0])[:3]
+                self.nutrients[name] = (calories, protein or 0, carbs or 0, fat or 0)
+        order = {name: position for position, name in enumerate(self.calories)}
+        for name in self.calories:
+            for variant in self._variants(name):
+                add(variant, name, 0)
+        for synonym, name in SYNONYMS.items():
+            if name in self.calories:
+                add(synonym, name, 0)
+        for name in self.calories:
+            words = name.split()
+            if len(words) > 1:
+                for word in words:
+                    if word not in CONNECTORS:
+                        add(word, name, 1)
+
+        for key, (priority, name) in patterns.items():
+            self._add(key, (len(key), (priority, -len(key), order[name]), name))
+        self._link()
+
+    @staticmethod
+    def _variants(name):
+        yield name
+        yield name + "s"
+        yield name + "es"
+        if name.endswith("s"):
+            yield name[:-1]
+        if name.endswith("es"):
+            yield name[:-2]
+
+    def _add(self, key, payload):
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(payload)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def match(self, text):
+        """Return the best (name, calories_per_100g) in text, or (None, None)."""
+        folded = fold(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        best = None
+        state = 0
+        for end, ch in enumerate(folded, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state] or (end < len(folded) and folded[end].isalnum()):
+                continue
+            for length, key, name in out[state]:
+                start = end - length
+                if start and folded[start - 1].isalnum():
+                    continue
+                if best is None or key < best[0]:
+                    best = (key, name)
+        if best is None:
+            return None, None
+        return best[1], self.calories[best[1]]
+
+
+CHUNK_SIZE = 2000
 
 
 class CaloriesEstimator:
@@ -22,42 +217,42 @@ class CaloriesEstimator:
     def __init__(self):
         self.conn = sqlite3.connect(DATABASE_PATH)
         self.conn.row_factory = sqlite3.Row
-
-        # Common Spanish quantity patterns
-        self.quantity_patterns = [
-            r"(\d+(?:\.\d+)?)\s*k?g",  # kg, g
-            r"(\d+(?:\.\d+)?)\s*gramos?",  # gramos
-            r"(\d+(?:\.\d+)?)\s*g\b",  # g
-            r"(\d+(?:\.\d+)?)\s*litros?",  # litros
-            r"(\d+(?:\.\d+)?)\s*l\b",  # l
-            r"(\d+(?:\.\d+)?)\s*ml",  # ml
-            r"(\d+(?:\.\d+)?)\s*cucharadas?",  # cucharadas
-            r"(\d+(?:\.\d+)?)\s*cucharaditas?",  # cucharaditas
-            r"(\d+(?:\.\d+)?)\s*tazas?",  # tazas
-            r"(\d+(?:\.\d+)?)\s*unidades?",  # unidades
-            r"(\d+(?:\.\d+)?)\s*piezas?",  # piezas
-            r"(\d+(?:\.\d+)?)\s*lonchas?",  # lonchas
-            r"(\d+(?:\.\d+)?)\s*rebanadas?",  # rebanadas
-            r"(\d+(?:\.\d+)?)\s*dientes?",  # dientes de ajo
-            r"(\d+(?:\.\d+)?)\s*",  # just number
-        ]
+        self._index = None
+        self.timings = {}
 
         # Unit conversion to grams
         self.unit_conversions = {
             "kg": 1000,
+            "kgr": 1000,
+            "kilo": 1000,
+            "kilos": 1000,
+            "kilogramos": 1000,
+            "kilogramo": 1000,
             "g": 1,
+            "gr": 1,
             "gramos": 1,
             "gramo": 1,
             "litros": 1000,  # assuming 1L = 1000g for liquids
             "litro": 1000,
             "l": 1000,
+            "dl": 100,
+            "decilitros": 100,
+            "decilitro": 100,
+            "cl": 10,
+            "centilitros": 10,
+            "centilitro": 10,
             "ml": 1,  # 1ml ≈ 1g for most liquids
+            "mililitros": 1,
+            "mililitro": 1,
+            "cc": 1,  # cubic centimetres
             "cucharadas": 15,  # 1 tablespoon ≈ 15g
             "cucharada": 15,
             "cucharaditas": 5,  # 1 teaspoon ≈ 5g
             "cucharadita": 5,
             "tazas": 200,  # 1 cup ≈ 200g
             "taza": 200,
+            "vasos": 200,  # a glass holds about a cup
+            "vaso": 200,
             "unidades": 100,  # average unit weight
             "unidad": 100,
             "piezas": 100,
@@ -68,8 +263,21 @@ class CaloriesEstimator:
             "rebanada": 30,
             "dientes": 3,  # garlic clove
             "diente": 3,
+            "latas": 250,  # between a tin of tuna and one of tomatoes
+            "lata": 250,
+            "botes": 400,  # jar of chickpeas or tomato
+            "bote": 400,
         }
 
+        # One pass finds the first quantity of a line and the unit after it
+        units = sorted(self.unit_conversions, key=len, reverse=True)
+        self.quantity_pattern = re.compile(
+            rf"(?<!\w)(?P<first>{NUMBER})"
+            rf"(?:(?:\s*[-–]\s*|\s+(?:a|o|ó)\s+)(?P<second>{NUMBER}))?"
+            rf"(?:\s*(?:de\s+)?(?P<unit>{'|'.join(map(re.escape, units))})\b)?",
+            re.IGNORECASE,
+        )
+
     def get_ingredient_calories(self, ingredient_name):
         """Get calories per 100g for an ingredient."""
         cursor = self.conn.cursor()
@@ -80,49 +288,47 @@ class CaloriesEstimator:
         result = cursor.fetchone()
         return result[0] if result else None
 
-    def find_matching_ingredient(self, ingredient_text):
-        """Find matching ingredient in database using fuzzy matching."""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT ingredient_name, calories_per_100g FROM ingredient_calories"
-        )
-        ingredients = cursor.fetchall()
+    @property
+    def ingredient_index(self):
+        """IngredientIndex over ingredient_calories, read once and kept."""
+        if self._index is None:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT ingredient_name, calories_per_100g, protein_per_100g, "
+                "carbs_per_100g, fat_per_100g FROM ingredient_calories ORDER BY id"
+            )
+            self._index = IngredientIndex(cursor.fetchall())
+        return self._index
+
+    def reload_ingredients(self):
+        """Drop the index so the next match re-reads ingredient_calories."""
+        self._index = None
 
-        ingredient_lower = ingredient_text.lower()
-
-        # Try exact match first
-        for ingredient in ingredients:
-            if ingredient[0] in ingredient_lower:
-                return ingredient[0], ingredient[1]
-
-        # Try partial matching
-        for ingredient in ingredients:
-            if any(word in ingredient_lower for word in ingredient[0].split()):
-                return ingredient[0], ingredient[1]
-
-        return None, None
+    def find_matching_ingredient(self, ingredient_text):
+        """Find the ingredient named in a line, preferring the longest match."""
+        return self.ingredient_index.match(ingredient_text)
 
     def extract_quantity_and_unit(self, ingredient_line):
-        """Extract quantity and unit from ingredient line."""
-        for pattern in self.quantity_patterns:
-            match = re.search(pattern, ingredient_line, re.IGNORECASE)
-            if match:
-                quantity = float(match.group(1))
-
-                # Extract unit
-                unit_match = re.search(
-                    r"\d+(?:\.\d+)?\s*(\w+)", ingredient_line, re.IGNORECASE
-                )
-                unit = unit_match.group(1).lower() if unit_match else ""
+        """Extract quantity and unit from ingredient line.
 
-                return quantity, unit
+        Ranges ("2-3", "2 o 3") give their midpoint. The unit is a key of
+        unit_conversions, or "" when the quantity counts whole items.
+        """
+        match = self.quantity_pattern.search(ingredient_line)
+        if not match:
+            return None, None
 
-        return None, None
+        quantity = parse_number(match.group("first"))
+        if match.group("second"):
+            quantity = (quantity + parse_number(match.group("second"))) / 2
+        return quantity, (match.group("unit") or "").lower()
 
     def convert_to_grams(self, quantity, unit):
         """Convert quantity and unit to grams."""
-        if not quantity or not unit:
+        if not quantity:
             return 100  # Default assumption
+        if not unit:
+            return quantity * self.unit_conversions["unidad"]
 
         conversion_factor = self.unit_conversions.get(unit.lower(), 1)
         return quantity * conversion_factor
@@ -153,7 +359,10 @@ class CaloriesEstimator:
             ingredient_name, calories_per_100g = self.find_matching_ingredient(line)
 
             if ingredient_name and calories_per_100g:
-                calories = (grams / 100) * calories_per_100g
+                _, protein, carbs, fat = self.ingredient_index.nutrients[
+                    ingredient_name
+                ]
+                share = grams / 100
                 parsed_ingredients.append(
                     {
                         "original_text": line,
@@ -162,29 +371,49 @@ class CaloriesEstimator:
                         "unit": unit,
                         "grams": grams,
                         "calories_per_100g": calories_per_100g,
-                        "total_calories": calories,
+                        "total_calories": share * calories_per_100g,
+                        "protein": share * protein,
+                        "carbs": share * carbs,
+                        "fat": share * fat,
                     }
                 )
 
         return parsed_ingredients
 
     def estimate_recipe_calories(self, recipe_id):
-        """Estimate total calories for a recipe."""
+        """Estimate total calories and macronutrients for a recipe."""
         cursor = self.conn.cursor()
-        cursor.execute("SELECT ingredients FROM recipes WHERE id = ?", (recipe_id,))
+        cursor.execute(
+            "SELECT ingredients, servings FROM recipes WHERE id = ?", (recipe_id,)
+        )
         result = cursor.fetchone()
 
         if not result:
             return None
 
-        ingredients_text = result[0]
+        return self._estimate(recipe_id, result[0], result[1])
+
+    def _estimate(self, recipe_id, ingredients_text, servings=None):
         parsed_ingredients = self.parse_ingredients(ingredients_text)
 
-        total_calories = sum(ing["total_calories"] for ing in parsed_ingredients)
+        # Calories, protein, carbs and fat summed together in one pass
+        totals = [0.0, 0.0, 0.0, 0.0]
+        for ing in parsed_ingredients:
+            for i, key in enumerate(("total_calories", "protein", "carbs", "fat")):
+                totals[i] += ing[key]
+        servings = servings or DEFAULT_SERVINGS
+        per_serving = [value / servings for value in totals]
+        nutrition = (
+            int(totals[0]),
+            *(round(value, 1) for value in totals[1:]),
+            round(per_serving[0]),
+            *(round(value, 1) for value in per_serving[1:]),
+        )
 
         return {
             "recipe_id": recipe_id,
-            "total_calories": int(total_calories),
+            "total_calories": nutrition[0],
+            "nutrition": dict(zip(NUTRITION_FIELDS, nutrition)),
             "ingredients": parsed_ingredients,
             "matched_ingredients": len(
                 [ing for ing in parsed_ingredients if ing["ingredient_name"]]
@@ -201,45 +430,188 @@ class CaloriesEstimator:
         )
         self.conn.commit()
 
-    def estimate_all_recipes(self):
-        """Estimate calories for all recipes in the database."""
+    def estimate_all_recipes(self, workers=1, chunk_size=CHUNK_SIZE, progress=None):
+        """Estimate calories and macronutrients for all recipes in the database.
+
+        Recipes are read with one query and parsed in chunks, in a pool of
+        ``workers`` processes when there is more than one chunk (None means
+        one per CPU). Changed estimates are written with one executemany in
+        one transaction, together with the recipe_ingredients posting lists
+        of recipes whose set of matched ingredients changed.
+        ``progress(done, total)`` is called after every chunk and the phase
+        durations are left in ``self.timings``.
+        """
+        started = time.perf_counter()
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id, title FROM recipes")
+        cursor.execute(
+            "SELECT id, title, ingredients, servings, {} FROM recipes".format(
+                ", ".join(NUTRITION_FIELDS)
+            )
+        )
         recipes = cursor.fetchall()
+        ingredients = [
+            (name, *values) for name, values in self.ingredient_index.nutrients.items()
+        ]
+        read = time.perf_counter()
+
+        chunks = [
+            [
+                (recipe[0], recipe[2], recipe[3])
+                for recipe in recipes[i : i + chunk_size]
+            ]
+            for i in range(0, len(recipes), chunk_size)
+        ]
+        estimates = {}
+        pool = None
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(chunks) <= 1:
+            batches = map(self._estimate_chunk, chunks)
+        else:
+            pool = ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(ingredients,)
+            )
+            batches = pool.map(_estimate_chunk, chunks)
+        try:
+            for batch in batches:
+                estimates.update((row[0], row[1:]) for row in batch)
+                if progress:
+                    progress(len(estimates), len(recipes))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        parsed = time.perf_counter()
+
+        changed = [
+            (*estimates[recipe[0]][0], recipe[0])
+            for recipe in recipes
+            if estimates[recipe[0]][0] != tuple(recipe[4:])
+        ]
+        postings = {}
+        for name, recipe_id in cursor.execute(
+            "SELECT ingredient_name, recipe_id FROM recipe_ingredients"
+        ):
+            postings.setdefault(recipe_id, set()).add(name)
+        reindexed = [
+            recipe_id
+            for recipe_id, estimate in estimates.items()
+            if set(estimate[3]) != postings.pop(recipe_id, set())
+        ]
+        # Whatever is left belongs to recipes that no longer exist
+        stale = reindexed + list(postings)
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE recipes SET {} WHERE id = ?".format(
+                    ", ".join(f"{field} = ?" for field in NUTRITION_FIELDS)
+                ),
+                changed,
+            )
+            self.conn.executemany(
+                "DELETE FROM recipe_ingredients WHERE recipe_id = ?",
+                [(recipe_id,) for recipe_id in stale],
+            )
+            self.conn.executemany(
+                "INSERT INTO recipe_ingredients "
+                "(ingredient_name, recipe_id, ingredient_count) VALUES (?, ?, ?)",
+                [
+                    (name, recipe_id, len(estimates[recipe_id][3]))
+                    for recipe_id in reindexed
+                    for name in estimates[recipe_id][3]
+                ],
+            )
+            if stale:
+                bump_catalog_version(self.conn)
+        written = time.perf_counter()
+
+        self.timings = {
+            "read": read - started,
+            "parse": parsed - read,
+            "write": written - parsed,
+            "recipes": len(recipes),
+            "updated": len(changed),
+            "reindexed": len(stale),
+        }
+        return [
+            {
+                "recipe_id": recipe[0],
+                "title": recipe[1],
+                "estimated_calories": estimates[recipe[0]][0][0],
+                "nutrition": dict(zip(NUTRITION_FIELDS, estimates[recipe[0]][0])),
+                "matched_ingredients": estimates[recipe[0]][1],
+                "total_ingredients": estimates[recipe[0]][2],
+            }
+            for recipe in recipes
+        ]
 
-        results = []
-
-        for recipe in recipes:
-            recipe_id, title = recipe
-            estimation = self.estimate_recipe_calories(recipe_id)
-
-            if estimation:
-                self.update_recipe_calories(recipe_id, estimation["total_calories"])
-                results.append(
-                    {
-                        "recipe_id": recipe_id,
-                        "title": title,
-                        "estimated_calories": estimation["total_calories"],
-                        "matched_ingredients": estimation["matched_ingredients"],
-                        "total_ingredients": estimation["total_ingredients"],
-                    }
+    def _estimate_chunk(self, chunk):
+        """(id, nutrition, matched, total, names) for (id, ingredients, servings).
+
+        ``names`` are the distinct canonical ingredients matched, sorted.
+        """
+        rows = []
+        for recipe_id, ingredients_text, servings in chunk:
+            estimation = self._estimate(recipe_id, ingredients_text, servings)
+            names = {ing["ingredient_name"] for ing in estimation["ingredients"]}
+            rows.append(
+                (
+                    recipe_id,
+                    tuple(estimation["nutrition"].values()),
+                    estimation["matched_ingredients"],
+                    estimation["total_ingredients"],
+                    tuple(sorted(names)),
                 )
-
-        return results
+            )
+        return rows
 
     def close(self):
         """Close database connection."""
         self.conn.close()
 
 
+# Process pool workers keep one estimator, built from the parent's
+# ingredient rows so that only the parent reads ingredient_calories.
+_worker_estimator = None
+
+
+def _init_worker(ingredients):
+    global _worker_estimator
+    _worker_estimator = CaloriesEstimator()
+    _worker_estimator._index = IngredientIndex(ingredients)
+
+
+def _estimate_chunk(chunk):
+    return _worker_estimator._estimate_chunk(chunk)
+
+
 def main():
     """Main function to estimate calories for all recipes."""
+    parser = argparse.ArgumentParser(description="Estimate calories for all recipes")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="parser processes, default one per CPU",
+    )
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    init_database()
     estimator = CaloriesEstimator()
 
-    print("🔥 Estimating calories for all recipes...")
-    results = estimator.estimate_all_recipes()
+    def progress(done, total):
+        print(f"\r   {done:,}/{total:,} recipes parsed", end="", flush=True)
 
-    print(f"\n✅ Processed {len(results)} recipes")
+    print("🔥 Estimating calories for all recipes...")
+    results = estimator.estimate_all_recipes(args.workers, args.chunk_size, progress)
+    timings = estimator.timings
+
+    print(
+        f"\n✅ Processed {len(results)} recipes ({timings['updated']} changed, "
+        f"{timings['reindexed']} re-indexed)"
+    )
+    print(
+        f"   read {timings['read']:.2f}s, parse {timings['parse']:.2f}s, "
+        f"write {timings['write']:.2f}s"
+    )
     print("\n📊 Sample results:")
 
     for result in results[:10]:  # Show first 10 results
@@ -11,7 +11,7 @@ from pathlib import Path
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db_connection, init_database
+from database import get_db_connection, init_database, refresh_normalized_columns
 
 
 def create_basic_translations():
@@ -67,6 +67,7 @@ def create_basic_translations():
                 ),
             )
 
+    refresh_normalized_columns(conn)
     conn.commit()
     conn.close()
 
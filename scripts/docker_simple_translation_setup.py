@@ -10,7 +10,11 @@ import sys
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db_connection, init_database  # noqa: E402
+from database import (  # noqa: E402
+    get_db_connection,
+    init_database,
+    refresh_normalized_columns,
+)
 
 
 def import_translations_from_backup():
@@ -49,6 +53,8 @@ def import_translations_from_backup():
                 ),
             )
 
+        # The backup has no search shadows; store them with the rows
+        refresh_normalized_columns(conn)
         conn.commit()
         conn.close()
 
@@ -10,7 +10,7 @@ import os
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db_connection
+from database import get_db_connection, refresh_normalized_columns
 
 
 def enhance_spanish_description(
@@ -784,6 +784,7 @@ def enhance_all_descriptions():
             conn.commit()
             print(f"Progress: {translation_count} translations saved")
 
+    refresh_normalized_columns(conn)
     conn.commit()
     conn.close()
 
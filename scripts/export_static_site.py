@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Pre-render the whole cookbook into a static directory.
+
+Every page the app serves without a query string (home, categories, each
+category and each recipe) is rendered once per language in
+app.config["LANGUAGES"] and written to ``<output>/<language>/<path>/index.html``
+together with ``.gz`` and, when the ``brotli`` package is installed, ``.br``
+siblings. The ``static/`` assets are copied to ``<output>/static`` the same way.
+
+Runs are incremental: a manifest keeps a content hash per recipe and
+language, so only recipes whose merged row, related recipes or the
+templates changed are re-rendered, listing pages are rewritten only when
+their bytes differ and pages of deleted recipes are removed.
+
+nginx can then serve the export directly and fall back to Flask for
+searches, later pages and visitors who picked a language explicitly:
+
+    map $http_accept_language $static_lang {
+        default es;
+        ~^ca ca;
+        ~^en en;
+        ~^zh zh;
+        ~^eu eu;
+    }
+
+    location / {
+        root /srv/recetas-static;
+        gzip_static on;
+        if ($args) { proxy_pass http://flask_app; }
+        if ($cookie_session) { proxy_pass http://flask_app; }
+        try_files /$static_lang$uri/index.html @flask;
+    }
+
+Usage:
+    python scripts/export_static_site.py [output_dir] [--full]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app  # noqa: E402
+from database import (  # noqa: E402
+    get_all_recipes_with_translation,
+    get_categories,
+    get_recipes_with_translation,
+    get_related_recipes,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_OUTPUT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static_site"
+)
+MANIFEST_NAME = ".export-manifest.json"
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".svg", ".txt")
+
+
+def recipe_hash(recipe, related, release):
+    """Content hash of a recipe page's data plus the template release."""
+    payload = json.dumps(
+        [recipe, related], sort_keys=True, default=str, ensure_ascii=False
+    )
+    return hashlib.sha256(f"{release}\0{payload}".encode("utf-8")).hexdigest()
+
+
+def _write_if_changed(path, data):
+    """Write ``data`` and its compressed siblings; return True if it changed."""
+    try:
+        with open(path, "rb") as handle:
+            if handle.read() == data:
+                return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    variants = [(path, data)]
+    if path.endswith(COMPRESSIBLE):
+        # mtime=0 keeps the .gz byte-identical across runs
+        variants.append((path + ".gz", gzip.compress(data, 9, mtime=0)))
+        if brotli is not None:
+            variants.append((path + ".br", brotli.compress(data)))
+    for target, content in variants:
+        temporary = target + ".tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(content)
+        os.replace(temporary, target)
+    return True
+
+
+def _remove(path):
+    for target in (path, path + ".gz", path + ".br"):
+        if os.path.exists(target):
+            os.remove(target)
+    try:
+        os.removedirs(os.path.dirname(path))
+    except OSError:
+        pass  # directory still has other pages
+
+
+def _page_file(language, url_path):
+    return os.path.join(language, url_path.strip("/"), "index.html")
+
+
+def _safe_segment(name):
+    return bool(name) and "/" not in name and name not in (".", "..")
+
+
+def _render(client, url_path, language):
+    response = client.get(url_path, headers={"Accept-Language": language})
+    if response.status_code != 200:
+        raise RuntimeError(f"{url_path} [{language}] returned {response.status_code}")
+    return response.get_data()
+
+
+def export_site(output_dir=DEFAULT_OUTPUT, full=False):
+    """Render every page in every language; return a summary dict."""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    release = app.config["HTTP_CACHE_RELEASE"]
+    previous_files = set(manifest.get("files", []))
+    previous_recipes = {}
+    if not full and manifest.get("release") == release:
+        previous_recipes = manifest.get("recipes", {})
+
+    files = set()
+    recipes = {}
+    summary = {"rendered": 0, "written": 0, "skipped": 0, "removed": 0}
+    client = app.test_client()
+
+    for language in app.config["LANGUAGES"]:
+        catalog = get_all_recipes_with_translation(language)
+        categories = set(get_categories())
+        categories.update(recipe["category"] for recipe in catalog)
+
+        pages = ["/", "/categories"] + [
+            f"/category/{name}" for name in sorted(filter(_safe_segment, categories))
+        ]
+        for url_path in pages:
+            relative = _page_file(language, url_path)
+            files.add(relative)
+            summary["rendered"] += 1
+            path = os.path.join(output_dir, relative)
+            if _write_if_changed(path, _render(client, url_path, language)):
+                summary["written"] += 1
+
+        ids = [listed["id"] for listed in catalog]
+        for recipe in get_recipes_with_translation(ids, language):
+            url_path = f"/recipe/{recipe['id']}"
+            relative = _page_file(language, url_path)
+            path = os.path.join(output_dir, relative)
+            key = f"{language}:{recipe['id']}"
+            files.add(relative)
+            related = get_related_recipes(recipe, language)
+            recipes[key] = recipe_hash(recipe, related, release)
+            if previous_recipes.get(key) == recipes[key] and os.path.exists(path):
+                summary["skipped"] += 1
+                continue
+            summary["rendered"] += 1
+            if _write_if_changed(path, _render(client, url_path, language)):
+                summary["written"] += 1
+
+    static_root = os.path.join(app.root_path, "static")
+    for directory, _, names in os.walk(static_root):
+        for name in names:
+            source = os.path.join(directory, name)
+            relative = os.path.join("static", os.path.relpath(source, static_root))
+            files.add(relative)
+            path = os.path.join(output_dir, relative)
+            with open(source, "rb") as handle:
+                if _write_if_changed(path, handle.read()):
+                    summary["written"] += 1
+
+    for relative in previous_files - files:
+        _remove(os.path.join(output_dir, relative))
+        summary["removed"] += 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as handle:
+        json.dump(
+            {"release": release, "recipes": recipes, "files": sorted(files)},
+            handle,
+            indent=1,
+            sort_keys=True,
+        )
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("output_dir", nargs="?", default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "--full", action="store_true", help="ignore the manifest and re-render all"
+    )
+    args = parser.parse_args()
+
+    print(f"📦 Exporting static site to {args.output_dir}...")
+    summary = export_site(args.output_dir, full=args.full)
+    print(
+        f"✅ {summary['rendered']} pages rendered, {summary['written']} files "
+        f"written, {summary['skipped']} recipes unchanged, "
+        f"{summary['removed']} removed"
+    )
+    if brotli is None:
+        print("ℹ️  brotli is not installed; only .gz siblings were written")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,12 @@ import json
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import get_db_connection, init_database  # noqa: E402
+from database import (  # noqa: E402
+    get_db_connection,
+    init_database,
+    invalidate_catalog_cache,
+    normalized_values,
+)
 
 
 def import_translations_from_individual_files():
@@ -44,20 +49,25 @@ def import_translations_from_individual_files():
 
             # Importar traducciones para este idioma
             for recipe_id, translation_data in translations.items():
+                title = translation_data.get("title", "")
+                description = translation_data.get("description", "")
+                ingredients = translation_data.get("ingredients", "")
                 cursor.execute(
                     """
                     INSERT OR REPLACE INTO recipe_translations
-                    (recipe_id, language, title, description, ingredients, instructions, category)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    (recipe_id, language, title, description, ingredients, instructions, category,
+                     title_normalized, description_normalized, ingredients_normalized)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """,
                     (
                         int(recipe_id),
                         lang_code,
-                        translation_data.get("title", ""),
-                        translation_data.get("description", ""),
-                        translation_data.get("ingredients", ""),
+                        title,
+                        description,
+                        ingredients,
                         translation_data.get("instructions", ""),
                         translation_data.get("category", ""),
+                        *normalized_values(title, description, ingredients),
                     ),
                 )
 
@@ -73,6 +83,7 @@ def import_translations_from_individual_files():
             continue
 
     conn.close()
+    invalidate_catalog_cache()
     print(f"✅ Total importadas: {total_imported} traducciones")
 
     return total_imported
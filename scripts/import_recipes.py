@@ -5,7 +5,12 @@ import sys
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import init_database, get_db_connection
+from database import (
+    init_database,
+    get_db_connection,
+    invalidate_catalog_cache,
+    normalized_values,
+)
 
 
 def parse_markdown_recipe(file_path):
@@ -131,8 +136,11 @@ def import_all_recipes():
                         ingredients,
                         instructions,
                         category,
-                        filename)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                        filename,
+                        title_normalized,
+                        description_normalized,
+                        ingredients_normalized)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                     (
                         recipe_data["title"],
@@ -141,6 +149,11 @@ def import_all_recipes():
                         recipe_data["instructions"],
                         recipe_data["category"],
                         recipe_data["filename"],
+                        *normalized_values(
+                            recipe_data["title"],
+                            recipe_data["description"],
+                            recipe_data["ingredients"],
+                        ),
                     ),
                 )
 
@@ -152,6 +165,7 @@ def import_all_recipes():
 
     conn.commit()
     conn.close()
+    invalidate_catalog_cache()
 
     print(f"\nImported {imported_count} recipes successfully!")
 
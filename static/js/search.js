@@ -4,14 +4,12 @@ document.addEventListener('DOMContentLoaded', function() {
     const searchInput = document.getElementById('searchInput');
     const searchForm = document.querySelector('form');
     
-    // Add some interactivity to the search
+    // Suggestions as you type, from /api/suggest
     if (searchInput) {
-        searchInput.addEventListener('input', function() {
-            // You could add live search suggestions here
-            if (this.value.length > 2) {
-                // Future: implement autocomplete
-            }
-        });
+        const suggestions = document.getElementById('searchSuggestions');
+        if (suggestions && searchInput.dataset.suggestUrl) {
+            setupAutocomplete(searchInput, suggestions);
+        }
         
         // Focus on search input when page loads
         searchInput.focus();
@@ -59,6 +57,136 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+// Autocomplete: keystrokes are debounced and an in-flight request is
+// aborted as soon as a newer one starts, so only the latest prefix renders.
+const SUGGEST_DELAY_MS = 150;
+const SUGGEST_MIN_CHARS = 2;
+
+function setupAutocomplete(input, list) {
+    let timer = null;
+    let controller = null;
+    let active = -1;
+    let current = [];
+    const kindLabels = {
+        recipe: list.dataset.kindRecipe,
+        category: list.dataset.kindCategory,
+        ingredient: list.dataset.kindIngredient
+    };
+
+    function hide() {
+        list.classList.add('d-none');
+        list.replaceChildren();
+        input.setAttribute('aria-expanded', 'false');
+        active = -1;
+    }
+
+    function choose(item) {
+        if (item.kind === 'recipe') {
+            window.location.href = '/recipe/' + item.id;
+        } else if (item.kind === 'category') {
+            window.location.href = '/category/' + encodeURIComponent(item.label);
+        } else {
+            input.value = item.label;
+            hide();
+            input.form.requestSubmit();
+        }
+    }
+
+    function highlight(index) {
+        const options = list.querySelectorAll('[role="option"]');
+        options.forEach((option, i) => {
+            option.classList.toggle('active', i === index);
+            option.setAttribute('aria-selected', i === index ? 'true' : 'false');
+        });
+        active = index;
+    }
+
+    function render(items) {
+        if (!items.length) {
+            hide();
+            return;
+        }
+        list.replaceChildren(...items.map(item => {
+            const option = document.createElement('button');
+            option.type = 'button';
+            option.className = 'list-group-item list-group-item-action';
+            option.setAttribute('role', 'option');
+            option.textContent = item.label;
+            const kind = document.createElement('span');
+            kind.className = 'suggestion-kind';
+            kind.textContent = kindLabels[item.kind] || '';
+            option.appendChild(kind);
+            // mousedown fires before the input loses focus
+            option.addEventListener('mousedown', e => {
+                e.preventDefault();
+                choose(item);
+            });
+            return option;
+        }));
+        list.classList.remove('d-none');
+        input.setAttribute('aria-expanded', 'true');
+        active = -1;
+        current = items;
+    }
+
+    function fetchSuggestions(query) {
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+        const params = new URLSearchParams({
+            q: query,
+            lang: document.documentElement.lang || 'es'
+        });
+        fetch(input.dataset.suggestUrl + '?' + params, { signal: controller.signal })
+            .then(response => response.ok ? response.json() : { suggestions: [] })
+            .then(data => {
+                if (input.value.trim() === query) {
+                    render(data.suggestions);
+                }
+            })
+            .catch(error => {
+                if (error.name !== 'AbortError') {
+                    hide();
+                }
+            });
+    }
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        const query = this.value.trim();
+        if (query.length < SUGGEST_MIN_CHARS) {
+            if (controller) {
+                controller.abort();
+            }
+            hide();
+            return;
+        }
+        timer = setTimeout(() => fetchSuggestions(query), SUGGEST_DELAY_MS);
+    });
+
+    input.addEventListener('keydown', function(e) {
+        const count = list.querySelectorAll('[role="option"]').length;
+        if (!count) {
+            return;
+        }
+        if (e.key === 'ArrowDown') {
+            e.preventDefault();
+            highlight((active + 1) % count);
+        } else if (e.key === 'ArrowUp') {
+            e.preventDefault();
+            highlight((active - 1 + count) % count);
+        } else if (e.key === 'Enter' && active >= 0) {
+            e.preventDefault();
+            choose(current[active]);
+        } else if (e.key === 'Escape') {
+            hide();
+        }
+    });
+
+    input.addEventListener('blur', hide);
+}
+
 // Utility functions
 function highlightSearchTerm(text, term) {
     if (!term) return text;
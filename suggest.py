@@ -0,0 +1,107 @@
+"""
+Search-as-you-type suggestions from an in-memory prefix index.
+
+Recipe titles, categories and ingredient names of each language are folded
+with ``database.normalize_text`` (casefolded, accents removed) into two
+sorted key arrays: one with each whole term and one with every later word
+of it, so "pat" finds "Patatas bravas" first and "Tortilla de patatas"
+after. A lookup is two bisects and a short
+walk, with no database access, so /api/suggest can serve every keystroke.
+
+Indexes are built per language when the app starts and rebuilt on the next
+lookup after the catalog version moves.
+"""
+
+import threading
+from bisect import bisect_left
+
+import database
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+# Longer prefixes than this never match a title better; ignore the rest.
+MAX_QUERY_CHARS = 64
+
+
+def fold(text):
+    """``text`` folded as the search shadows are, with spaces collapsed."""
+    return " ".join(database.normalize_text(text).split())
+
+
+class PrefixIndex:
+    """Sorted folded keys of (kind, label, recipe_id) terms."""
+
+    def __init__(self, terms):
+        whole, words = [], []
+        for term in dict.fromkeys(terms):
+            key = fold(term[1])
+            whole.append((key, term))
+            start = key.find(" ")
+            while start != -1:
+                words.append((key[start + 1 :], term))
+                start = key.find(" ", start + 1)
+        whole.sort()
+        words.sort()
+        self._whole = whole
+        self._words = words
+        self.size = len(whole)
+
+    @staticmethod
+    def _walk(entries, prefix):
+        position = bisect_left(entries, (prefix,))
+        while position < len(entries) and entries[position][0].startswith(prefix):
+            yield entries[position][1]
+            position += 1
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Up to ``limit`` terms whose text, or a later word, starts with ``query``.
+
+        Whole-term matches come first, then word matches, each alphabetical;
+        a term is returned once.
+        """
+        prefix = fold(query[:MAX_QUERY_CHARS])
+        if not prefix or limit < 1:
+            return []
+        found = {}
+        for entries in (self._whole, self._words):
+            for term in self._walk(entries, prefix):
+                found.setdefault(term, None)
+                if len(found) >= limit:
+                    return list(found)
+        return list(found)
+
+
+_lock = threading.Lock()
+_indexes = {}
+
+
+def get_index(language):
+    """The prefix index for ``language``, rebuilt when the catalog changed."""
+    if language not in database.LOCALIZED_LANGUAGES:
+        language = "es"
+    version = (database.DATABASE_PATH, database.get_catalog_version()[0])
+    with _lock:
+        cached = _indexes.get(language)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    index = PrefixIndex(database.get_suggestion_terms(language))
+    with _lock:
+        _indexes[language] = (version, index)
+    return index
+
+
+def suggest(query, language="es", limit=DEFAULT_LIMIT):
+    """JSON-ready suggestions: [{"label", "kind"[, "id"]}]."""
+    suggestions = []
+    for kind, label, recipe_id in get_index(language).search(query, limit):
+        item = {"label": label, "kind": kind}
+        if recipe_id is not None:
+            item["id"] = recipe_id
+        suggestions.append(item)
+    return suggestions
+
+
+def build_indexes():
+    """Build every language's index up front, before the first keystroke."""
+    for language in database.LOCALIZED_LANGUAGES:
+        get_index(language)
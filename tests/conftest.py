@@ -4,7 +4,12 @@ import tempfile
 import pytest
 from flask import Flask
 from flask_babel import Babel
-from database import init_database, get_db_connection
+from database import (
+    init_database,
+    get_db_connection,
+    close_db_connections,
+    refresh_normalized_columns,
+)
 
 """
 Pytest configuration and fixtures for the Tía Carmen's Recipes application.
@@ -15,6 +20,105 @@ Pytest configuration and fixtures for the Tía Carmen's Recipes application.
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+def insert_test_data(conn):
+    """Insert the sample recipes and translations used across the suite."""
+    # Insert test recipes
+    test_recipes = [
+        {
+            "title": "Test Recipe 1",
+            "description": "Test description 1",
+            "ingredients": "Test ingredients 1",
+            "instructions": "Test instructions 1",
+            "category": "Postres",
+            "filename": "test_recipe_1.md",
+        },
+        {
+            "title": "Test Recipe 2",
+            "description": "Test description 2",
+            "ingredients": "Test ingredients 2",
+            "instructions": "Test instructions 2",
+            "category": "Pollo",
+            "filename": "test_recipe_2.md",
+        },
+        {
+            "title": "Chicken Test",
+            "description": "Chicken test description",
+            "ingredients": "Chicken, spices",
+            "instructions": "Cook chicken",
+            "category": "Pollo",
+            "filename": "chicken_test.md",
+        },
+    ]
+
+    for recipe in test_recipes:
+        conn.execute(
+            """
+            INSERT INTO recipes (
+                title,
+                description,
+                ingredients,
+                instructions,
+                category,
+                filename)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """,
+            (
+                recipe["title"],
+                recipe["description"],
+                recipe["ingredients"],
+                recipe["instructions"],
+                recipe["category"],
+                recipe["filename"],
+            ),
+        )
+
+    # Insert test translations
+    conn.execute(
+        """
+        INSERT INTO recipe_translations (
+            recipe_id,
+            language,
+            title,
+            description,
+            ingredients,
+            instructions,
+            category)
+        VALUES (
+            1,
+            'en',
+            'Test Recipe 1 EN',
+            'Test description 1 EN',
+            'Test ingredients 1 EN',
+            'Test instructions 1 EN',
+            'Desserts')
+    """
+    )
+
+    conn.execute(
+        """
+        INSERT INTO recipe_translations (
+            recipe_id,
+            language,
+            title,
+            description,
+            ingredients,
+            instructions,
+            category)
+        VALUES (
+            1,
+            'zh',
+            'Test Recipe 1 ZH',
+            'Test description 1 ZH',
+            'Test ingredients 1 ZH',
+            'Test instructions 1 ZH',
+            '甜点')
+    """
+    )
+
+    # Store the normalized search shadows, as the importer does
+    refresh_normalized_columns(conn)
+
+
 @pytest.fixture
 def app():
     """Create and configure a new app instance for each test."""
@@ -55,99 +159,7 @@ def app():
         # Add test data
         conn = get_db_connection()
 
-        # Insert test recipes
-        test_recipes = [
-            {
-                "title": "Test Recipe 1",
-                "description": "Test description 1",
-                "ingredients": "Test ingredients 1",
-                "instructions": "Test instructions 1",
-                "category": "Postres",
-                "filename": "test_recipe_1.md",
-            },
-            {
-                "title": "Test Recipe 2",
-                "description": "Test description 2",
-                "ingredients": "Test ingredients 2",
-                "instructions": "Test instructions 2",
-                "category": "Pollo",
-                "filename": "test_recipe_2.md",
-            },
-            {
-                "title": "Chicken Test",
-                "description": "Chicken test description",
-                "ingredients": "Chicken, spices",
-                "instructions": "Cook chicken",
-                "category": "Pollo",
-                "filename": "chicken_test.md",
-            },
-        ]
-
-        for recipe in test_recipes:
-            conn.execute(
-                """
-                INSERT INTO recipes (
-                    title,
-                    description,
-                    ingredients,
-                    instructions,
-                    category,
-                    filename)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    recipe["title"],
-                    recipe["description"],
-                    recipe["ingredients"],
-                    recipe["instructions"],
-                    recipe["category"],
-                    recipe["filename"],
-                ),
-            )
-
-        # Insert test translations
-        conn.execute(
-            """
-            INSERT INTO recipe_translations (
-                recipe_id,
-                language,
-                title,
-                description,
-                ingredients,
-                instructions,
-                category)
-            VALUES (
-                1,
-                'en',
-                'Test Recipe 1 EN',
-                'Test description 1 EN',
-                'Test ingredients 1 EN',
-                'Test instructions 1 EN',
-                'Desserts')
-        """
-        )
-
-        conn.execute(
-            """
-            INSERT INTO recipe_translations (
-                recipe_id,
-                language,
-                title,
-                description,
-                ingredients,
-                instructions,
-                category)
-            VALUES (
-                1,
-                'zh',
-                'Test Recipe 1 ZH',
-                'Test description 1 ZH',
-                'Test ingredients 1 ZH',
-                'Test instructions 1 ZH',
-                '甜点')
-        """
-        )
-
+        insert_test_data(conn)
         conn.commit()
         conn.close()
 
@@ -157,10 +169,38 @@ def app():
     yield app
 
     # Cleanup
+    close_db_connections()
     os.close(db_fd)
     os.unlink(db_path)
 
 
+@pytest.fixture
+def test_db(monkeypatch, tmp_path):
+    """Point database.py at a seeded temporary database for the whole test."""
+    import database
+
+    db_path = str(tmp_path / "recipes.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", db_path)
+
+    init_database()
+    conn = get_db_connection()
+    insert_test_data(conn)
+    conn.commit()
+    conn.close()
+
+    yield db_path
+
+    close_db_connections()
+
+
+@pytest.fixture
+def app_client(test_db):
+    """A test client for the real application routes, backed by test_db."""
+    from app import create_app_for_testing
+
+    return create_app_for_testing().test_client()
+
+
 @pytest.fixture
 def client(app):
     """A test client for the app."""
@@ -4,6 +4,7 @@ Unit tests for Flask routes and views in app.py.
 
 import pytest
 import json
+import re
 from flask import request
 
 
@@ -312,6 +313,202 @@ class TestMarkdownProcessing:
         # Should contain HTML tags from markdown processing
         assert b"<p>" in response.data or b"<ol>" in response.data
 
+    @pytest.mark.unit
+    def test_render_markdown_matches_markdown_module(self):
+        """Test that the shared parser renders like markdown.markdown()."""
+        import markdown
+        from app import render_markdown
+
+        text = "### Masa\n\n- 200 g harina\n- 2 huevos\n\n1. Mezclar\n2. Hornear"
+        assert render_markdown(text) == markdown.markdown(text)
+        # A second render must not leak state from the first one
+        assert render_markdown("*hola*") == "<p><em>hola</em></p>"
+
+    @pytest.mark.unit
+    def test_render_markdown_is_memoized(self):
+        """Test that rendering the same text twice hits the cache."""
+        from app import render_markdown
+
+        render_markdown("- sal\n- pimienta")
+        hits = render_markdown.cache_info().hits
+        render_markdown("- sal\n- pimienta")
+        assert render_markdown.cache_info().hits == hits + 1
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_recipe_detail_renders_markdown_fragments(self, app_client):
+        """Test the detail page serves the rendered ingredients."""
+        response = app_client.get("/recipe/3")
+        assert response.status_code == 200
+        assert b"<p>Chicken, spices</p>" in response.data
+
+
+class TestPagination:
+    """Test paginated index and category pages."""
+
+    @pytest.fixture
+    def small_pages(self, monkeypatch):
+        from app import app as main_app
+
+        monkeypatch.setitem(main_app.config, "RECIPES_PER_PAGE", 2)
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_index_links_to_next_page(self, app_client, small_pages):
+        """Test that the first page links to the second one."""
+        response = app_client.get("/?language=es")
+        html = response.get_data(as_text=True)
+        assert "Chicken Test" in html
+        assert "Test Recipe 2" not in html
+        assert "after=" in html
+
+        next_url = html.split('href="/?after=')[1].split('"')[0]
+        html = app_client.get("/?after=" + next_url).get_data(as_text=True)
+        assert "Test Recipe 2" in html
+        assert "Chicken Test" not in html
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_category_page_is_paginated(self, app_client, monkeypatch):
+        """Test that the next page link of a category continues after page 1."""
+        from app import app as main_app
+
+        monkeypatch.setitem(main_app.config, "RECIPES_PER_PAGE", 1)
+        html = app_client.get("/category/Pollo?language=es").get_data(as_text=True)
+        assert "Chicken Test" in html
+        assert "Test Recipe 2" not in html
+
+        next_url = html.split('href="/category/Pollo?after=')[1].split('"')[0]
+        html = app_client.get("/category/Pollo?language=es&after=" + next_url).get_data(
+            as_text=True
+        )
+        assert "Test Recipe 2" in html
+        assert "Chicken Test" not in html
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_home_search_form_ranks_by_relevance(self, app_client):
+        """Test that a query sent with the form's default sort is ranked."""
+        from database import save_recipe_translation
+
+        save_recipe_translation(
+            2, "en", "Roast chicken", "Chicken", "Chicken, chicken stock", "Roast"
+        )
+        html = app_client.get("/?language=en").get_data(as_text=True)
+        select = html.split('<select name="sort"')[1].split("</select>")[0]
+        sort = re.search(r'<option value="([^"]*)" selected', select).group(1)
+
+        html = app_client.get(f"/?language=en&q=chicken&sort={sort}").get_data(
+            as_text=True
+        )
+        assert html.index("Roast chicken") < html.index("Chicken Test")
+
+        html = app_client.get("/?language=en&q=chicken&sort=title").get_data(
+            as_text=True
+        )
+        assert html.index("Chicken Test") < html.index("Roast chicken")
+
+
+class TestRelatedRecipes:
+    """Test the related recipes section of the detail page."""
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_detail_page_links_related_recipes(self, app_client):
+        """Test that a recipe links to others from its category."""
+        html = app_client.get("/recipe/2?language=es").get_data(as_text=True)
+        related = html.split('id="related-recipes"')[1]
+        assert 'href="/recipe/3"' in related
+        assert 'href="/recipe/2"' not in related
+
+
+class TestNutrition:
+    """Test the nutritional information of the detail page."""
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_detail_page_shows_stored_per_serving_values(self, app_client):
+        """Test that per-serving values come from the database as stored."""
+        from database import get_db_connection
+
+        conn = get_db_connection()
+        conn.execute(
+            "UPDATE recipes SET estimated_calories = 1000, servings = 4, "
+            "calories_per_serving = 251, estimated_protein = 40.0, "
+            "estimated_carbs = 120.0, estimated_fat = 36.0, "
+            "protein_per_serving = 10.0, carbs_per_serving = 30.0, "
+            "fat_per_serving = 9.0 WHERE id = 1"
+        )
+        conn.commit()
+        conn.close()
+
+        html = app_client.get("/recipe/1?language=en").get_data(as_text=True)
+        assert "251 cal" in html
+        macros = html.split('id="macronutrients"')[1]
+        assert "10.0 g" in macros and "120.0 g" in macros
+
+        html = app_client.get("/recipe/2?language=en").get_data(as_text=True)
+        assert 'id="macronutrients"' not in html
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_index_filters_and_sorts_by_calories(self, app_client, monkeypatch):
+        """Test that filters and sort survive into the next page link."""
+        from app import app as main_app
+        from database import get_db_connection
+
+        monkeypatch.setitem(main_app.config, "RECIPES_PER_PAGE", 1)
+        conn = get_db_connection()
+        conn.executemany(
+            "UPDATE recipes SET calories_per_serving = ? WHERE id = ?",
+            [(450, 1), (200, 2), (900, 3)],
+        )
+        conn.commit()
+        conn.close()
+
+        html = app_client.get(
+            "/?language=es&max_calories=500&sort=calories_desc"
+        ).get_data(as_text=True)
+        assert "Test Recipe 1" in html
+        assert "Chicken Test" not in html
+        next_url = html.split('href="/?')[-1].split('"')[0].replace("&amp;", "&")
+        assert "max_calories=500" in next_url and "sort=calories_desc" in next_url
+
+        html = app_client.get("/?" + next_url).get_data(as_text=True)
+        assert "Test Recipe 2" in html
+        assert "Test Recipe 1" not in html
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_index_cooks_with_what_i_have(self, app_client):
+        """Test that a pantry list ranks recipes by the ingredients they use."""
+        from database import get_db_connection
+
+        conn = get_db_connection()
+        conn.executemany(
+            "INSERT INTO ingredient_calories (ingredient_name, calories_per_100g) "
+            "VALUES (?, ?)",
+            [("pollo", 239), ("nata", 340)],
+        )
+        conn.executemany(
+            "INSERT INTO recipe_ingredients "
+            "(ingredient_name, recipe_id, ingredient_count) VALUES (?, ?, ?)",
+            [("pollo", 2, 2), ("pollo", 3, 2), ("nata", 3, 2)],
+        )
+        conn.commit()
+        conn.close()
+
+        html = app_client.get("/?language=es&have=pollos, nata, trufa").get_data(
+            as_text=True
+        )
+        assert html.index("Chicken Test") < html.index("Test Recipe 2")
+        assert "Test Recipe 1" not in html
+        assert 'id="unknown-ingredients"' in html and "trufa" in html
+        assert html.count("pantry-coverage") == 2
+
+        html = app_client.get("/?language=es&sort=bogus&max_calories=x")
+        assert html.status_code == 200
+
 
 class TestErrorHandling:
     """Test error handling in Flask routes."""
@@ -0,0 +1,153 @@
+"""
+Unit tests for the benchmark helpers in benchmarks/.
+"""
+
+import pytest
+
+import database
+import scripts.calories_estimator
+from benchmarks.ingredients import run_parser_benchmark
+from benchmarks.load import compare, percentile, run_benchmark
+import benchmarks.micro
+from benchmarks.micro import find_regressions, main, previous_run, run_micro
+from benchmarks.synthetic import build_synthetic_database
+
+
+class TestLoadBenchmark:
+    """Test the synthetic database and the route benchmark."""
+
+    @pytest.mark.unit
+    def test_percentile_is_nearest_rank(self):
+        """Test percentiles on a known distribution."""
+        samples = list(range(1, 101))
+        assert percentile(samples, 0.50) == 50
+        assert percentile(samples, 0.95) == 95
+        assert percentile(samples, 0.99) == 99
+        assert percentile([], 0.5) == 0.0
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_synthetic_database_fills_every_language(self, monkeypatch, tmp_path):
+        """Test that triggers build the localized rows for each language."""
+        monkeypatch.setattr(database, "DATABASE_PATH", database.DATABASE_PATH)
+        db_path = str(tmp_path / "bench.db")
+        build_synthetic_database(db_path, 12)
+
+        monkeypatch.setattr(database, "DATABASE_PATH", db_path)
+        conn = database.get_db_connection()
+        rows = conn.execute(
+            "SELECT language, COUNT(*) FROM recipes_localized GROUP BY language"
+        ).fetchall()
+        conn.close()
+        database.close_db_connections()
+        assert dict(rows) == {language: 12 for language in database.LOCALIZED_LANGUAGES}
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_run_and_compare(self, monkeypatch, tmp_path):
+        """Test a small client-mode run and the regression check."""
+        monkeypatch.setattr(database, "DATABASE_PATH", database.DATABASE_PATH)
+        db_path = str(tmp_path / "bench.db")
+        build_synthetic_database(db_path, 20)
+
+        result = run_benchmark(db_path, 20, requests=10, modes=("client",), warmup=2)
+        database.close_db_connections()
+        scenarios = result["results"]["client"]
+        assert set(scenarios) == {
+            "index",
+            "search",
+            "recipe",
+            "category",
+            "health",
+            "suggest",
+            "typo",
+        }
+        assert all(row["errors"] == 0 for row in scenarios.values())
+
+        assert compare(result, result, 0.5) == []
+        slower = {
+            "results": {
+                "client": {
+                    name: dict(row, p95_ms=row["p95_ms"] * 3, rps=row["rps"] / 3)
+                    for name, row in scenarios.items()
+                }
+            }
+        }
+        assert len(compare(slower, result, 0.5)) == 2 * len(scenarios)
+
+
+class TestMicroBenchmarks:
+    """Test the database.py micro-benchmarks and their history checks."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_every_public_function_is_timed(self, tmp_path):
+        """Test that each function gets stats per language and size."""
+        results = run_micro([10], ["es", "en"], min_time=0, db_dir=str(tmp_path))
+        names = {key.split("/", 2)[2] for key in results}
+        assert {
+            "search_recipes",
+            "get_recipe_with_translation",
+            "get_all_recipes_with_translation[cold]",
+            "get_categories[warm]",
+            "save_recipe_translation",
+        } <= names
+        assert all(stats["median_us"] > 0 for stats in results.values())
+        assert all(key.startswith("10/") for key in results)
+
+    @pytest.mark.unit
+    def test_regressions_compare_with_same_machine(self):
+        """Test threshold checks against the latest run of the same machine."""
+        history = [
+            {"machine": "a", "results": {"x": {"median_us": 100.0}}},
+            {"machine": "b", "results": {"x": {"median_us": 10.0}}},
+        ]
+        previous = previous_run(history, "a")
+        assert previous is history[0]
+        assert previous_run(history, "c") is None
+
+        assert find_regressions({"x": {"median_us": 120.0}}, previous, 0.25) == []
+        assert find_regressions({"x": {"median_us": 130.0}}, previous, 0.25) == [
+            ("x", 100.0, 130.0)
+        ]
+
+    @pytest.mark.unit
+    def test_slower_run_fails_against_the_previous_one(
+        self, monkeypatch, tmp_path, capsys
+    ):
+        """Test that a second run into the same history flags a slower median."""
+        history = str(tmp_path / "micro.jsonl")
+        monkeypatch.setenv("BENCH_MACHINE", "ci")
+        medians = iter([100.0, 110.0, 200.0])
+        monkeypatch.setattr(
+            benchmarks.micro,
+            "run_micro",
+            lambda *args, **kwargs: {
+                "10/es/search_recipes": {
+                    "median_us": next(medians),
+                    "min_us": 1.0,
+                    "rounds": 5,
+                }
+            },
+        )
+
+        assert main(["--history", history]) == 0
+        assert main(["--history", history]) == 0
+        assert main(["--history", history]) == 1
+        assert "REGRESSION 10/es/search_recipes: median 110.0 us -> 200.0 us" in (
+            capsys.readouterr().out
+        )
+
+
+class TestIngredientBenchmark:
+    """Test the ingredient parser throughput benchmark."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_every_language_is_measured(self, test_db, monkeypatch):
+        """Test that originals and translations get a throughput row."""
+        monkeypatch.setattr(scripts.calories_estimator, "DATABASE_PATH", test_db)
+        results = run_parser_benchmark(test_db, min_time=0)
+        assert set(results) == {"es", "en", "zh"}
+        assert results["es"]["lines"] == 3
+        assert all(row["parse_lines_per_s"] > 0 for row in results.values())
@@ -0,0 +1,243 @@
+"""
+Unit tests for scripts/calories_estimator.py.
+"""
+
+import pytest
+
+import database
+import scripts.calories_estimator
+from scripts.calories_estimator import CaloriesEstimator, IngredientIndex
+
+INGREDIENTS = [
+    ("pollo", 239, 27.3, 0.0, 13.6),
+    ("huevos", 155, 13.0, 1.1, 11.0),
+    ("aceite", 884, 0.0, 0.0, 100.0),
+    ("aceite de oliva", 884, 0.0, 0.0, 100.0),
+    ("sal", 0, 0.0, 0.0, 0.0),
+    ("pan", 265, 8.0, 49.0, 3.2),
+    ("nuez", 654, 15.2, 13.7, 65.2),
+    ("azúcar", 387, 0.0, 99.8, 0.0),
+]
+
+
+class TestIngredientIndex:
+    """Test the ingredient matching automaton."""
+
+    @pytest.mark.unit
+    def test_longest_match_wins(self):
+        """Test that the longest name in a line is preferred."""
+        index = IngredientIndex(INGREDIENTS)
+        assert index.match("2 cucharadas de aceite de oliva") == (
+            "aceite de oliva",
+            884,
+        )
+        assert index.match("Sal y aceite") == ("aceite", 884)
+
+    @pytest.mark.unit
+    def test_variants_synonyms_and_accents(self):
+        """Test plurals, synonyms and lines written without accents."""
+        index = IngredientIndex(INGREDIENTS)
+        assert index.match("1 huevo") == ("huevos", 155)
+        assert index.match("2 Pollos") == ("pollo", 239)
+        assert index.match("1/2 kilo nueces") == ("nuez", 654)
+        assert index.match("100 g de azucar") == ("azúcar", 387)
+
+    @pytest.mark.unit
+    def test_matches_stop_at_word_boundaries(self):
+        """Test that names inside longer words do not match."""
+        index = IngredientIndex(INGREDIENTS)
+        assert index.match("6 panecillos") == (None, None)
+        assert index.match("salsa de tomate") == (None, None)
+        assert index.match("oliva negra") == ("aceite de oliva", 884)
+
+
+class TestQuantityParser:
+    """Test the single-pass quantity and unit tokenizer."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "line, expected",
+        [
+            ("1/2 litro de leche", (0.5, "litro")),
+            ("1 y 1/2 kilo manzanas", (1.5, "kilo")),
+            ("1/4 de kilo de harina", (0.25, "kilo")),
+            ("150-200 g de cebollas", (175.0, "g")),
+            ("2 o 3 patatas", (2.5, "")),
+            ("1,5 kg de pollo", (1.5, "kg")),
+            ("1½ tazas de azúcar", (1.5, "tazas")),
+            ("Media docena de huevos", (6, "")),
+            ("un par de huevos", (2, "")),
+            ("3 dientes de ajo", (3.0, "dientes")),
+            ("100 gambas", (100.0, "")),
+            ("15 cl de nata", (15.0, "cl")),
+            ("1 dl de leche", (1.0, "dl")),
+            ("250 cc de caldo", (250.0, "cc")),
+            ("2 latas de atún", (2.0, "latas")),
+            ("1 bote de garbanzos", (1.0, "bote")),
+            ("Sal y pimienta", (None, None)),
+        ],
+    )
+    def test_quantities_and_units(self, test_db, monkeypatch, line, expected):
+        """Test fractions, ranges, number words and units."""
+        monkeypatch.setattr(scripts.calories_estimator, "DATABASE_PATH", test_db)
+        estimator = CaloriesEstimator()
+        assert estimator.extract_quantity_and_unit(line) == expected
+        estimator.close()
+
+    @pytest.mark.unit
+    def test_counted_items_use_unit_weight(self, test_db, monkeypatch):
+        """Test that a bare count is converted with the average unit weight."""
+        monkeypatch.setattr(scripts.calories_estimator, "DATABASE_PATH", test_db)
+        estimator = CaloriesEstimator()
+        assert estimator.convert_to_grams(2, "") == 200
+        assert estimator.convert_to_grams(0.5, "litro") == 500
+        assert estimator.convert_to_grams(None, None) == 100
+        estimator.close()
+
+    @pytest.mark.unit
+    def test_volume_and_container_units(self, test_db, monkeypatch):
+        """Test that cl, dl, cc, cans and jars are not counted as whole items."""
+        monkeypatch.setattr(scripts.calories_estimator, "DATABASE_PATH", test_db)
+        estimator = CaloriesEstimator()
+        grams = [
+            estimator.convert_to_grams(*estimator.extract_quantity_and_unit(line))
+            for line in ("15 cl de nata", "2 dl de leche", "250 cc de caldo")
+        ]
+        assert grams == [150, 200, 250]
+        assert estimator.convert_to_grams(1, "lata") == 250
+        assert estimator.convert_to_grams(2, "botes") == 800
+        estimator.close()
+
+
+class TestCaloriesEstimator:
+    """Test estimating calories against the database."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_ingredients_are_read_once(self, test_db, monkeypatch):
+        """Test that matching many lines reads ingredient_calories once."""
+        monkeypatch.setattr(scripts.calories_estimator, "DATABASE_PATH", test_db)
+        conn = database.get_db_connection()
+        conn.executemany(
+            "INSERT INTO ingredient_calories (ingredient_name, calories_per_100g, "
+            "protein_per_100g, carbs_per_100g, fat_per_100g) VALUES (?, ?, ?, ?, ?)",
+            INGREDIENTS,
+        )
+        conn.execute(
+            "UPDATE recipes SET ingredients = ? WHERE id = 1",
+            ("200 g de pollo\n1 huevo\nSal",),
+        )
+        conn.commit()
+        conn.close()
+
+        estimator = CaloriesEstimator()
+        statements = []
+        estimator.conn.set_trace_callback(statements.append)
+        results = estimator.estimate_all_recipes()
+        estimator.close()
+
+        reads = [sql for sql in statements if "FROM ingredient_calories" in sql]
+        assert len(reads) == 1
+        recipe = next(result for result in results if result["recipe_id"] == 1)
+        assert recipe["matched_ingredients"] == 2
+        assert recipe["estimated_calories"] == 2 * 239 + 155
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_bulk_estimate_in_process_pool(self, test_db, monkeypatch):
+        """Test that a pooled run writes the same estimates in one transaction."""
+        monkeypatch.setattr(scripts.calories_estimator, "DATABASE_PATH", test_db)
+        conn = database.get_db_connection()
+        conn.executemany(
+            "INSERT INTO ingredient_calories (ingredient_name, calories_per_100g, "
+            "protein_per_100g, carbs_per_100g, fat_per_100g) VALUES (?, ?, ?, ?, ?)",
+            INGREDIENTS,
+        )
+        conn.execute(
+            "UPDATE recipes SET ingredients = ? WHERE id = 2",
+            ("1 kilo de pollo\n2 huevos",),
+        )
+        conn.commit()
+        conn.close()
+
+        estimator = CaloriesEstimator()
+        serial = estimator.estimate_recipe_calories(2)["total_calories"]
+        statements = []
+        estimator.conn.set_trace_callback(statements.append)
+        seen = []
+        results = estimator.estimate_all_recipes(
+            workers=2, chunk_size=1, progress=lambda done, total: seen.append(done)
+        )
+
+        assert seen == [1, 2, 3]
+        assert [sql for sql in statements if sql == "COMMIT"] == ["COMMIT"]
+        assert estimator.timings["recipes"] == estimator.timings["updated"] == 3
+        assert results[1]["estimated_calories"] == serial == 10 * 239 + 2 * 155
+        nutrition = results[1]["nutrition"]
+        assert nutrition["estimated_protein"] == pytest.approx(10 * 27.3 + 2 * 13.0)
+        assert nutrition["estimated_fat"] == pytest.approx(10 * 13.6 + 2 * 11.0)
+        assert nutrition["calories_per_serving"] == round(serial / 4)
+        assert nutrition["carbs_per_serving"] == pytest.approx(0.6)
+
+        estimator.estimate_all_recipes()
+        estimator.close()
+        assert estimator.timings["updated"] == 0
+
+        conn = database.get_db_connection()
+        stored = conn.execute(
+            "SELECT estimated_calories, protein_per_serving FROM recipes_localized "
+            "WHERE language = 'zh' AND recipe_id = 2"
+        ).fetchone()
+        conn.close()
+        assert tuple(stored) == (serial, nutrition["protein_per_serving"])
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_ingredient_postings_follow_recipes(self, test_db, monkeypatch):
+        """Test that recipe_ingredients holds each recipe's matched ingredients."""
+        monkeypatch.setattr(scripts.calories_estimator, "DATABASE_PATH", test_db)
+        conn = database.get_db_connection()
+        conn.executemany(
+            "INSERT INTO ingredient_calories (ingredient_name, calories_per_100g, "
+            "protein_per_100g, carbs_per_100g, fat_per_100g) VALUES (?, ?, ?, ?, ?)",
+            INGREDIENTS,
+        )
+        conn.execute(
+            "UPDATE recipes SET ingredients = ? WHERE id = 1",
+            ("200 g de pollo\n2 huevos\n1 huevo más\nSal",),
+        )
+        conn.execute(
+            "UPDATE recipes SET ingredients = ? WHERE id = 2", ("1 barra de pan",)
+        )
+        conn.commit()
+        conn.close()
+
+        def postings():
+            conn = database.get_db_connection()
+            rows = conn.execute(
+                "SELECT recipe_id, ingredient_name FROM recipe_ingredients "
+                "ORDER BY recipe_id, ingredient_name"
+            ).fetchall()
+            conn.close()
+            return [tuple(row) for row in rows]
+
+        estimator = CaloriesEstimator()
+        estimator.estimate_all_recipes()
+        assert postings() == [(1, "huevos"), (1, "pollo"), (2, "pan")]
+        assert estimator.timings["reindexed"] == 2
+
+        conn = database.get_db_connection()
+        conn.execute("UPDATE recipes SET ingredients = '3 nueces' WHERE id = 2")
+        conn.execute("DELETE FROM recipes WHERE id = 1")
+        conn.commit()
+        conn.close()
+        version = database.get_catalog_version()[0]
+        estimator.estimate_all_recipes()
+        assert postings() == [(2, "nuez")]
+        assert database.get_catalog_version()[0] > version
+
+        version = database.get_catalog_version()[0]
+        estimator.estimate_all_recipes()
+        estimator.close()
+        assert estimator.timings["reindexed"] == 0
+        assert database.get_catalog_version()[0] == version
@@ -2,20 +2,35 @@
 Unit tests for database.py functions.
 """
 
+import gc
+import sqlite3
+import threading
+
 import pytest
 
+import database
 from database import (
     init_database,
     get_db_connection,
+    close_db_connections,
+    get_pool_stats,
+    release_db_connection,
+    get_catalog_cache_stats,
+    invalidate_catalog_cache,
+    LOCALIZED_LANGUAGES,
     get_all_recipes,
     get_recipe_by_id,
     search_recipes,
     get_categories,
     get_recipe_translation,
     get_recipe_with_translation,
+    get_recipes_with_translation,
+    get_related_recipes,
     get_all_recipes_with_translation,
     search_recipes_with_translation,
     save_recipe_translation,
+    start_query_capture,
+    stop_query_capture,
 )
 
 
@@ -355,3 +370,327 @@ class TestDatabaseErrorHandling:
         with app.app_context():
             recipe = get_recipe_with_translation(999, "en")
             assert recipe is None
+
+
+class TestConnectionPool:
+    """Test the per-thread connection pool behind get_db_connection."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_connection_reused_on_same_thread(self, test_db):
+        """Test that a thread gets the same connection back after close()."""
+        first = get_db_connection()
+        first.close()
+        second = get_db_connection()
+        assert first is second
+        assert second.execute("SELECT COUNT(*) FROM recipes").fetchone()[0] == 3
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_threads_get_separate_connections(self, test_db):
+        """Test that every thread owns its own connection."""
+        seen = []
+        worker = threading.Thread(target=lambda: seen.append(get_db_connection()))
+        worker.start()
+        worker.join()
+        assert seen[0] is not get_db_connection()
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_connection_dropped_with_its_thread(self, test_db):
+        """Test that a finished thread does not keep its connection open."""
+        get_db_connection()
+        open_before = get_pool_stats()["open"]
+        worker = threading.Thread(target=lambda: get_db_connection().close())
+        worker.start()
+        worker.join()
+        del worker
+        gc.collect()
+        assert get_pool_stats()["open"] == open_before
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_pragmas_applied(self, test_db):
+        """Test that WAL and synchronous=NORMAL are set on pooled connections."""
+        conn = get_db_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_close_discards_uncommitted_changes(self, test_db):
+        """Test that close() still rolls back like a real close would."""
+        conn = get_db_connection()
+        conn.execute("DELETE FROM recipes")
+        conn.close()
+        assert get_all_recipes() != []
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_release_rolls_back_open_transaction(self, test_db):
+        """Test the teardown hook rolls back a leaked transaction."""
+        conn = get_db_connection()
+        conn.execute("DELETE FROM recipes")
+        release_db_connection()
+        assert not conn.in_transaction
+        assert len(get_all_recipes()) == 3
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_pool_stats(self, test_db):
+        """Test that stats track opened, reused and open connections."""
+        close_db_connections()
+        before = get_pool_stats()
+        get_db_connection().close()
+        get_db_connection().close()
+        after = get_pool_stats()
+        assert after["opened"] - before["opened"] == 1
+        assert after["reused"] - before["reused"] == 1
+        assert after["released"] - before["released"] == 2
+        assert after["open"] == 1
+
+        close_db_connections()
+        assert get_pool_stats()["open"] == 0
+
+
+class TestCatalogCache:
+    """Test the in-process catalog cache."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_repeated_listing_hits_cache(self, test_db):
+        """Test that the second listing is served from memory."""
+        get_all_recipes_with_translation("en")
+        before = get_catalog_cache_stats()
+        recipes = get_all_recipes_with_translation("en")
+        after = get_catalog_cache_stats()
+
+        assert after["hits"] == before["hits"] + 1
+        assert after["misses"] == before["misses"]
+        assert any(recipe["title"] == "Test Recipe 1 EN" for recipe in recipes)
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_languages_cached_separately(self, test_db):
+        """Test that each language has its own cache entry."""
+        english = get_all_recipes_with_translation("en")
+        spanish = get_all_recipes_with_translation("es")
+        assert {r["title"] for r in english} != {r["title"] for r in spanish}
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_save_translation_invalidates(self, test_db):
+        """Test that saving a translation is visible immediately."""
+        get_all_recipes_with_translation("en")
+        save_recipe_translation(2, "en", "Recipe Two EN", None, None, None, "Chicken")
+        titles = [r["title"] for r in get_all_recipes_with_translation("en")]
+        assert "Recipe Two EN" in titles
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_commit_from_other_connection_invalidates(self, test_db):
+        """Test that data_version picks up writes made outside database.py."""
+        assert "Nueva" not in get_categories()
+
+        conn = sqlite3.connect(test_db)
+        conn.execute(
+            "INSERT INTO recipes (title, category, filename) "
+            "VALUES ('Otra', 'Nueva', 'otra.md')"
+        )
+        conn.commit()
+        conn.close()
+
+        assert "Nueva" in get_categories()
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_explicit_invalidation(self, test_db):
+        """Test that invalidate_catalog_cache forces a reload."""
+        get_categories()
+        invalidate_catalog_cache()
+        before = get_catalog_cache_stats()
+        get_categories()
+        assert get_catalog_cache_stats()["misses"] == before["misses"] + 1
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_unrelated_commit_keeps_cache(self, test_db):
+        """Test that commits outside the catalog do not drop the cache."""
+        get_categories()
+        conn = sqlite3.connect(test_db)
+        conn.execute("CREATE TABLE scratch (id INTEGER)")
+        conn.commit()
+        conn.close()
+
+        before = get_catalog_cache_stats()
+        get_categories()
+        assert get_catalog_cache_stats()["hits"] == before["hits"] + 1
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_cache_survives_fork_until_catalog_changes(self, test_db):
+        """Test that a preloaded cache is revalidated, not dropped, in a child."""
+        get_categories()
+        database._forget_catalog_after_fork()
+        before = get_catalog_cache_stats()
+        get_categories()
+        assert get_catalog_cache_stats()["hits"] == before["hits"] + 1
+
+        conn = sqlite3.connect(test_db)
+        conn.execute(
+            "INSERT INTO recipes (title, category, filename) "
+            "VALUES ('Otra', 'Nueva', 'otra.md')"
+        )
+        conn.commit()
+        conn.close()
+        database._forget_catalog_after_fork()
+        assert "Nueva" in get_categories()
+
+
+class TestLocalizedRecipes:
+    """Test the recipes_localized table maintained by triggers."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_one_row_per_language_and_recipe(self, test_db):
+        """Test that every recipe is materialized for every language."""
+        conn = get_db_connection()
+        rows = conn.execute(
+            "SELECT language, COUNT(*) FROM recipes_localized GROUP BY language"
+        ).fetchall()
+        assert {language: count for language, count in rows} == {
+            language: 3 for language in LOCALIZED_LANGUAGES
+        }
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_translation_merged_with_fallback(self, test_db):
+        """Test that empty translated fields fall back to the original."""
+        save_recipe_translation(3, "en", "Chicken EN", "", None, None, "Poultry")
+        conn = get_db_connection()
+        row = conn.execute(
+            "SELECT title, description, ingredients, category, sort_key "
+            "FROM recipes_localized WHERE language = 'en' AND recipe_id = 3"
+        ).fetchone()
+        assert tuple(row) == (
+            "Chicken EN",
+            "Chicken test description",
+            "Chicken, spices",
+            "Poultry",
+            "Chicken EN",
+        )
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_deleted_translation_reverts_to_original(self, test_db):
+        """Test that removing a translation restores the original content."""
+        conn = get_db_connection()
+        conn.execute("DELETE FROM recipe_translations WHERE recipe_id = 1")
+        conn.commit()
+        assert get_recipe_with_translation(1, "en")["title"] == "Test Recipe 1"
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_calorie_update_reaches_every_language(self, test_db):
+        """Test that non-text columns are copied without re-deriving text."""
+        conn = get_db_connection()
+        conn.execute("UPDATE recipes SET estimated_calories = 640 WHERE id = 1")
+        conn.commit()
+        calories = conn.execute(
+            "SELECT DISTINCT estimated_calories FROM recipes_localized "
+            "WHERE recipe_id = 1"
+        ).fetchall()
+        assert [row[0] for row in calories] == [640]
+        assert get_recipe_with_translation(1, "zh")["estimated_calories"] == 640
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_init_backfills_calories_per_serving(self, test_db):
+        """Test that older estimates get a per-serving value on init."""
+        conn = get_db_connection()
+        conn.executemany(
+            "UPDATE recipes SET estimated_calories = ?, servings = ?, "
+            "calories_per_serving = ? WHERE id = ?",
+            [(800, None, None, 1), (900, 3, None, 2), (500, 2, 111, 3)],
+        )
+        conn.commit()
+
+        init_database()
+
+        assert get_recipe_with_translation(1, "en")["calories_per_serving"] == 200
+        assert get_recipe_with_translation(2, "es")["calories_per_serving"] == 300
+        assert get_recipe_with_translation(3, "es")["calories_per_serving"] == 111
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_category_listing_uses_index(self, test_db):
+        """Test that translated category pages are index range scans."""
+        conn = get_db_connection()
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT recipe_id FROM recipes_localized "
+            "WHERE language = 'en' AND category = 'Desserts' "
+            "ORDER BY sort_key, recipe_id"
+        ).fetchall()
+        assert "idx_localized_category" in plan[0][3]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_init_rebuilds_outdated_tables(self, test_db):
+        """Test that init_database re-derives tables from older versions."""
+        conn = get_db_connection()
+        conn.execute("DELETE FROM recipes_localized")
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+
+        init_database()
+
+        count = conn.execute("SELECT COUNT(*) FROM recipes_localized").fetchone()[0]
+        assert count == 3 * len(LOCALIZED_LANGUAGES)
+
+
+class TestBatchFetch:
+    """Test many-recipe lookups and related recipes."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_batch_keeps_requested_order(self, test_db):
+        """Test that recipes come back in the order of the ids given."""
+        queries = start_query_capture()
+        recipes = get_recipes_with_translation([3, 1, 99, 3, 2], "en")
+        stop_query_capture()
+
+        assert [recipe["id"] for recipe in recipes] == [3, 1, 2]
+        assert recipes[1]["title"] == "Test Recipe 1 EN"
+        assert len(queries) == 1
+        assert get_recipes_with_translation([], "en") == []
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_related_prefers_category_and_shared_ingredients(self, test_db):
+        """Test that related recipes exclude the recipe itself and rank well."""
+        recipe = get_recipe_with_translation(2, "es")
+        related = get_related_recipes(recipe, "es")
+
+        ids = [item["id"] for item in related]
+        assert 2 not in ids
+        # Recipe 3 is in the same category; recipe 1 only shares words
+        assert ids[0] == 3
+        assert set(ids) == {1, 3}
+        assert set(related[0]) >= {"id", "title", "description", "category"}
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_related_follow_writes(self, test_db):
+        """Test that cached related recipes are refreshed after a write."""
+        recipe = get_recipe_with_translation(1, "es")
+        assert [item["id"] for item in get_related_recipes(recipe, "es")] == [2]
+
+        conn = get_db_connection()
+        conn.execute(
+            "INSERT INTO recipes (title, category, filename) "
+            "VALUES ('Flan', 'Postres', 'flan.md')"
+        )
+        conn.commit()
+        conn.close()
+
+        assert 4 in [item["id"] for item in get_related_recipes(recipe, "es")]
@@ -0,0 +1,65 @@
+"""
+Unit tests for the static site export in scripts/export_static_site.py.
+"""
+
+import gzip
+import os
+
+import pytest
+
+from database import get_db_connection, save_recipe_translation
+from scripts.export_static_site import export_site
+
+
+class TestStaticExport:
+    """Test the pre-rendered site and its incremental re-runs."""
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_exports_every_page_per_language(self, test_db, tmp_path):
+        """Test that pages land under each language with gzip siblings."""
+        site = tmp_path / "site"
+        export_site(str(site))
+
+        page = site / "en" / "recipe" / "1" / "index.html"
+        compressed = site / "en" / "recipe" / "1" / "index.html.gz"
+        assert gzip.decompress(compressed.read_bytes()) == page.read_bytes()
+        assert (site / "es" / "index.html").exists()
+        assert (site / "zh" / "category" / "Pollo" / "index.html").exists()
+        assert (site / "static" / "css" / "style.css").exists()
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_rerun_only_renders_changed_recipes(self, test_db, tmp_path):
+        """Test that an unchanged catalog skips every recipe page."""
+        site = tmp_path / "site"
+        export_site(str(site))
+        page = site / "ca" / "recipe" / "2" / "index.html"
+        untouched = site / "ca" / "recipe" / "3" / "index.html"
+        mtime = os.stat(untouched).st_mtime_ns
+
+        summary = export_site(str(site))
+        assert summary["written"] == 0
+        assert summary["skipped"] == 15
+
+        save_recipe_translation(2, "ca", instructions="Coure el pollastre")
+        summary = export_site(str(site))
+        assert summary["skipped"] == 14
+        assert "Coure el pollastre" in page.read_text(encoding="utf-8")
+        assert os.stat(untouched).st_mtime_ns == mtime
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_deleted_recipes_are_removed(self, test_db, tmp_path):
+        """Test that pages of deleted recipes disappear on the next run."""
+        site = tmp_path / "site"
+        export_site(str(site))
+        conn = get_db_connection()
+        conn.execute("DELETE FROM recipes WHERE id = 3")
+        conn.commit()
+        conn.close()
+
+        summary = export_site(str(site))
+        assert summary["removed"] == 5
+        assert not (site / "es" / "recipe" / "3").exists()
+        assert (site / "es" / "recipe" / "2" / "index.html").exists()
@@ -0,0 +1,120 @@
+"""
+Unit tests for typo-tolerant search (fuzzy.py).
+"""
+
+import pytest
+
+import database
+import fuzzy
+from fuzzy import TrigramIndex, bounded_levenshtein
+
+VOCABULARY = [
+    ("strogonoff", 3),
+    ("estofado", 5),
+    ("canelones", 4),
+    ("canela", 9),
+    ("queso", 40),
+    ("queson", 1),
+    ("pan", 50),
+    ("pena", 2),
+    ("pera", 6),
+    ("100g", 7),
+]
+
+
+class TestBoundedLevenshtein:
+    """Test the early-exit edit distance."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "a, b, limit, expected",
+        [
+            ("canelons", "canelones", 2, 1),
+            ("estrogonof", "strogonoff", 3, 2),
+            ("quezo", "queso", 1, 1),
+            ("queso", "queso", 1, 0),
+            ("tarta", "torta", 0, 1),
+            ("pan", "panecillos", 2, 3),
+            ("estofado", "canelones", 2, 3),
+        ],
+    )
+    def test_distances_stop_past_the_limit(self, a, b, limit, expected):
+        """Test exact distances within the limit and limit + 1 past it."""
+        assert bounded_levenshtein(a, b, limit) == expected
+
+
+class TestTrigramIndex:
+    """Test candidate generation and reranking."""
+
+    @pytest.mark.unit
+    def test_closest_known_word(self):
+        """Test the examples that found nothing with substring search."""
+        index = TrigramIndex(VOCABULARY)
+        assert index.closest("estrogonof") == "strogonoff"
+        assert index.closest("canelons") == "canelones"
+        assert index.closest("estofao") == "estofado"
+
+    @pytest.mark.unit
+    def test_ties_go_to_the_more_frequent_word(self):
+        """Test that equally close words are ranked by frequency."""
+        index = TrigramIndex(VOCABULARY)
+        assert index.closest("pesa") == "pera"
+        assert index.closest("quesa") == "queso"
+
+    @pytest.mark.unit
+    def test_short_numeric_and_distant_words(self):
+        """Test what the index keeps and what it refuses to correct."""
+        index = TrigramIndex(VOCABULARY)
+        assert index.size == 8
+        assert "pan" not in index and "100g" not in index
+        assert index.closest("merluza") is None
+        assert index.closest("canalones") == "canelones"
+
+
+class TestFuzzySearch:
+    """Test the fallback against the test database."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_misspelt_query_is_corrected(self, test_db):
+        """Test that a query finding nothing is searched again corrected."""
+        assert database.search_recipes_with_translation("chiken") == []
+        recipes, corrected = fuzzy.search("Chiken", page_size=10)
+        assert corrected == "chicken"
+        assert [recipe["id"] for recipe in recipes] == [3]
+        assert fuzzy.correct("chicken test") is None
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_enough_exact_results_skip_the_fallback(self, test_db, monkeypatch):
+        """Test that corrections are only looked for after a poor exact search."""
+
+        def fail(query, language="es"):
+            raise AssertionError("fuzzy path taken")
+
+        monkeypatch.setattr(fuzzy, "correct", fail)
+        recipes, corrected = fuzzy.search("test")
+        assert len(recipes) >= fuzzy.FUZZY_MIN_RESULTS
+        assert corrected is None
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_vocabulary_follows_catalog_changes(self, test_db):
+        """Test that a saved translation can be corrected to without a restart."""
+        assert fuzzy.correct("canalons", "ca") is None
+        database.save_recipe_translation(2, "ca", title="Canelons de Nadal")
+        assert fuzzy.correct("canalons", "ca") == "canelons"
+        assert fuzzy.correct("红烧", "zh") is None
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_index_shows_the_corrected_query(self, app_client):
+        """Test the "showing results for" notice and its exact search link."""
+        html = app_client.get("/?language=es&q=chiken").get_data(as_text=True)
+        assert "Chicken Test" in html
+        assert 'id="corrected-query"' in html
+        assert "exact=1" in html
+
+        html = app_client.get("/?language=es&q=chiken&exact=1").get_data(as_text=True)
+        assert "Chicken Test" not in html
+        assert 'id="corrected-query"' not in html
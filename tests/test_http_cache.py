@@ -0,0 +1,96 @@
+"""
+Unit tests for conditional GET support in http_cache.py.
+"""
+
+import pytest
+
+from database import get_catalog_version, get_query_stats, save_recipe_translation
+from http_cache import _release_tag
+
+
+class TestConditionalGet:
+    """Test ETag/Last-Modified validators on the catalog pages."""
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_pages_carry_validators(self, app_client):
+        """Test that cacheable pages send ETag, Last-Modified and Vary."""
+        for path in ("/", "/recipe/1", "/categories", "/category/Pollo"):
+            response = app_client.get(path)
+            assert response.status_code == 200
+            assert response.headers["ETag"].startswith('"')
+            assert response.headers["Last-Modified"]
+            assert "must-revalidate" in response.headers["Cache-Control"]
+            assert "Accept-Language" in response.vary
+            assert "Cookie" in response.vary
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_if_none_match_returns_304_without_queries(self, app_client):
+        """Test that a matching ETag is answered before any page query."""
+        etag = app_client.get("/recipe/1").headers["ETag"]
+
+        queries = get_query_stats()["count"]
+        response = app_client.get("/recipe/1", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers["ETag"] == etag
+        assert get_query_stats()["count"] == queries
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_etag_depends_on_query_and_locale(self, app_client):
+        """Test that different queries and languages get different ETags."""
+        plain = app_client.get("/").headers["ETag"]
+        searched = app_client.get("/?q=chicken").headers["ETag"]
+        english = app_client.get("/", headers={"Accept-Language": "en"}).headers["ETag"]
+        assert len({plain, searched, english}) == 3
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_writes_invalidate_etag(self, app_client):
+        """Test that a translation write changes the version and the ETag."""
+        version = get_catalog_version()[0]
+        etag = app_client.get("/recipe/1").headers["ETag"]
+
+        save_recipe_translation(1, "ca", title="Recepta de prova")
+
+        assert get_catalog_version()[0] > version
+        response = app_client.get("/recipe/1", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_language_switch_is_private(self, app_client):
+        """Test that responses setting the session cookie are not shared."""
+        response = app_client.get("/?language=en")
+        assert response.headers["Cache-Control"].startswith("private")
+        assert app_client.get("/health").headers.get("ETag") is None
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "changed", ["database.py", "static/site.css", "templates/index.html"]
+    )
+    def test_release_tag_covers_code_and_assets(self, tmp_path, monkeypatch, changed):
+        """Test that editing any module, asset or template changes the tag."""
+        monkeypatch.delenv("APP_RELEASE", raising=False)
+        for name in (
+            "app.py",
+            "database.py",
+            "static/site.css",
+            "templates/index.html",
+        ):
+            (tmp_path / name).parent.mkdir(exist_ok=True)
+            (tmp_path / name).write_text(name)
+        (tmp_path / "scripts" / "__pycache__").mkdir(parents=True)
+        (tmp_path / "scripts" / "__pycache__" / "x.pyc").write_text("x")
+        before = _release_tag(str(tmp_path))
+
+        (tmp_path / "scripts" / "__pycache__" / "x.pyc").write_text("y")
+        assert _release_tag(str(tmp_path)) == before
+        (tmp_path / changed).write_text("changed")
+        assert _release_tag(str(tmp_path)) != before
+
+        monkeypatch.setenv("APP_RELEASE", "v1.2.3")
+        assert _release_tag(str(tmp_path)) == "v1.2.3"
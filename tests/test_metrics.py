@@ -0,0 +1,86 @@
+"""
+Unit tests for the Prometheus metrics in metrics.py and the /metrics route.
+"""
+
+import json
+
+import pytest
+
+from database import get_db_connection, get_query_stats
+from metrics import Histogram
+
+
+class TestHistogram:
+    """Test the histogram exposition format."""
+
+    @pytest.mark.unit
+    def test_observations_fill_cumulative_buckets(self):
+        """Test that buckets are cumulative and +Inf equals the count."""
+        histogram = Histogram("demo_seconds", "Demo.", ("route",), (0.1, 1.0))
+        histogram.observe(0.05, route="/")
+        histogram.observe(0.5, route="/")
+        histogram.observe(3.0, route="/")
+
+        lines = histogram.render()
+        assert "# TYPE demo_seconds histogram" in lines
+        assert 'demo_seconds_bucket{route="/",le="0.1"} 1' in lines
+        assert 'demo_seconds_bucket{route="/",le="1.0"} 2' in lines
+        assert 'demo_seconds_bucket{route="/",le="+Inf"} 3' in lines
+        assert 'demo_seconds_count{route="/"} 3' in lines
+
+    @pytest.mark.unit
+    def test_label_values_are_escaped(self):
+        """Test that quotes in label values cannot break the format."""
+        histogram = Histogram("demo_seconds", "Demo.", ("route",), (1.0,))
+        histogram.observe(0.1, route='a"b')
+        assert 'demo_seconds_count{route="a\\"b"} 1' in histogram.render()
+
+
+class TestMetricsEndpoint:
+    """Test the /metrics and /health routes."""
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_metrics_exposes_request_and_template_timings(self, app_client):
+        """Test that a page view shows up in the latency histograms."""
+        assert app_client.get("/categories").status_code == 200
+
+        response = app_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+
+        body = response.get_data(as_text=True)
+        assert (
+            'recetas_request_duration_seconds_count{endpoint="categories",'
+            'method="GET",status="200"}' in body
+        )
+        template_series = (
+            'recetas_template_render_seconds_count{template="categories.html"}'
+        )
+        assert template_series in body
+        assert "recetas_db_queries_total" in body
+        assert "recetas_catalog_cache_hit_ratio" in body
+        assert "recetas_markdown_cache_hits_total" in body
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_health_reports_cached_count(self, app_client):
+        """Test that repeated health probes do not query the database."""
+        data = json.loads(app_client.get("/health").data)
+        assert data == {"status": "healthy", "recipes_count": 3}
+
+        queries = get_query_stats()["count"]
+        app_client.get("/health")
+        assert get_query_stats()["count"] == queries
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_health_count_follows_inserts(self, app_client):
+        """Test that the cached count is refreshed after a write."""
+        conn = get_db_connection()
+        conn.execute("INSERT INTO recipes (title, filename) VALUES ('Nueva', 'n.md')")
+        conn.commit()
+        conn.close()
+
+        data = json.loads(app_client.get("/health").data)
+        assert data["recipes_count"] == 4
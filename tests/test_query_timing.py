@@ -0,0 +1,101 @@
+"""
+Unit tests for SQL capture in database.py and the query_timing.py hooks.
+"""
+
+import logging
+
+import pytest
+
+from database import (
+    explain_query_plan,
+    get_recipe_with_translation,
+    parameter_shape,
+    search_recipes,
+    start_query_capture,
+    stop_query_capture,
+)
+
+
+class TestQueryCapture:
+    """Test the per-thread statement capture."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_capture_records_statement_rows_and_time(self, test_db):
+        """Test that a captured query has its SQL, shape, rows and duration."""
+        queries = start_query_capture()
+        get_recipe_with_translation(1, "en")
+        search_recipes("chicken")
+        assert stop_query_capture() is queries
+
+        lookup = next(q for q in queries if "WHERE l.language = ?" in q["sql"])
+        assert lookup["shape"] == "(str, int)"
+        assert lookup["rows"] == 1
+        assert lookup["seconds"] > 0
+        assert any(q["rows"] == 1 and "MATCH" in q["sql"] for q in queries)
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_nothing_is_recorded_without_capture(self, test_db):
+        """Test that capture is off unless started on the thread."""
+        queries = start_query_capture()
+        stop_query_capture()
+        get_recipe_with_translation(1, "en")
+        assert queries == []
+        assert stop_query_capture() == []
+
+    @pytest.mark.unit
+    def test_parameter_shape_hides_values(self):
+        """Test that shapes carry types and names but never values."""
+        assert parameter_shape(("secret", 3, None)) == "(str, int, NoneType)"
+        assert parameter_shape({"q": "secret"}) == "{q: str}"
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_explain_query_plan(self, test_db):
+        """Test that plans come back as detail lines and bad SQL yields []."""
+        plan = explain_query_plan(
+            "SELECT * FROM recipes_localized WHERE language = ? AND recipe_id = ?",
+            ("es", 1),
+        )
+        assert any("PRIMARY KEY" in line for line in plan)
+        assert explain_query_plan("SELECT * FROM missing_table") == []
+
+
+class TestRequestTiming:
+    """Test Server-Timing, slow query logging and the debug panel."""
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_server_timing_header(self, app_client):
+        """Test that responses report database and total time when enabled."""
+        assert "Server-Timing" not in app_client.get("/recipe/1").headers
+
+        app_client.application.config["SERVER_TIMING"] = True
+        response = app_client.get("/recipe/1")
+        timing = response.headers.getlist("Server-Timing")
+        assert timing[0].startswith("db;dur=")
+        assert "queries" in timing[0]
+        assert timing[1].startswith("app;dur=")
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_slow_queries_are_logged_with_plan(self, app_client, caplog):
+        """Test that queries over the threshold are logged with their plan."""
+        app_client.application.config["SQL_SLOW_QUERY_MS"] = 0
+        with caplog.at_level(logging.WARNING, logger="recetas.sql"):
+            app_client.get("/recipe/1")
+        messages = [record.getMessage() for record in caplog.records]
+        assert any("recipes_localized" in m and "plan:" in m for m in messages)
+        assert not any("Test Recipe 1" in m for m in messages)
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_debug_panel_only_when_enabled(self, app_client):
+        """Test that the SQL panel is rendered only with SQL_DEBUG_PANEL."""
+        assert b"sql-debug-panel" not in app_client.get("/categories").data
+
+        app_client.application.config["SQL_DEBUG_PANEL"] = True
+        html = app_client.get("/recipe/1").get_data(as_text=True)
+        assert 'id="sql-debug-panel"' in html
+        assert "recipes_localized" in html
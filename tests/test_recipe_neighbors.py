@@ -0,0 +1,102 @@
+"""
+Unit tests for the precomputed related-recipes index.
+"""
+
+import pytest
+
+import database
+import scripts.calories_estimator
+from scripts.build_recipe_neighbors import (
+    _top_k_numpy,
+    _top_k_python,
+    build_recipe_neighbors,
+    top_k_neighbors,
+)
+
+BAGS = {
+    1: {"pollo", "ajo", "aceite"},
+    2: {"pollo", "ajo", "limón"},
+    3: {"harina", "azúcar", "huevo"},
+    4: {"harina", "azúcar", "huevo", "aceite"},
+    5: set(),
+}
+
+
+class TestTopKNeighbors:
+    """Test the similarity search."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("metric", ["cosine", "jaccard"])
+    def test_closest_recipes_come_first(self, metric):
+        """Test ranking, unrelated recipes and recipes without ingredients."""
+        neighbors = top_k_neighbors(BAGS, k=2, metric=metric, use_numpy=False)
+        assert [other for other, _ in neighbors[1]] == [2, 4]
+        assert [other for other, _ in neighbors[3]] == [4]
+        assert [other for other, _ in neighbors[4]] == [3, 1]
+        assert 5 not in neighbors
+        assert neighbors[4][0][1] > neighbors[4][1][1] > 0
+
+    @pytest.mark.unit
+    def test_jaccard_scores(self):
+        """Test Jaccard values on plain sets."""
+        neighbors = top_k_neighbors(BAGS, k=1, metric="jaccard", use_numpy=False)
+        assert neighbors[1] == [(2, pytest.approx(0.5))]
+        assert neighbors[3] == [(4, pytest.approx(0.75))]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("metric", ["cosine", "jaccard"])
+    @pytest.mark.parametrize("k", [1, 2, 3])
+    def test_numpy_matches_python(self, metric, k):
+        """Test that the NumPy path finds the same neighbours and scores."""
+        pytest.importorskip("numpy")
+        expected = _top_k_python(BAGS, k, metric)
+        actual = _top_k_numpy(BAGS, k, metric)
+        assert actual.keys() == expected.keys()
+        for recipe_id, pairs in expected.items():
+            assert [other for other, _ in actual[recipe_id]] == [
+                other for other, _ in pairs
+            ]
+            assert [score for _, score in actual[recipe_id]] == pytest.approx(
+                [score for _, score in pairs], rel=1e-5
+            )
+
+    @pytest.mark.unit
+    def test_unknown_metric(self):
+        """Test that an unknown metric is rejected."""
+        with pytest.raises(ValueError):
+            top_k_neighbors(BAGS, metric="euclidean")
+
+
+class TestBuildRecipeNeighbors:
+    """Test storing neighbours and reading them on the detail page."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_related_recipes_use_stored_neighbors(self, test_db, monkeypatch):
+        """Test that the build fills recipe_neighbors and bumps the catalog."""
+        monkeypatch.setattr(scripts.calories_estimator, "DATABASE_PATH", test_db)
+        conn = database.get_db_connection()
+        conn.executemany(
+            "INSERT INTO ingredient_calories (ingredient_name, calories_per_100g) "
+            "VALUES (?, ?)",
+            [("chicken", 165), ("spices", 300), ("ingredients", 100)],
+        )
+        conn.execute(
+            "UPDATE recipes SET ingredients = ? WHERE id = 3",
+            ("Chicken\nspices\nTest ingredients",),
+        )
+        conn.commit()
+        conn.close()
+        version_before = database.get_catalog_version()[0]
+
+        neighbors = build_recipe_neighbors(k=4)
+
+        assert database.get_catalog_version()[0] != version_before
+        assert [other for other, _ in neighbors[1]] == [2, 3]
+        assert [other for other, _ in neighbors[3]] == [1, 2]
+
+        recipe = database.get_recipe_with_translation(3, "en")
+        related = database.get_related_recipes(recipe, "en")
+        assert [row["id"] for row in related] == [1, 2]
+        assert related[0]["title"] == "Test Recipe 1 EN"
+        assert "instructions" not in related[0]
@@ -2,14 +2,27 @@
 Unit tests for search and filtering functionality.
 """
 
+import json
+
 import pytest
 
+import pantry
+import scripts.calories_estimator
 from database import (
     search_recipes,
     search_recipes_with_translation,
     get_categories,
     get_all_recipes,
     get_all_recipes_with_translation,
+    get_db_connection,
+    save_recipe_translation,
+    search_recipes_by_ingredients,
+    next_page_cursor,
+    explain_query_plan,
+    init_database,
+    normalize_text,
+    start_query_capture,
+    stop_query_capture,
 )
 
 
@@ -519,3 +532,467 @@ class TestFilteringIntegration:
             search_ids = set(recipe["id"] for recipe in all_via_search)
             direct_ids = set(recipe["id"] for recipe in all_via_direct)
             assert search_ids == direct_ids
+
+
+class TestFullTextSearch:
+    """Test the FTS5-backed search path."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_search_index_populated_on_insert(self, test_db):
+        """Test that inserting recipes fills every language index."""
+        conn = get_db_connection()
+        for language in ("es", "en", "zh"):
+            count = conn.execute(
+                f"SELECT COUNT(*) FROM recipes_fts_{language}"
+            ).fetchone()[0]
+            assert count == 3
+        conn.close()
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_search_ranks_title_matches_first(self, test_db):
+        """Test that BM25 ranks a title hit above an ingredient hit."""
+        conn = get_db_connection()
+        conn.execute(
+            "INSERT INTO recipes (title, description, ingredients, instructions, "
+            "category, filename) VALUES ('Tarta', 'Postre', 'Chicken stock', "
+            "'Hornear', 'Postres', 'tarta.md')"
+        )
+        conn.commit()
+        conn.close()
+
+        results = search_recipes("chicken")
+        assert [recipe["title"] for recipe in results] == ["Chicken Test", "Tarta"]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_search_matches_word_prefixes(self, test_db):
+        """Test that query words match as prefixes."""
+        results = search_recipes("chick spic")
+        assert [recipe["title"] for recipe in results] == ["Chicken Test"]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_search_falls_back_to_substring_scan(self, test_db):
+        """Test that mid-word substrings still match through LIKE."""
+        results = search_recipes("icken")
+        assert [recipe["title"] for recipe in results] == ["Chicken Test"]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_search_ignores_diacritics(self, test_db):
+        """Test that accents do not prevent a match."""
+        conn = get_db_connection()
+        conn.execute(
+            "INSERT INTO recipes (title, description, ingredients, instructions, "
+            "category, filename) VALUES ('Champiñones al ajillo', '', 'Ajo', "
+            "'Saltear', 'Verduras', 'champis.md')"
+        )
+        conn.commit()
+        conn.close()
+
+        results = search_recipes("champinones")
+        assert [recipe["title"] for recipe in results] == ["Champiñones al ajillo"]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_substring_scan_ignores_case_and_accents(self, test_db):
+        """Test mid-word matches through the normalized shadow columns."""
+        save_recipe_translation(
+            3, "eu", "BAKAILAOA PIL-PILEAN", "", "Txanpiñoiak", "Egosi", "Arraina"
+        )
+
+        queries = start_query_capture()
+        results = search_recipes_with_translation("akailao", language="eu")
+        assert [recipe["id"] for recipe in results] == [3]
+        results = search_recipes_with_translation("anpinoi", language="eu")
+        assert [recipe["id"] for recipe in results] == [3]
+        stop_query_capture()
+        scans = [q["sql"] for q in queries if "LIKE" in q["sql"]]
+        assert scans and all("l.title_normalized LIKE ?" in sql for sql in scans)
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_stale_shadows_are_refilled(self, test_db):
+        """Test that text written without its shadow is normalized on init."""
+        conn = get_db_connection()
+        conn.execute("UPDATE recipes SET title = 'Ñoquis Caseros' WHERE id = 1")
+        conn.commit()
+        shadow = conn.execute(
+            "SELECT title_normalized, description_normalized FROM recipes WHERE id = 1"
+        ).fetchone()
+        conn.close()
+        assert tuple(shadow) == (None, "test description 1")
+
+        init_database()
+        results = search_recipes("OQUIS")
+        assert [recipe["title"] for recipe in results] == ["Ñoquis Caseros"]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_imported_translations_store_shadows(self, test_db, tmp_path, monkeypatch):
+        """Test that the translation importer is searchable without a re-init."""
+        from scripts.import_all_translations import (
+            import_translations_from_individual_files,
+        )
+
+        (tmp_path / "translations_english.json").write_text(
+            json.dumps(
+                {"3": {"title": "Grilled Chicken", "ingredients": "Chicken, lemon"}}
+            ),
+            encoding="utf-8",
+        )
+        monkeypatch.chdir(tmp_path)
+        import_translations_from_individual_files()
+
+        results = search_recipes_with_translation("rilled", language="en")
+        assert [recipe["id"] for recipe in results] == [3]
+
+    @pytest.mark.unit
+    def test_normalize_text(self):
+        """Test casefolding and diacritic stripping."""
+        assert normalize_text("Ñoquis CON Piñones à la SSauce") == (
+            "noquis con pinones a la ssauce"
+        )
+        assert normalize_text(None) is None
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_translated_index_follows_saved_translation(self, test_db):
+        """Test that save_recipe_translation re-indexes the recipe."""
+        save_recipe_translation(
+            2, "en", "Roast Turkey", "Holiday dish", "Turkey", "Roast", "Poultry"
+        )
+
+        results = search_recipes_with_translation("turkey", language="en")
+        assert [recipe["id"] for recipe in results] == [2]
+        assert results[0]["category"] == "Poultry"
+
+        results = search_recipes_with_translation("turkey", "Poultry", "en")
+        assert [recipe["id"] for recipe in results] == [2]
+        assert search_recipes_with_translation("turkey", "Pollo", "en") == []
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_translated_index_falls_back_to_original(self, test_db):
+        """Test that untranslated recipes are searchable in every language."""
+        results = search_recipes_with_translation("chicken", language="zh")
+        assert [recipe["title"] for recipe in results] == ["Chicken Test"]
+
+
+class TestKeysetPagination:
+    """Test paged listings and searches."""
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_pages_cover_listing_in_title_order(self, test_db):
+        """Test that walking the cursors returns every recipe once, in order."""
+        titles, after = [], None
+        while True:
+            page = get_all_recipes_with_translation("en", page_size=2, after=after)
+            titles.extend(recipe["title"] for recipe in page)
+            after = next_page_cursor(page, 2)
+            if after is None:
+                break
+
+        assert titles == ["Chicken Test", "Test Recipe 1 EN", "Test Recipe 2"]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_page_uses_slim_projection(self, test_db):
+        """Test that pages only carry the listing columns."""
+        conn = get_db_connection()
+        conn.execute("UPDATE recipes SET description = ? WHERE id = 2", ["x" * 500])
+        conn.commit()
+        conn.close()
+
+        page = get_all_recipes_with_translation("es", page_size=10)
+        assert set(page[0].keys()) == {
+            "id",
+            "title",
+            "description",
+            "category",
+            "estimated_calories",
+            "calories_per_serving",
+            "sort_key",
+        }
+        long_description = [r["description"] for r in page if r["id"] == 2][0]
+        assert len(long_description) == 101
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_short_page_has_no_next_cursor(self, test_db):
+        """Test that the last page does not offer a next cursor."""
+        page = get_all_recipes_with_translation("es", page_size=10)
+        assert len(page) == 3
+        assert next_page_cursor(page, 10) is None
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_malformed_cursor_restarts_listing(self, test_db):
+        """Test that a tampered cursor falls back to the first page."""
+        page = get_all_recipes_with_translation("es", page_size=2, after="%%%")
+        assert [recipe["title"] for recipe in page] == ["Chicken Test", "Test Recipe 1"]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_paged_search_with_category(self, test_db):
+        """Test paging a translated search restricted to a category."""
+        first = search_recipes_with_translation("test", "Pollo", "en", page_size=1)
+        assert [recipe["title"] for recipe in first] == ["Chicken Test"]
+
+        after = next_page_cursor(first, 1, "relevance")
+        second = search_recipes_with_translation(
+            "test", "Pollo", "en", page_size=1, after=after
+        )
+        assert [recipe["title"] for recipe in second] == ["Test Recipe 2"]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_paged_search_keeps_relevance_order(self, test_db):
+        """Test that ranked pages follow the same order as the unpaged search."""
+        save_recipe_translation(
+            2, "en", "Roast chicken", "Chicken", "Chicken, chicken stock", "Roast"
+        )
+        ranked = [
+            r["id"] for r in search_recipes_with_translation("chicken", None, "en")
+        ]
+        assert ranked == [2, 3]
+
+        ids, after = [], None
+        while True:
+            page = search_recipes_with_translation(
+                "chicken", None, "en", page_size=1, after=after
+            )
+            ids.extend(recipe["id"] for recipe in page)
+            after = next_page_cursor(page, 1, "relevance")
+            if after is None:
+                break
+        assert ids == ranked
+
+        by_title = search_recipes_with_translation(
+            "chicken", None, "en", page_size=10, sort="title"
+        )
+        assert [recipe["id"] for recipe in by_title] == [3, 2]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_paged_search_substring_fallback(self, test_db):
+        """Test that paged searches keep the LIKE fallback."""
+        page = search_recipes_with_translation("icken", None, "es", page_size=5)
+        assert [recipe["title"] for recipe in page] == ["Chicken Test"]
+
+
+class TestNutritionFilters:
+    """Test filtering and sorting by nutrition per serving."""
+
+    @pytest.fixture
+    def nutrition_db(self, test_db):
+        conn = get_db_connection()
+        conn.executemany(
+            "UPDATE recipes SET calories_per_serving = ?, protein_per_serving = ? "
+            "WHERE id = ?",
+            [(450, 30.0, 1), (200, 12.5, 2), (None, None, 3)],
+        )
+        conn.commit()
+        conn.close()
+        return test_db
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_range_filters(self, nutrition_db):
+        """Test that bounds are inclusive and unknown values never match."""
+        results = search_recipes_with_translation(
+            "", language="en", nutrition={"calories": (None, 450)}
+        )
+        assert sorted(recipe["id"] for recipe in results) == [1, 2]
+
+        results = search_recipes_with_translation(
+            "",
+            language="en",
+            nutrition={"calories": (None, 300), "protein": (10, None)},
+        )
+        assert [recipe["id"] for recipe in results] == [2]
+
+        with pytest.raises(ValueError):
+            search_recipes_with_translation("", nutrition={"sodium": (None, 1)})
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_calorie_sort_pages_in_order(self, nutrition_db):
+        """Test that calorie sorts page with their own cursor, both ways."""
+        for sort, expected in (("calories", [2, 1]), ("calories_desc", [1, 2])):
+            ids, after = [], None
+            while True:
+                page = search_recipes_with_translation(
+                    "", language="en", page_size=1, after=after, sort=sort
+                )
+                ids.extend(recipe["id"] for recipe in page)
+                after = next_page_cursor(page, 1, sort)
+                if after is None:
+                    break
+            assert ids == expected
+
+        with pytest.raises(ValueError):
+            search_recipes_with_translation("", sort="random")
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_calorie_listing_uses_index(self, nutrition_db):
+        """Test that filtered calorie listings walk the composite indexes."""
+        queries = start_query_capture()
+        search_recipes_with_translation(
+            "",
+            language="en",
+            page_size=10,
+            nutrition={"calories": (None, 500)},
+            sort="calories",
+        )
+        search_recipes_with_translation(
+            "", "Pollo", "en", page_size=10, sort="calories_desc"
+        )
+        stop_query_capture()
+
+        plans = [
+            " ".join(explain_query_plan(q["sql"], q["parameters"])) for q in queries
+        ]
+        assert any("idx_localized_calories" in plan for plan in plans)
+        assert any("idx_localized_category_calories" in plan for plan in plans)
+        assert not any("TEMP B-TREE" in plan for plan in plans)
+
+
+class TestChineseBigramSearch:
+    """Test the ideograph bigram index behind zh searches."""
+
+    @pytest.fixture
+    def zh_db(self, test_db):
+        save_recipe_translation(2, "zh", "红烧鸡块", "家常菜", "鸡肉 酱油", "炖", "鸡肉")
+        save_recipe_translation(3, "zh", "土豆饼", "简单", "土豆 鸡蛋 红烧酱", "煎", "鸡肉")
+        return test_db
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_substrings_inside_unspaced_text(self, zh_db):
+        """Test that any run of ideographs matches, ranked by field weight."""
+        results = search_recipes_with_translation("红烧", language="zh")
+        assert [recipe["id"] for recipe in results] == [2, 3]
+        results = search_recipes_with_translation("豆饼", language="zh")
+        assert [recipe["id"] for recipe in results] == [3]
+        results = search_recipes_with_translation("蛋", language="zh")
+        assert [recipe["id"] for recipe in results] == [3]
+        assert search_recipes_with_translation("烧土", language="zh") == []
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_bigram_search_is_an_index_lookup(self, zh_db):
+        """Test that zh searches read the bigram table, not a LIKE scan."""
+        queries = start_query_capture()
+        page = search_recipes_with_translation("鸡", language="zh", page_size=1)
+        stop_query_capture()
+        assert [recipe["id"] for recipe in page] == [2]
+
+        plans = [explain_query_plan(q["sql"], q["parameters"]) for q in queries]
+        assert not any("LIKE" in q["sql"] for q in queries)
+        assert any(
+            "SEARCH recipe_bigrams_zh USING PRIMARY KEY (gram=?)" in plan
+            for plan in plans
+        )
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_grams_follow_writes(self, zh_db):
+        """Test that edits and deletes keep the bigram table current."""
+        save_recipe_translation(3, "zh", "煎饼", "简单", "面粉", "煎", "鸡肉")
+        assert search_recipes_with_translation("土豆", language="zh") == []
+
+        conn = get_db_connection()
+        conn.execute("DELETE FROM recipes WHERE id = 2")
+        conn.commit()
+        remaining = conn.execute(
+            "SELECT COUNT(*) FROM recipe_bigrams_zh WHERE recipe_id = 2"
+        ).fetchone()[0]
+        conn.close()
+        assert remaining == 0
+        assert search_recipes_with_translation("红烧", language="zh") == []
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_mixed_queries_use_full_text_search(self, zh_db):
+        """Test that queries with other words keep the FTS5 path."""
+        results = search_recipes_with_translation("Test 1", language="zh")
+        assert [recipe["id"] for recipe in results] == [1]
+
+
+class TestPantrySearch:
+    """Test "cook with what I have" over the recipe_ingredients postings."""
+
+    @pytest.fixture
+    def pantry_db(self, test_db, monkeypatch):
+        monkeypatch.setattr(scripts.calories_estimator, "DATABASE_PATH", test_db)
+        conn = get_db_connection()
+        conn.executemany(
+            "INSERT INTO ingredient_calories (ingredient_name, calories_per_100g) "
+            "VALUES (?, ?)",
+            [("pollo", 239), ("champiñones", 22), ("nata", 340), ("arroz", 130)],
+        )
+        conn.executemany(
+            "UPDATE recipes SET ingredients = ? WHERE id = ?",
+            [
+                ("200 g de pollo\n100 g de arroz", 1),
+                ("1 kg de pollo\n200 g de champiñones\n200 ml de nata", 2),
+                ("1 pollo\n100 g de champiñones", 3),
+            ],
+        )
+        conn.commit()
+        conn.close()
+        estimator = scripts.calories_estimator.CaloriesEstimator()
+        estimator.estimate_all_recipes()
+        estimator.close()
+        return test_db
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_ranked_by_coverage(self, pantry_db):
+        """Test that recipes using more of the pantry, then needing less, lead."""
+        results = search_recipes_by_ingredients(["pollo", "champiñones"], language="en")
+        assert [(r["id"], r["matched"], r["missing"]) for r in results] == [
+            (3, 2, 0),
+            (2, 2, 1),
+            (1, 1, 1),
+        ]
+        assert results[0]["title"] == "Chicken Test"
+        results = search_recipes_by_ingredients(["nata"], "Pollo", limit=1)
+        assert [r["id"] for r in results] == [2]
+        assert search_recipes_by_ingredients([]) == []
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_terms_resolve_to_canonical_names(self, pantry_db):
+        """Test splitting, plurals, accents and unknown terms."""
+        assert pantry.split_ingredients(" pollo,, Champiñón;nata y arroz ") == [
+            "pollo",
+            "Champiñón",
+            "nata",
+            "arroz",
+        ]
+        names, unknown = pantry.resolve("Pollos, champinones, azafrán, 2 pollos")
+        assert names == ["pollo", "champiñones"]
+        assert unknown == ["azafrán"]
+
+        recipes, names, _ = pantry.search("nata, arroz")
+        assert names == ["nata", "arroz"]
+        assert [r["id"] for r in recipes] == [1, 2]
+
+    @pytest.mark.unit
+    @pytest.mark.database
+    def test_pantry_search_reads_posting_lists(self, pantry_db):
+        """Test that the query seeks the postings instead of scanning recipes."""
+        queries = start_query_capture()
+        search_recipes_by_ingredients(["pollo", "nata"], language="es")
+        stop_query_capture()
+
+        plan = " ".join(explain_query_plan(queries[0]["sql"], queries[0]["parameters"]))
+        assert "SEARCH p USING PRIMARY KEY (ingredient_name=?)" in plan
+        assert "SCAN l" not in plan
+        assert "LIKE" not in queries[0]["sql"]
@@ -0,0 +1,105 @@
+"""
+Unit tests for the autocomplete prefix index and /api/suggest.
+"""
+
+import pytest
+
+import database
+from suggest import PrefixIndex
+
+TERMS = [
+    ("recipe", "Tortilla de Patatas", 1),
+    ("recipe", "Patatas Bravas", 2),
+    ("recipe", "Pollo al Ajillo", 3),
+    ("category", "Pollo", None),
+    ("ingredient", "jalapeño", None),
+]
+
+
+class TestPrefixIndex:
+    """Test prefix lookups over folded terms."""
+
+    @pytest.mark.unit
+    def test_whole_terms_before_later_words(self):
+        """Test that a term starting with the prefix beats a later word."""
+        index = PrefixIndex(TERMS)
+        labels = [label for _, label, _ in index.search("pat")]
+        assert labels == ["Patatas Bravas", "Tortilla de Patatas"]
+
+    @pytest.mark.unit
+    def test_case_accents_and_spacing_are_ignored(self):
+        """Test that queries and terms are compared folded."""
+        index = PrefixIndex(TERMS)
+        assert index.search("JALAPENO") == [("ingredient", "jalapeño", None)]
+        assert index.search("  pollo   al ") == [("recipe", "Pollo al Ajillo", 3)]
+        assert index.search("   ") == []
+
+    @pytest.mark.unit
+    def test_limit_and_duplicates(self):
+        """Test that a term is returned once and the limit is honoured."""
+        index = PrefixIndex(TERMS + TERMS)
+        assert index.size == len(TERMS)
+        assert index.search("pol", limit=1) == [("category", "Pollo", None)]
+        assert len(index.search("p", limit=10)) == 4
+        assert index.search("p", limit=0) == []
+
+
+class TestSuggestEndpoint:
+    """Test the JSON endpoint against the test database."""
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_suggestions_per_language(self, app_client):
+        """Test that titles and categories come from the requested language."""
+        data = app_client.get("/api/suggest?q=test&lang=en").get_json()
+        assert data["q"] == "test"
+        assert {"label": "Test Recipe 1 EN", "kind": "recipe", "id": 1} in (
+            data["suggestions"]
+        )
+
+        data = app_client.get("/api/suggest?q=dess&lang=en").get_json()
+        assert data["suggestions"] == [{"label": "Desserts", "kind": "category"}]
+        data = app_client.get("/api/suggest?q=post&lang=es").get_json()
+        assert data["suggestions"] == [{"label": "Postres", "kind": "category"}]
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_only_listed_ingredients_are_offered(self, app_client):
+        """Test that known ingredients appear once a recipe lists them."""
+        conn = database.get_db_connection()
+        conn.executemany(
+            "INSERT INTO ingredient_calories (ingredient_name, calories_per_100g) "
+            "VALUES (?, ?)",
+            [("spices", 300), ("saffron", 310)],
+        )
+        database.bump_catalog_version(conn)
+        conn.commit()
+        conn.close()
+
+        data = app_client.get("/api/suggest?q=s&lang=es").get_json()
+        assert {"label": "spices", "kind": "ingredient"} in data["suggestions"]
+        assert {"label": "saffron", "kind": "ingredient"} not in data["suggestions"]
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_limit_is_clamped(self, app_client):
+        """Test that out-of-range limits are brought back into 1..MAX_LIMIT."""
+        for limit in (0, -5):
+            data = app_client.get(f"/api/suggest?q=t&lang=en&limit={limit}").get_json()
+            assert len(data["suggestions"]) == 1
+        data = app_client.get("/api/suggest?q=t&lang=en&limit=500").get_json()
+        assert 1 < len(data["suggestions"]) <= 20
+
+    @pytest.mark.unit
+    @pytest.mark.flask
+    def test_index_follows_catalog_changes(self, app_client):
+        """Test that a saved translation shows up without a restart."""
+        assert (
+            app_client.get("/api/suggest?q=tortilla&lang=ca").get_json()["suggestions"]
+            == []
+        )
+        database.save_recipe_translation(2, "ca", title="Truita de patates")
+        data = app_client.get("/api/suggest?q=truita&lang=ca&limit=50").get_json()
+        assert data["suggestions"] == [
+            {"label": "Truita de patates", "kind": "recipe", "id": 2}
+        ]
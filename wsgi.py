@@ -0,0 +1,35 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module initializes the database and warms the catalog
+cache for every language, so with ``preload_app`` the master process does
+the work once and forked workers start with the cache already filled
+(see ``database._forget_catalog_after_fork``).
+"""
+
+from app import app
+from database import (
+    get_all_recipes_with_translation,
+    get_categories,
+    get_catalog_version,
+    get_recipe_count,
+)
+
+application = app
+
+
+def warm_catalog():
+    """Load everything the listing pages and validators read from the cache."""
+    get_catalog_version()
+    get_categories()
+    get_recipe_count()
+    for language in app.config["LANGUAGES"]:
+        get_all_recipes_with_translation(language)
+        get_all_recipes_with_translation(
+            language, page_size=app.config["RECIPES_PER_PAGE"]
+        )
+
+
+warm_catalog()